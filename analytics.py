@@ -0,0 +1,135 @@
+# analytics.py
+"""Planned-vs-actual analytics over the service_runs history.
+
+The event log is loaded once into NumPy arrays and every aggregate is
+computed with array operations (cumsum/bincount/percentile), so a year of
+services is a handful of vector passes instead of a Python loop per row.
+"""
+try:
+    import numpy as np
+except ImportError:  # analytics are optional on the Pi
+    np = None
+
+EVENT_CODES = {'start': 0, 'pause': 1, 'resume': 2, 'skip': 3, 'end': 4}
+
+def load_events(conn, since=None, program_id=None):
+    """Read service_runs rows (oldest first) into column arrays"""
+    query = '''
+        SELECT program_id, activity_name, planned_seconds, event, occurred_at
+        FROM service_runs
+        WHERE occurred_at >= COALESCE(?, occurred_at)
+          AND program_id = COALESCE(?, program_id)
+        ORDER BY id
+    '''
+    rows = conn.execute(query, (since, program_id)).fetchall()
+    if not rows:
+        return None
+
+    program_ids, activity_names, planned, events, occurred_at = zip(*rows)
+    return {
+        'program_id': np.array([p if p is not None else -1 for p in program_ids], dtype=np.int64),
+        'activity': np.array([a or '' for a in activity_names], dtype=object),
+        'planned': np.array([p or 0 for p in planned], dtype=np.float64),
+        'event': np.array([EVENT_CODES[e] for e in events], dtype=np.int8),
+        # ISO strings parse straight into datetime64
+        'ts': np.array(occurred_at, dtype='datetime64[ms]').astype(np.int64) / 1000.0,
+    }
+
+def activity_segments(events):
+    """Collapse the event log into one row per completed activity run.
+
+    A segment starts at each 'start' event; its actual duration is the time to
+    its 'skip'/'end' event minus time spent paused. Segments that never
+    finished (e.g. a crash mid-activity) are dropped.
+    """
+    event, ts = events['event'], events['ts']
+    is_start = event == EVENT_CODES['start']
+    segment = np.cumsum(is_start) - 1
+    valid = segment >= 0  # ignore events logged before the first start
+    segment, event, ts = segment[valid], event[valid], ts[valid]
+    count = int(is_start.sum())
+    if count == 0:
+        return None
+
+    def per_segment(mask, weights=None):
+        return np.bincount(segment[mask], weights=None if weights is None else weights[mask], minlength=count)
+
+    is_finish = (event == EVENT_CODES['skip']) | (event == EVENT_CODES['end'])
+    is_pause, is_resume = event == EVENT_CODES['pause'], event == EVENT_CODES['resume']
+
+    start_ts = ts[is_start[valid]]
+    finished = per_segment(is_finish) > 0
+    # Use the first finish event of each segment
+    finish_ts = np.full(count, np.inf)
+    np.minimum.at(finish_ts, segment[is_finish], ts[is_finish])
+    skipped = per_segment(event == EVENT_CODES['skip']) > 0
+
+    # Paused time = sum(resume times) - sum(pause times); a pause never
+    # resumed before the finish counts until the finish
+    unmatched = per_segment(is_pause) - per_segment(is_resume)
+    paused = per_segment(is_resume, ts) - per_segment(is_pause, ts)
+    paused = paused + np.where(unmatched > 0, unmatched * np.where(finished, finish_ts, 0), 0)
+
+    actual = np.where(finished, finish_ts - start_ts - paused, np.nan)
+    keep = finished & (actual >= 0)
+    starts = np.flatnonzero(is_start)
+    return {
+        'activity': events['activity'][starts][keep],
+        'program_id': events['program_id'][starts][keep],
+        'planned': events['planned'][starts][keep],
+        'actual': actual[keep],
+        'skipped': skipped[keep],
+        'start_ts': start_ts[keep],
+    }
+
+def overrun_report(events, histogram_bins=(-600, -300, -120, -60, 0, 60, 120, 300, 600)):
+    segments = activity_segments(events) if events else None
+    if segments is None or len(segments['actual']) == 0:
+        return {'runs': 0, 'activities': [], 'overrun': None}
+
+    planned, actual = segments['planned'], segments['actual']
+    overrun = actual - planned
+
+    # Per-activity aggregates in one pass
+    names, inverse = np.unique(segments['activity'].astype(str), return_inverse=True)
+    counts = np.bincount(inverse)
+    sum_planned = np.bincount(inverse, weights=planned)
+    sum_actual = np.bincount(inverse, weights=actual)
+    sum_overrun = np.bincount(inverse, weights=overrun)
+    overran = np.bincount(inverse, weights=(overrun > 0).astype(np.float64))
+    skips = np.bincount(inverse, weights=segments['skipped'].astype(np.float64))
+    max_overrun = np.full(len(names), -np.inf)
+    np.maximum.at(max_overrun, inverse, overrun)
+
+    order = np.argsort(-sum_overrun / counts)
+    activities = [{
+        'activity_name': str(names[i]),
+        'runs': int(counts[i]),
+        'avg_planned_seconds': round(float(sum_planned[i] / counts[i]), 1),
+        'avg_actual_seconds': round(float(sum_actual[i] / counts[i]), 1),
+        'avg_overrun_seconds': round(float(sum_overrun[i] / counts[i]), 1),
+        'max_overrun_seconds': round(float(max_overrun[i]), 1),
+        'overrun_rate': round(float(overran[i] / counts[i]), 3),
+        'skip_rate': round(float(skips[i] / counts[i]), 3),
+    } for i in order]
+
+    edges = np.array([-np.inf, *histogram_bins, np.inf])
+    hist, _ = np.histogram(overrun, bins=edges)
+    p50, p90, p95 = np.percentile(overrun, [50, 90, 95])
+
+    return {
+        'runs': int(len(actual)),
+        'total_planned_seconds': round(float(planned.sum()), 1),
+        'total_actual_seconds': round(float(actual.sum()), 1),
+        'activities': activities,
+        'overrun': {
+            'mean_seconds': round(float(overrun.mean()), 1),
+            'p50_seconds': round(float(p50), 1),
+            'p90_seconds': round(float(p90), 1),
+            'p95_seconds': round(float(p95), 1),
+            'histogram': [{'from_seconds': None if np.isinf(lo) else int(lo),
+                           'to_seconds': None if np.isinf(hi) else int(hi),
+                           'count': int(n)}
+                          for lo, hi, n in zip(edges[:-1], edges[1:], hist)],
+        },
+    }
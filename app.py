@@ -1,50 +1,210 @@
 # app.py
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, g, render_template, request, jsonify, send_file, abort, stream_with_context
 import sqlite3
 from datetime import datetime, timedelta
 import threading
 import time
+import urllib.error
 import urllib.request
+import hashlib
+import hmac
+import uuid
+import zlib
 import json
+import os
+import queue
+import analytics
+import clock
+import codecs
+import cProfile
+import profiling
+import serialization
+import server_timing
+import structured_log
+import transfer
+from functools import partial
+
+from assets import AssetManifest, IMMUTABLE_CACHE_CONTROL
+from database import DB_PATH
+from countdown_timeline import CountdownTimeline, compile_steps, parse_steps, timeline_from_json, timeline_to_json
+from db_writer import DatabaseWriter
+from health import HealthMonitor
+from projection import ProjectedTimeline
+from recurrence import OccurrenceCache, load_rule, validate_rule
+from search_index import NameIndex
+from stage_messages import StageMessageQueue, parse_priority
+from state_journal import StateJournal
+from state_store import StateStore
+
+# Per-subsystem loggers (see structured_log.py); LOG_LEVELS=remote_sync=DEBUG etc.
+log = structured_log.get_logger('app')
+auto_start_log = structured_log.get_logger('auto_start')
+sync_log = structured_log.get_logger('remote_sync')
+push_log = structured_log.get_logger('remote_push')
+schedule_log = structured_log.get_logger('schedule')
+timer_log = structured_log.get_logger('timer')
+stage_log = structured_log.get_logger('stage_message')
+countdown_log = structured_log.get_logger('countdown')
+state_log = structured_log.get_logger('state')
 
 # Create the Flask app FIRST
 app = Flask(__name__, static_folder='static', static_url_path='/static')
+app.json = serialization.FastJSONProvider(app)
 
-# Global state
-current_timer = {
-    'current_activity': '',
-    'time_remaining': '00:00',
-    'is_running': False,
-    'is_paused': False,
-    'total_duration': 0,
-    'end_time': None,
-    'waiting_for_start': False,
-    'scheduled_start_time': '',
-    'waiting_program_name': ''
-}
+# Fingerprinted JS/CSS - templates use asset_url('js/admin.js')
+asset_manifest = AssetManifest(app.static_folder)
+app.jinja_env.globals['asset_url'] = asset_manifest.url
+
+# Startup/readiness tracking - /readyz succeeds once these phases and workers report in
+health = HealthMonitor(required_phases=['migrations', 'assets', 'occurrences', 'search_index', 'recovery', 'auto_start_check'],
+                       expected_workers=['timer', 'auto_start', 'remote_sync', 'remote_push'])
+
+# Global state - published as immutable snapshots. Readers use
+# display_state['section'] without locking; writers use display_state.update()
+# or display_state.edit() to change several fields/sections at once.
+display_state = StateStore(
+    current_timer={
+        'current_activity': '',
+        'time_remaining': '00:00',
+        'is_running': False,
+        'is_paused': False,
+        'total_duration': 0,
+        'end_time': None,
+        'waiting_for_start': False,
+        'scheduled_start_time': '',
+        'waiting_program_name': ''
+    },
+    # Queued program - persists independently of current running state
+    queued_program={
+        'has_queued': False,
+        'program_id': None,
+        'program_name': '',
+        'scheduled_start_time': ''
+    },
+    # Countdown timer state
+    countdown_timer={
+        'is_active': False,
+        'name': '',
+        'target_time': None,
+        'time_remaining': '',
+        'is_expired': False,
+        'timer_type': 'duration',
+        # Sequences: the sequence name, the current step and every [name, end] deadline
+        'sequence_name': '',
+        'step': 0,
+        'steps': []
+    },
+    # Bumped whenever the stage message queue changes; displays refetch the windows then
+    stage_messages={
+        'version': 0
+    },
+)
 live_schedule_override = None  # Will store the live reordered schedule
 
-# Queued program - persists independently of current running state
-queued_program = {
-    'has_queued': False,
-    'program_id': None,
-    'program_name': '',
-    'scheduled_start_time': ''
-}
-
-# Countdown timer state
-countdown_timer = {
-    'is_active': False,
-    'name': '',
-    'target_time': None,
-    'time_remaining': '',
-    'is_expired': False,
-    'timer_type': 'duration'
-}
+EMPTY_QUEUE = {'has_queued': False, 'program_id': None, 'program_name': '', 'scheduled_start_time': ''}
+NO_WAITING_VIEW = {'waiting_for_start': False, 'scheduled_start_time': '', 'waiting_program_name': ''}
+
+def snapshot_json(key, build):
+    """Respond with build(snapshot) as JSON, encoded once per published snapshot"""
+    body = display_state.snapshot.memo(key, lambda s: serialization.dumps(build(s)))
+    return app.response_class(body, mimetype='application/json')
+
+@app.after_request
+def compress_response(response):
+    return serialization.gzip_response(response, request.headers.get('Accept-Encoding'))
+
+# Opt-in profiling: ?profile=1 or X-Profile: 1 profiles that one request,
+# /api/admin/profiler samples the background threads (see profiling.py)
+PROFILED_THREADS = ('timer', 'auto_start', 'remote_sync')
+thread_profiler = profiling.SamplingProfiler(PROFILED_THREADS)
+PROFILE_FLAG_VALUES = ('1', 'true', 'yes')
+
+@app.before_request
+def start_request_profile():
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    if flag and flag.lower() in PROFILE_FLAG_VALUES:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def save_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        path = profiling.save_profile(f'{request.method}-{request.endpoint or "unknown"}', profiler)
+        response.headers['X-Profile-File'] = os.path.basename(path)
+        log.info('Profiled %s %s -> %s', request.method, request.path, path)
+    return response
+
+# Server-Timing breakdown on API responses (see server_timing.py). A client
+# X-Request-ID is echoed back; otherwise one is generated.
+@app.before_request
+def start_server_timing():
+    if request.path.startswith('/api/'):
+        supplied = request.headers.get('X-Request-ID', '')[:64]
+        g.request_id = supplied if supplied and all(ch.isalnum() or ch in '-_.' for ch in supplied) \
+            else uuid.uuid4().hex[:16]
+        server_timing.start()
+
+@app.after_request
+def add_server_timing(response):
+    value = server_timing.finish(g.get('request_id'))
+    if value:
+        response.headers['Server-Timing'] = value
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.teardown_request
+def clear_server_timing(exc):
+    server_timing.discard()
+
+# All control and logging writes go through this single writer thread
+db_writer = DatabaseWriter(DB_PATH)
+
+# Crash-safe journal of the in-memory state above, restored on boot
+state_journal = StateJournal()
+
+JOURNALED_SECTIONS = ('current_timer', 'queued_program')
+
+def _journaled_fields(section):
+    # time_remaining is recomputed from current_state every tick
+    return {k: v for k, v in section.items() if k != 'time_remaining'}
+
+def _journal_state_changes(old, new):
+    for name in JOURNALED_SECTIONS:
+        fields = _journaled_fields(new[name])
+        if fields != _journaled_fields(old[name]):
+            state_journal.record(name, fields)
+
+display_state.add_listener(_journal_state_changes)
+
+def persist_state(*keys):
+    """Journal the named globals so they survive a restart (non-blocking)"""
+    for key in keys:
+        state_journal.record(key, globals()[key])
+
+def restore_state():
+    """Restore the display state journaled before the last shutdown"""
+    global live_schedule_override
+
+    saved = state_journal.load()
+    live_schedule_override = saved.get('live_schedule_override')
+
+    # Running/paused flags always follow the database
+    state = get_current_state()
+    with display_state.edit() as draft:
+        draft['current_timer'].update(saved.get('current_timer', {}))
+        draft['queued_program'].update(saved.get('queued_program', {}))
+        draft['current_timer']['is_running'] = bool(state and state[0])
+        draft['current_timer']['is_paused'] = bool(state and state[0] and state[1])
+
+    if saved:
+        state_log.info('Restored %s from journal', ', '.join(sorted(saved)))
 
 def init_database():
-    conn = sqlite3.connect('church_timer.db')
-    return conn
+    # Timed connection: connect, queries and fetches show up in Server-Timing
+    with server_timing.span('db-connect'):
+        return sqlite3.connect(DB_PATH, factory=server_timing.TimedConnection)
 
 def get_current_state():
     conn = init_database()
@@ -61,287 +221,576 @@ def get_current_state():
     conn.close()
     return result
 
-def update_timer_display():
-    while True:
-        # Check countdown timer first - it takes priority
-        conn = init_database()
-        c = conn.cursor()
-        c.execute('''
-            SELECT id, name, target_time, started_at, duration_seconds, timer_type
-            FROM countdown_timers
-            WHERE is_active = TRUE
-            ORDER BY created_at DESC
-            LIMIT 1
-        ''')
-        countdown = c.fetchone()
-        conn.close()
-        
-        if countdown:
-            countdown_id, name, target_time_str, started_at_str, duration_seconds, timer_type = countdown
-            now = datetime.now()
-            
-            if timer_type == 'target_time' and target_time_str:
-                target_time = datetime.fromisoformat(target_time_str)
-            elif timer_type == 'duration' and started_at_str and duration_seconds:
-                started_at = datetime.fromisoformat(started_at_str)
-                target_time = started_at + timedelta(seconds=duration_seconds)
-            else:
-                time.sleep(1)
-                continue
+# Upcoming auto-start times across all programs (see recurrence.py)
+occurrence_cache = OccurrenceCache()
+
+def load_occurrence_cache():
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT id, recurrence, day_of_week, scheduled_start_time FROM programs WHERE auto_start = TRUE')
+    count = occurrence_cache.rebuild([(program_id, load_rule(recurrence, day), start_time)
+                                      for program_id, recurrence, day, start_time in c.fetchall()],
+                                     today=clock.today())
+    conn.close()
+    schedule_log.info('%d upcoming auto-starts cached', count)
+
+# Name search over activities and programs (see search_index.py)
+activity_index = NameIndex()
+program_index = NameIndex()
+
+def load_search_indexes():
+    conn = init_database()
+    c = conn.cursor()
+    activity_index.rebuild(c.execute('SELECT id, name FROM activities').fetchall())
+    program_index.rebuild(c.execute('SELECT id, name FROM programs').fetchall())
+    conn.close()
+
+# Stage messages live in memory; the database copy is written behind
+stage_queue = StageMessageQueue()
+
+def load_stage_messages():
+    """Queue the active messages that haven't ended yet"""
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, message, priority, starts_at, end_time, duration_seconds
+        FROM stage_messages
+        WHERE is_active = TRUE AND end_time > ?
+    ''', (clock.now(),))
+    rows = c.fetchall()
+    next_id = c.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM stage_messages').fetchone()[0]
+    conn.close()
+    messages = []
+    for message_id, text, priority, starts_at, end_time, duration in rows:
+        ends_at = datetime.fromisoformat(end_time)
+        starts_at = datetime.fromisoformat(starts_at) if starts_at else ends_at - timedelta(seconds=duration)
+        messages.append((message_id, text, priority, starts_at, ends_at))
+    stage_queue.load(messages, next_id)
+    publish_stage_messages()
+
+def publish_stage_messages():
+    display_state.update('stage_messages', version=stage_queue.version)
+
+def deactivate_stage_messages(message_ids):
+    if message_ids:
+        db_writer.submit(lambda c: c.executemany('UPDATE stage_messages SET is_active = FALSE WHERE id = ?',
+                                                 [(message_id,) for message_id in message_ids]))
+
+def refresh_program_occurrences(program_id):
+    """Re-expand one program's occurrences after it was created, edited or deleted"""
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT recurrence, day_of_week, scheduled_start_time, auto_start FROM programs WHERE id = ?',
+              (program_id,))
+    row = c.fetchone()
+    conn.close()
+    if row and row[3]:
+        occurrence_cache.set_program(program_id, load_rule(row[0], row[1]), row[2])
+    else:
+        occurrence_cache.remove_program(program_id)
+
+# The running countdown lives in memory; its countdown_timers row is only
+# read back at boot
+countdown_timeline = CountdownTimeline()
+
+def load_countdown():
+    """Resume the countdown that was active before the last shutdown"""
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, name, target_time, started_at, duration_seconds, timer_type, steps
+        FROM countdown_timers
+        WHERE is_active = TRUE
+        ORDER BY created_at DESC
+        LIMIT 1
+    ''')
+    row = c.fetchone()
+    conn.close()
+    if not row:
+        return
+    timer_id, name, target_time_str, started_at_str, duration_seconds, timer_type, steps = row
+    if steps:
+        timeline = timeline_from_json(json.loads(steps))
+    elif timer_type == 'target_time' and target_time_str:
+        timeline = [(name, datetime.fromisoformat(started_at_str or target_time_str), datetime.fromisoformat(target_time_str))]
+    elif timer_type == 'duration' and started_at_str and duration_seconds:
+        started_at = datetime.fromisoformat(started_at_str)
+        timeline = [(name, started_at, started_at + timedelta(seconds=duration_seconds))]
+    else:
+        return
+    countdown_timeline.start(timer_id, name, timer_type, timeline)
+    countdown_log.info("Resumed: '%s'", name)
+
+def publish_countdown(now):
+    """Show the countdown step at now; returns False when no countdown is running"""
+    position = countdown_timeline.position(now)
+    if position is None:
+        return False
+    countdown, index, expired = position
+    steps = countdown['steps']
+    name, _, target_time = steps[index]
+    total_seconds = 0 if expired else int((target_time - now).total_seconds())
+
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+
+    if len(steps) > 1 and not expired and display_state['countdown_timer']['step'] != index:
+        countdown_log.info("'%s' step %d/%d: %s", countdown['name'], index + 1, len(steps), name)
+
+    display_state.update('countdown_timer',
+                         is_active=True,
+                         name=name,
+                         target_time=target_time.isoformat(),
+                         time_remaining=f"{hours:02d}:{minutes:02d}:{seconds:02d}",
+                         is_expired=expired,
+                         timer_type=countdown['timer_type'],
+                         sequence_name=countdown['name'] if len(steps) > 1 else '',
+                         step=index,
+                         steps=[[step, ends_at.isoformat()] for step, _, ends_at in steps] if len(steps) > 1 else [])
+    return True
+
+def timer_tick():
+    """One pass of the timer thread: refresh the countdown or program timer and
+    advance to the next item when the current one runs out"""
+    # Countdown timer first - it takes priority
+    if not publish_countdown(clock.now()):
+        # No countdown timer active
+        display_state.update('countdown_timer', is_active=False, is_expired=False,
+                             sequence_name='', step=0, steps=[])
+        
+        # Continue with regular program timer
+        state = get_current_state()
+        if state and state[0] and not state[1]:  # Running and not paused
+            start_time = datetime.fromisoformat(state[2])
+            duration = state[4] * 60  # Convert to seconds
+            end_time = start_time + timedelta(seconds=duration)
+            now = clock.now()
             
-            if now < target_time:
-                remaining = target_time - now
+            if now < end_time:
+                remaining = end_time - now
                 total_seconds = int(remaining.total_seconds())
                 
+                # Convert to hours:minutes:seconds format
                 hours = total_seconds // 3600
                 minutes = (total_seconds % 3600) // 60
                 seconds = total_seconds % 60
                 
-                countdown_timer['is_active'] = True
-                countdown_timer['name'] = name
-                countdown_timer['target_time'] = target_time.isoformat()
-                countdown_timer['time_remaining'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                countdown_timer['is_expired'] = False
-                countdown_timer['timer_type'] = timer_type
+                # Always show hours:minutes:seconds format with leading zeros
+                display_state.update('current_timer',
+                                     time_remaining=f"{hours:02d}:{minutes:02d}:{seconds:02d}",
+                                     end_time=end_time.isoformat(),
+                                     current_activity=state[3],
+                                     is_running=True,
+                                     is_paused=False)
             else:
-                # Countdown expired
-                countdown_timer['is_active'] = True
-                countdown_timer['name'] = name
-                countdown_timer['target_time'] = target_time.isoformat()
-                countdown_timer['time_remaining'] = "00:00:00"
-                countdown_timer['is_expired'] = True
-                countdown_timer['timer_type'] = timer_type
-        else:
-            # No countdown timer active
-            countdown_timer['is_active'] = False
-            countdown_timer['is_expired'] = False
-            
-            # Continue with regular program timer
-            state = get_current_state()
-            if state and state[0] and not state[1]:  # Running and not paused
-                start_time = datetime.fromisoformat(state[2])
-                duration = state[4] * 60  # Convert to seconds
-                end_time = start_time + timedelta(seconds=duration)
-                now = datetime.now()
-                
-                if now < end_time:
-                    remaining = end_time - now
-                    total_seconds = int(remaining.total_seconds())
-                    
-                    # Convert to hours:minutes:seconds format
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    
-                    # Always show hours:minutes:seconds format with leading zeros
-                    current_timer['time_remaining'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                    
-                    current_timer['current_activity'] = state[3]
-                    current_timer['is_running'] = True
-                    current_timer['is_paused'] = False
-                else:
-                    # Move to next item
-                    move_to_next_item()
-        time.sleep(1)
+                # Move to next item - wait so the next tick sees it
+                # (errors are reported by the writer thread)
+                move_to_next_item().exception()
+
+def update_timer_display():
+    while True:
+        health.heartbeat('timer')
+        timer_tick()
+        clock.sleep(1)
 
 # Threads are started in main block after database init
 
 # Auto-start checker thread
-def auto_start_checker():
-    """Background thread that continuously checks for programs to auto-start"""
-    global queued_program
-    last_check_minute = None
+AUTO_START_INTERVAL = 30  # seconds; starts still only trigger once per minute
 
-    while True:
+class AutoStartChecker:
+    """Starts queued and scheduled programs when their minute arrives"""
+
+    def __init__(self):
+        self.last_check_minute = None
+        self.last_promoted_day = clock.today()  # the boot-time promotion covers today
+
+    def tick(self):
         try:
-            now = datetime.now()
+            now = clock.now()
             current_minute = (now.hour, now.minute)
 
+            # At midnight, switch to the programs prefetched for the new day
+            if now.date() != self.last_promoted_day:
+                self.last_promoted_day = now.date()
+                promote_staged_programs(self.last_promoted_day)
+
             # Only check once per minute to avoid duplicate starts
-            if current_minute != last_check_minute:
-                last_check_minute = current_minute
+            if current_minute != self.last_check_minute:
+                self.last_check_minute = current_minute
                 current_time = now.strftime('%H:%M')
 
                 # Priority 1: Start queued program when its time arrives
                 # This overrides even manually running programs
+                queued_program = display_state['queued_program']
                 if queued_program['has_queued'] and queued_program['scheduled_start_time'] == current_time:
                     program_id = queued_program['program_id']
                     program_name = queued_program['program_name']
-                    print(f"[AUTO-START] Queued program time arrived: {program_name}")
+                    auto_start_log.info('Queued program time arrived: %s', program_name)
 
                     try:
                         start_program_smart_internal(program_id)
-                        print(f"[AUTO-START] Successfully started queued program: {program_name}")
+                        auto_start_log.info('Successfully started queued program: %s', program_name)
                     except Exception as e:
-                        print(f"[AUTO-START] Error starting queued program: {e}")
+                        auto_start_log.exception('Error starting queued program: %s', e)
 
                 else:
                     # Priority 2: Normal auto-start check (only if nothing running and no manual override)
                     conn = init_database()
                     c = conn.cursor()
 
-                    current_day = now.strftime('%A')
-
                     c.execute('SELECT is_running, manual_override FROM current_state WHERE id = 1')
                     result = c.fetchone()
 
-                    if not result or (not result[0] and not result[1]):
-                        c.execute('''
-                            SELECT id, name, scheduled_start_time
-                            FROM programs
-                            WHERE day_of_week = ? AND auto_start = TRUE AND scheduled_start_time = ?
-                            LIMIT 1
-                        ''', (current_day, current_time))
+                    minute_start = now.replace(second=0, microsecond=0)
+                    due = occurrence_cache.starting_between(minute_start, minute_start + timedelta(minutes=1))
 
+                    if due and (not result or (not result[0] and not result[1])):
+                        c.execute('SELECT id, name, scheduled_start_time FROM programs WHERE id = ?', (due[0][1],))
                         program = c.fetchone()
 
                         if program:
                             program_id, program_name, scheduled_start_time = program
-                            print(f"[AUTO-START] Starting program: {program_name} at {scheduled_start_time}")
+                            auto_start_log.info('Starting program: %s at %s', program_name, scheduled_start_time)
 
                             try:
                                 start_program_smart_internal(program_id)
-                                print(f"[AUTO-START] Successfully started program: {program_name}")
+                                auto_start_log.info('Successfully started program: %s', program_name)
                             except Exception as e:
-                                print(f"[AUTO-START] Error starting program {program_name}: {e}")
+                                auto_start_log.exception('Error starting program %s: %s', program_name, e)
 
                     conn.close()
 
         except Exception as e:
-            print(f"[AUTO-START] Error in auto-start checker: {e}")
+            auto_start_log.exception('Error in auto-start checker: %s', e)
 
-        # Check every 30 seconds (will only trigger once per minute due to last_check_minute)
-        time.sleep(30)
+def auto_start_checker():
+    """Background thread that continuously checks for programs to auto-start"""
+    checker = AutoStartChecker()
+    while True:
+        health.heartbeat('auto_start')
+        checker.tick()
+        clock.sleep(AUTO_START_INTERVAL)
 
 # Auto-start thread is started in main block after database init
 
 # Remote program sync
 REMOTE_PROGRAMS_URL = 'https://app.rfm.org.za/api/programs/today'
-remote_program_hashes = {}  # {remote_id: hash} for change detection
+REMOTE_PROGRAMS_DATE_URL = 'https://app.rfm.org.za/api/programs/{date}'
+REMOTE_PREFETCH_DAYS = 7
+REMOTE_POLL_INTERVAL = 600  # seconds
+# While the RFM app is pushing updates the poll is only a safety net
+REMOTE_SAFETY_POLL_INTERVAL = 3600
+# Shared secret for POST /api/remote/programs; pushes are refused if unset
+REMOTE_WEBHOOK_SECRET = os.environ.get('RFM_WEBHOOK_SECRET', '')
+
+remote_apply_lock = threading.Lock()  # poll and push apply one at a time
+remote_push_queue = queue.Queue()
+last_remote_push = None  # time.monotonic() of the last accepted push
+
+def remote_schedule_items(items):
+    """[(activity name, minutes)] from remote program_items, timed by the gaps between them"""
+    schedule_items = []
+    for i, item in enumerate(items):
+        item_time = item.get('time', '')
+        item_name = item.get('item', '')
+        if not item_time or not item_name:
+            continue
+
+        # Duration = difference to next item's time, default 5 min for last item
+        if i < len(items) - 1:
+            next_time = items[i + 1].get('time', '')
+            try:
+                t1 = datetime.strptime(item_time, '%H:%M')
+                t2 = datetime.strptime(next_time, '%H:%M')
+                duration = int((t2 - t1).total_seconds() / 60)
+                if duration <= 0:
+                    duration = 5
+            except ValueError:
+                duration = 5
+        else:
+            duration = 5
+
+        schedule_items.append((item_name, duration))
+    return schedule_items
+
+def load_remote_sync_state():
+    """{remote_id: hash} of synced programs whose local copy still exists"""
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('''
+        SELECT s.remote_id, s.hash FROM remote_sync_state s
+        JOIN programs p ON p.id = s.program_id
+    ''')
+    synced = dict(c.fetchall())
+    conn.close()
+    return synced
+
+def apply_remote_programs(programs):
+    """Write new or changed remote programs; unchanged ones cost no writes.
+
+    Returns True if every program was applied.
+    """
+    with remote_apply_lock:
+        return _apply_remote_programs(programs)
+
+def _index_remote_program(program_id):
+    # Remote programs bring their own item names, so pick up any new activities too
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT name FROM programs WHERE id = ?', (program_id,))
+    program_index.add(program_id, c.fetchone()[0])
+    c.execute('''SELECT a.id, a.name FROM program_schedules ps JOIN activities a ON a.id = ps.activity_id
+                 WHERE ps.program_id = ?''', (program_id,))
+    for activity_id, name in c.fetchall():
+        activity_index.add(activity_id, name)
+    conn.close()
+
+def _apply_remote_programs(programs):
+    synced = load_remote_sync_state()
+    ok = True
+
+    for prog in programs:
+        remote_id = prog.get('id')
+        prog_hash = prog.get('hash', '')
+        title = prog.get('title', 'Untitled Program')
+        items = prog.get('program_items', [])
+
+        if not remote_id or not items:
+            continue
+
+        # Check if hash changed
+        if synced.get(str(remote_id)) == prog_hash:
+            continue
+
+        sync_log.info('New/updated program: %s (hash: %s)', title, prog_hash, extra={'remote_id': str(remote_id)})
+
+        schedule_items = remote_schedule_items(items)
+        if not schedule_items:
+            continue
+
+        # First item's time is the program start time
+        start_time = items[0].get('time', '')
+        today_day = clock.now().strftime('%A')
+
+        try:
+            # Applied on the writer thread; a newer copy of the same
+            # remote program still in the queue replaces this one
+            program_id = db_writer.submit(
+                partial(save_remote_program, remote_id=str(remote_id), prog_hash=prog_hash,
+                        title=title, start_time=start_time,
+                        day_of_week=today_day, schedule_items=schedule_items),
+                coalesce_key=('remote_program', str(remote_id))).result()
+        except Exception as e:
+            sync_log.error('DB error syncing %s: %s', title, e)
+            ok = False
+            continue
+
+        refresh_program_occurrences(program_id)
+        _index_remote_program(program_id)
+        refresh_projection(program_id)
+        sync_log.info('Synced program: %s with %d items', title, len(schedule_items), extra={'remote_id': str(remote_id), 'program_id': program_id})
+
+        # Trigger waiting state if program hasn't started yet
+        try:
+            state = get_current_state()
+            if not state or not state[0]:
+                start_program_smart_internal(program_id)
+        except Exception as e:
+            sync_log.exception('Error setting waiting state: %s', e)
+
+    return ok
+
+def fetch_remote_programs(etag=None):
+    """GET the remote feed; returns (programs, etag), programs is None if unchanged since etag"""
+    headers = {'Accept': 'application/json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    req = urllib.request.Request(REMOTE_PROGRAMS_URL, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=15) as response:
+            data = json.loads(response.read().decode('utf-8'))
+            return data.get('programs', []), response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+def fetch_remote_programs_for(day):
+    req = urllib.request.Request(REMOTE_PROGRAMS_DATE_URL.format(date=day.isoformat()),
+                                 headers={'Accept': 'application/json'})
+    with urllib.request.urlopen(req, timeout=15) as response:
+        return json.loads(response.read().decode('utf-8')).get('programs', [])
+
+def prefetch_remote_week(today=None):
+    """Stage the coming week's remote programs so each day can start offline.
+
+    Days that fail to download keep their previously staged copy. Nothing is
+    written unless a staged program changed. Returns the number of programs
+    staged.
+    """
+    today = today or clock.today()
+    fetched = {}
+    for offset in range(1, REMOTE_PREFETCH_DAYS + 1):
+        day = (today + timedelta(days=offset)).isoformat()
+        try:
+            fetched[day] = [prog for prog in fetch_remote_programs_for(today + timedelta(days=offset))
+                            if prog.get('id') and prog.get('program_items')]
+        except Exception as e:
+            sync_log.warning('Could not prefetch %s: %s', day, e)
+
+    rows = [(str(prog['id']), day, prog.get('hash', ''), json.dumps(prog))
+            for day, programs in fetched.items() for prog in programs]
+
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT remote_id, service_date, hash FROM remote_staged_programs')
+    staged = c.fetchall()
+    conn.close()
+
+    expired = any(day < today.isoformat() for _, day, _ in staged)
+    unchanged = ({(rid, day): h for rid, day, h in staged if day in fetched}
+                 == {(rid, day): h for rid, day, h, _ in rows})
+    if unchanged and not expired:
+        return 0
+
+    db_writer.submit(partial(stage_remote_programs, today=today.isoformat(), days=sorted(fetched), rows=rows),
+                     coalesce_key=('remote_prefetch',)).result()
+    sync_log.info('Staged %d program(s) for the next %d days', len(rows), REMOTE_PREFETCH_DAYS)
+    return len(rows)
+
+def stage_remote_programs(c, today, days, rows):
+    # One transaction for the whole window
+    c.execute('DELETE FROM remote_staged_programs WHERE service_date < ?', (today,))
+    c.executemany('DELETE FROM remote_staged_programs WHERE service_date = ?', [(day,) for day in days])
+    fetched_at = clock.now().isoformat()
+    c.executemany('''INSERT INTO remote_staged_programs (remote_id, service_date, hash, payload, fetched_at)
+                     VALUES (?, ?, ?, ?, ?)''', [row + (fetched_at,) for row in rows])
+
+def promote_staged_programs(day=None):
+    """Apply the programs prefetched for `day` (default today) - no network needed"""
+    day = day or clock.today()
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT payload FROM remote_staged_programs WHERE service_date = ?', (day.isoformat(),))
+    programs = [json.loads(row[0]) for row in c.fetchall()]
+    conn.close()
+
+    if programs:
+        sync_log.info('Promoting %d prefetched program(s) for %s', len(programs), day.isoformat())
+        apply_remote_programs(programs)
+
+def load_remote_feed_etag():
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT etag FROM remote_feed_state WHERE url = ?', (REMOTE_PROGRAMS_URL,))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def save_remote_feed_etag(etag):
+    db_writer.execute('''
+        INSERT OR REPLACE INTO remote_feed_state (url, etag, updated_at) VALUES (?, ?, ?)
+    ''', (REMOTE_PROGRAMS_URL, etag, clock.now().isoformat()),
+        coalesce_key=('remote_feed', REMOTE_PROGRAMS_URL))
 
 def sync_programs_from_remote():
     """Background thread that polls the remote API for today's programs every 10 minutes"""
-    global remote_program_hashes
+    etag = load_remote_feed_etag()
 
     while True:
+        health.heartbeat('remote_sync')
         try:
-            req = urllib.request.Request(REMOTE_PROGRAMS_URL, headers={'Accept': 'application/json'})
-            with urllib.request.urlopen(req, timeout=15) as response:
-                data = json.loads(response.read().decode('utf-8'))
-
-            programs = data.get('programs', [])
-            if not programs:
-                print("[REMOTE SYNC] No programs for today")
-                time.sleep(600)
-                continue
-
-            for prog in programs:
-                remote_id = prog.get('id')
-                prog_hash = prog.get('hash', '')
-                title = prog.get('title', 'Untitled Program')
-                items = prog.get('program_items', [])
-
-                if not remote_id or not items:
-                    continue
-
-                # Check if hash changed
-                if remote_program_hashes.get(remote_id) == prog_hash:
-                    continue
-
-                print(f"[REMOTE SYNC] New/updated program: {title} (hash: {prog_hash})")
-
-                # Calculate durations from time gaps between items
-                schedule_items = []
-                for i, item in enumerate(items):
-                    item_time = item.get('time', '')
-                    item_name = item.get('item', '')
-                    if not item_time or not item_name:
-                        continue
-
-                    # Duration = difference to next item's time, default 5 min for last item
-                    if i < len(items) - 1:
-                        next_time = items[i + 1].get('time', '')
-                        try:
-                            t1 = datetime.strptime(item_time, '%H:%M')
-                            t2 = datetime.strptime(next_time, '%H:%M')
-                            duration = int((t2 - t1).total_seconds() / 60)
-                            if duration <= 0:
-                                duration = 5
-                        except ValueError:
-                            duration = 5
-                    else:
-                        duration = 5
-
-                    schedule_items.append((item_name, duration))
-
-                if not schedule_items:
-                    continue
-
-                # First item's time is the program start time
-                start_time = items[0].get('time', '')
-                today_day = datetime.now().strftime('%A')
-
-                conn = init_database()
-                c = conn.cursor()
-                try:
-                    # Check if program already exists (by title)
-                    c.execute('SELECT id FROM programs WHERE name = ?', (title,))
-                    existing = c.fetchone()
-
-                    if existing:
-                        program_id = existing[0]
-                        # Update program details
-                        c.execute('''UPDATE programs
-                                     SET scheduled_start_time = ?, day_of_week = ?, auto_start = TRUE
-                                     WHERE id = ?''', (start_time, today_day, program_id))
-                        # Clear old schedule
-                        c.execute('DELETE FROM program_schedules WHERE program_id = ?', (program_id,))
-                    else:
-                        # Create new program
-                        c.execute('''INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start)
-                                     VALUES (?, ?, ?, ?, TRUE)''',
-                                  (title, f'Synced from RFM app', start_time, today_day))
-                        program_id = c.lastrowid
-
-                    # Create activities if they don't exist, then add to schedule
-                    for sort_order, (activity_name, duration) in enumerate(schedule_items):
-                        # Get or create activity
-                        c.execute('SELECT id FROM activities WHERE name = ?', (activity_name,))
-                        activity_row = c.fetchone()
-                        if activity_row:
-                            activity_id = activity_row[0]
-                        else:
-                            c.execute('INSERT INTO activities (name, default_duration) VALUES (?, ?)',
-                                      (activity_name, duration))
-                            activity_id = c.lastrowid
-
-                        c.execute('''INSERT INTO program_schedules (program_id, activity_id, duration_minutes, sort_order)
-                                     VALUES (?, ?, ?, ?)''',
-                                  (program_id, activity_id, duration, sort_order))
-
-                    conn.commit()
-                    remote_program_hashes[remote_id] = prog_hash
-                    print(f"[REMOTE SYNC] Synced program: {title} with {len(schedule_items)} items")
-
-                    # Trigger waiting state if program hasn't started yet
-                    try:
-                        c.execute('SELECT is_running FROM current_state WHERE id = 1')
-                        state = c.fetchone()
-                        if not state or not state[0]:
-                            start_program_smart_internal(program_id)
-                    except Exception as e:
-                        print(f"[REMOTE SYNC] Error setting waiting state: {e}")
+            programs, new_etag = fetch_remote_programs(etag)
 
-                except Exception as e:
-                    conn.rollback()
-                    print(f"[REMOTE SYNC] DB error syncing {title}: {e}")
-                finally:
-                    conn.close()
+            if programs is None:
+                pass  # 304 - nothing changed upstream
+            elif not programs:
+                sync_log.info('No programs for today')
+            elif not apply_remote_programs(programs):
+                # Keep the old ETag so the next poll fetches the feed in full again
+                new_etag = etag
 
+            if new_etag != etag:
+                save_remote_feed_etag(new_etag)
+                etag = new_etag
+
+        except Exception as e:
+            sync_log.warning('Error fetching remote programs: %s', e)
+
+        try:
+            prefetch_remote_week()
         except Exception as e:
-            print(f"[REMOTE SYNC] Error fetching remote programs: {e}")
+            sync_log.exception('Error prefetching remote programs: %s', e)
 
-        time.sleep(600)  # Poll every 10 minutes
+        pushing = last_remote_push is not None and time.monotonic() - last_remote_push < REMOTE_SAFETY_POLL_INTERVAL
+        time.sleep(REMOTE_SAFETY_POLL_INTERVAL if pushing else REMOTE_POLL_INTERVAL)
+
+def remote_push_worker():
+    """Background thread that applies pushed program payloads off the request thread"""
+    while True:
+        health.heartbeat('remote_push')
+        try:
+            programs = remote_push_queue.get(timeout=30)
+        except queue.Empty:
+            continue
+
+        # Fold in anything else already queued; the newest copy of each program wins
+        latest = {str(prog.get('id')): prog for prog in programs}
+        while True:
+            try:
+                latest.update((str(prog.get('id')), prog) for prog in remote_push_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            apply_remote_programs(list(latest.values()))
+        except Exception as e:
+            push_log.exception('Error applying pushed programs: %s', e)
+
+def save_remote_program(c, remote_id, prog_hash, title, start_time, day_of_week, schedule_items):
+    """Create or replace a synced program and its schedule; returns the program id"""
+    # Check if program already exists (by title)
+    c.execute('SELECT id FROM programs WHERE name = ?', (title,))
+    existing = c.fetchone()
+
+    if existing:
+        program_id = existing[0]
+        # Update program details
+        c.execute('''UPDATE programs
+                     SET scheduled_start_time = ?, day_of_week = ?, auto_start = TRUE
+                     WHERE id = ?''', (start_time, day_of_week, program_id))
+        # Clear old schedule
+        c.execute('DELETE FROM program_schedules WHERE program_id = ?', (program_id,))
+    else:
+        # Create new program
+        c.execute('''INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start)
+                     VALUES (?, ?, ?, ?, TRUE)''',
+                  (title, f'Synced from RFM app', start_time, day_of_week))
+        program_id = c.lastrowid
+
+    # Create activities if they don't exist, then add to schedule
+    for sort_order, (activity_name, duration) in enumerate(schedule_items):
+        # Get or create activity
+        c.execute('SELECT id FROM activities WHERE name = ?', (activity_name,))
+        activity_row = c.fetchone()
+        if activity_row:
+            activity_id = activity_row[0]
+        else:
+            c.execute('INSERT INTO activities (name, default_duration) VALUES (?, ?)',
+                      (activity_name, duration))
+            activity_id = c.lastrowid
+
+        c.execute('''INSERT INTO program_schedules (program_id, activity_id, duration_minutes, sort_order)
+                     VALUES (?, ?, ?, ?)''',
+                  (program_id, activity_id, duration, sort_order))
+
+    # Recorded in the same transaction, so the hash never gets ahead of the data
+    c.execute('''INSERT OR REPLACE INTO remote_sync_state (remote_id, hash, program_id, last_synced_at)
+                 VALUES (?, ?, ?, ?)''', (remote_id, prog_hash, program_id, clock.now().isoformat()))
+
+    return program_id
 
 # Helper functions for smart start
 def calculate_current_activity(program_id):
@@ -368,7 +817,7 @@ def calculate_current_activity(program_id):
     schedule_items = c.fetchall()
     
     # Calculate current time and scheduled start time
-    now = datetime.now()
+    now = clock.now()
     try:
         # Parse scheduled start time (e.g., "09:30")
         scheduled_hour, scheduled_minute = map(int, scheduled_start_str.split(':'))
@@ -403,18 +852,70 @@ def calculate_current_activity(program_id):
     conn.close()
     return current_schedule_id
 
-def move_to_next_item():
-    conn = init_database()
-    c = conn.cursor()
-    
+def log_service_event(event, occurred_at=None):
+    """Queue a service_runs history row for the current activity"""
+    occurred_at = occurred_at or clock.now()
+    return db_writer.submit(partial(_insert_service_event, event=event, occurred_at=occurred_at))
+
+def _insert_service_event(c, event, occurred_at):
+    # Inserts nothing unless a program is running
+    c.execute('''
+        INSERT INTO service_runs (program_id, program_name, schedule_id, activity_id, activity_name,
+                                  planned_seconds, event, occurred_at)
+        SELECT cs.current_program_id, p.name, ps.id, a.id, a.name, ps.duration_minutes * 60, ?, ?
+        FROM current_state cs
+        JOIN program_schedules ps ON ps.id = cs.current_schedule_id
+        JOIN activities a ON a.id = ps.activity_id
+        LEFT JOIN programs p ON p.id = cs.current_program_id
+        WHERE cs.id = 1 AND cs.is_running
+    ''', (event, occurred_at.isoformat()))
+
+def move_to_next_item(finished_event='end'):
+    """Queue the move to the next schedule item; returns the write's Future.
+
+    finished_event is recorded for the item being left: 'end' when its time
+    ran out, 'skip' when the operator moved on early.
+    """
+    return after_commit(db_writer.submit(partial(_advance_to_next_item, finished_event=finished_event)),
+                        _apply_advance)
+
+def after_commit(future, apply):
+    """Call apply(result) once future's write has committed; never if it failed"""
+    future.add_done_callback(lambda f: f.exception() is None and apply(f.result()))
+    return future
+
+def _apply_advance(outcome):
+    # outcome: (next schedule id or None at the end, when), or None if nothing was running
+    if outcome is None:
+        return
+    schedule_id, now = outcome
+    if schedule_id is not None:
+        projection.advance(schedule_id, now)
+        return
+
+    # End of program: restore the waiting view if there's a queued program
+    projection.clear()
+    with display_state.edit() as draft:
+        queued_program = draft['queued_program']
+        if queued_program['has_queued']:
+            draft['current_timer'].update({
+                'waiting_for_start': True,
+                'scheduled_start_time': queued_program['scheduled_start_time'],
+                'waiting_program_name': queued_program['program_name']
+            })
+
+def _advance_to_next_item(c, finished_event):
+    # Runs on the writer thread so it sees every earlier queued write
     c.execute('SELECT current_program_id, current_schedule_id FROM current_state WHERE id = 1')
     result = c.fetchone()
     
     if result and result[0]:
         program_id, current_schedule_id = result
+        now = clock.now()
+        _insert_service_event(c, finished_event, now)
         
         # Get current schedule (with live override if available)
-        schedule = get_current_schedule()
+        schedule = get_current_schedule(c)
         
         # Find current item index
         current_index = None
@@ -430,48 +931,94 @@ def move_to_next_item():
                 UPDATE current_state 
                 SET current_schedule_id = ?, start_time = ?, is_paused = FALSE
                 WHERE id = 1
-            ''', (next_item['id'], datetime.now().isoformat()))
+            ''', (next_item['id'], now.isoformat()))
+            _insert_service_event(c, 'start', now)
+            return next_item['id'], now
         else:
             # End of program
             c.execute('UPDATE current_state SET is_running = FALSE, manual_override = FALSE WHERE id = 1')
+            return None, now
 
-            # Restore waiting view if there's a queued program
-            if queued_program['has_queued']:
-                current_timer['waiting_for_start'] = True
-                current_timer['scheduled_start_time'] = queued_program['scheduled_start_time']
-                current_timer['waiting_program_name'] = queued_program['program_name']
-
-        conn.commit()
-
-    conn.close()
-
-def get_current_schedule():
+def get_current_schedule(c=None):
     """Get the current schedule, using live override if available"""
     if live_schedule_override:
         return live_schedule_override
     
-    # Otherwise get from database
-    conn = init_database()
-    c = conn.cursor()
+    # Otherwise get from database, reusing the caller's cursor if given
+    conn = init_database() if c is None else None
+    if conn:
+        c = conn.cursor()
     c.execute('SELECT current_program_id FROM current_state WHERE id = 1')
     result = c.fetchone()
     
-    if result and result[0]:
-        program_id = result[0]
-        c.execute('''
-            SELECT ps.id, a.name, ps.duration_minutes, ps.sort_order, ps.activity_id
-            FROM program_schedules ps
-            JOIN activities a ON ps.activity_id = a.id
-            WHERE ps.program_id = ?
-            ORDER BY ps.sort_order
-        ''', (program_id,))
-        schedule = [{'id': row[0], 'activity_name': row[1], 'duration_minutes': row[2], 
-                    'sort_order': row[3], 'activity_id': row[4]} for row in c.fetchall()]
+    schedule = get_program_schedule(c, result[0]) if result and result[0] else []
+
+    if conn:
         conn.close()
-        return schedule
-    
-    conn.close()
-    return []
+    return schedule
+
+def get_program_schedule(c, program_id):
+    """A program's stored schedule items in order"""
+    c.execute('''
+        SELECT ps.id, a.name, ps.duration_minutes, ps.sort_order, ps.activity_id
+        FROM program_schedules ps
+        JOIN activities a ON ps.activity_id = a.id
+        WHERE ps.program_id = ?
+        ORDER BY ps.sort_order
+    ''', (program_id,))
+    return [{'id': row[0], 'activity_name': row[1], 'duration_minutes': row[2], 
+             'sort_order': row[3], 'activity_id': row[4]} for row in c.fetchall()]
+
+# Projected timeline of the running program, moved by the events below
+# (see projection.py); only program starts and schedule edits re-read SQL
+projection = ProjectedTimeline()
+
+def scheduled_start_today(scheduled_start_str):
+    try:
+        hour, minute = map(int, scheduled_start_str.split(':'))
+    except (AttributeError, ValueError):
+        return None
+    return clock.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+def read_projection(c):
+    """projection.start() arguments for what current_state says is running, or None"""
+    c.execute('''
+        SELECT cs.is_running, cs.is_paused, cs.start_time, cs.paused_at, cs.current_schedule_id,
+               p.id, p.name, p.scheduled_start_time
+        FROM current_state cs
+        LEFT JOIN programs p ON p.id = cs.current_program_id
+        WHERE cs.id = 1
+    ''')
+    row = c.fetchone()
+    if not (row and row[0] and row[2] and row[5]):
+        return None
+    is_paused, start_time, paused_at, schedule_id, program_id, name, scheduled_start_str = row[1:]
+    return ({'id': program_id, 'name': name, 'scheduled_start': scheduled_start_today(scheduled_start_str)},
+            get_current_schedule(c), schedule_id, datetime.fromisoformat(start_time),
+            datetime.fromisoformat(paused_at) if is_paused and paused_at else None)
+
+def apply_projection(state):
+    if state is None:
+        projection.clear()
+    else:
+        projection.start(*state)
+
+def sync_projection():
+    """Rebuild the projection from current_state and the live schedule (boot)"""
+    conn = init_database()
+    try:
+        apply_projection(read_projection(conn.cursor()))
+    finally:
+        conn.close()
+
+def resync_projection():
+    """Rebuild the projection after the writes queued so far have committed"""
+    after_commit(db_writer.submit(read_projection), apply_projection)
+
+def refresh_projection(program_id):
+    """Re-project after the running program's stored schedule or start time changed"""
+    if program_id == projection.program_id:
+        resync_projection()
 
 # Add new endpoint for live schedule reordering
 @app.route('/api/live_schedule/reorder', methods=['POST'])
@@ -498,6 +1045,8 @@ def reorder_live_schedule():
             item = schedule_dict[schedule_id].copy()
             item['sort_order'] = new_order
             live_schedule_override.append(item)
+    persist_state('live_schedule_override')
+    projection.reorder(live_schedule_override)
     
     return jsonify({'status': 'success', 'message': 'Live schedule reordered'})
 
@@ -506,8 +1055,12 @@ def reorder_live_schedule():
 def get_live_schedule():
     """Get the current live schedule with current activity marked"""
     conn = init_database()
-    c = conn.cursor()
-    
+    try:
+        return jsonify(live_schedule_info(conn.cursor()))
+    finally:
+        conn.close()
+
+def live_schedule_info(c):
     # Get current state
     c.execute('''
         SELECT current_program_id, current_schedule_id, is_running
@@ -516,21 +1069,21 @@ def get_live_schedule():
     state = c.fetchone()
     
     if not state or not state[0]:
-        conn.close()
-        return jsonify({'schedule': [], 'current_schedule_id': None, 'is_running': False})
+        return {'schedule': [], 'current_schedule_id': None, 'is_running': False}
     
     program_id, current_schedule_id, is_running = state
     
     # Get schedule (use live override if available)
-    schedule = get_current_schedule()
-    
-    conn.close()
-    
-    return jsonify({
-        'schedule': schedule,
+    return {
+        'schedule': get_current_schedule(c),
         'current_schedule_id': current_schedule_id,
         'is_running': is_running
-    })
+    }
+
+@app.route('/api/projected_timeline')
+def projected_timeline():
+    """Projected start/end of every remaining item and the overrun versus scheduled_start_time"""
+    return jsonify(projection.project(clock.now()))
 
 # Auto-start function - called on app startup
 def check_and_auto_start():
@@ -538,9 +1091,6 @@ def check_and_auto_start():
     conn = init_database()
     c = conn.cursor()
     
-    # Get current day of week (e.g., "Monday", "Sunday")
-    current_day = datetime.now().strftime('%A')
-    
     # Check if there's already a program running OR if manual override is active
     c.execute('SELECT is_running, manual_override FROM current_state WHERE id = 1')
     result = c.fetchone()
@@ -550,33 +1100,27 @@ def check_and_auto_start():
         conn.close()
         return
     
-    # Find programs set to auto-start for today
-    c.execute('''
-        SELECT id, name, scheduled_start_time 
-        FROM programs 
-        WHERE day_of_week = ? AND auto_start = TRUE
-        ORDER BY scheduled_start_time
-        LIMIT 1
-    ''', (current_day,))
-    
-    program = c.fetchone()
+    # Find the first program set to auto-start today
+    program = None
+    today = occurrence_cache.on(clock.now().date())
+    if today:
+        c.execute('SELECT id, name, scheduled_start_time FROM programs WHERE id = ?', (today[0][1],))
+        program = c.fetchone()
     conn.close()
     
     if program:
         program_id, program_name, scheduled_start_time = program
-        print(f"Auto-starting program: {program_name} (ID: {program_id}) scheduled for {scheduled_start_time}")
+        auto_start_log.info('Auto-starting program: %s (ID: %s) scheduled for %s', program_name, program_id, scheduled_start_time)
         
         # Use smart start to begin the program
         try:
             # This will handle the waiting state if needed
             start_program_smart_internal(program_id)
         except Exception as e:
-            print(f"Error auto-starting program: {e}")
+            auto_start_log.exception('Error auto-starting program: %s', e)
 
 def start_program_smart_internal(program_id):
     """Internal function to start a program smartly (used by auto-start)"""
-    global queued_program
-
     conn = init_database()
     c = conn.cursor()
 
@@ -593,7 +1137,7 @@ def start_program_smart_internal(program_id):
     # Parse scheduled start time
     try:
         scheduled_hour, scheduled_minute = map(int, scheduled_start_str.split(':'))
-        now = datetime.now()
+        now = clock.now()
         scheduled_start = now.replace(hour=scheduled_hour, minute=scheduled_minute, second=0, microsecond=0)
     except ValueError:
         conn.close()
@@ -601,38 +1145,36 @@ def start_program_smart_internal(program_id):
 
     # Check if current time is before scheduled start
     if now < scheduled_start:
-        # Always queue the program (persists through manual starts)
-        queued_program.update({
-            'has_queued': True,
-            'program_id': program_id,
-            'program_name': program_name,
-            'scheduled_start_time': scheduled_start_str
-        })
-        print(f"Program {program_name} queued for {scheduled_start_str}")
-
-        # Only show waiting view if nothing is currently running
         c.execute('SELECT is_running FROM current_state WHERE id = 1')
         state = c.fetchone()
-        if not state or not state[0]:
-            current_timer['waiting_for_start'] = True
-            current_timer['scheduled_start_time'] = scheduled_start_str
-            current_timer['waiting_program_name'] = program_name
-            current_timer['is_running'] = False
-            current_timer['is_paused'] = False
+
+        with display_state.edit() as draft:
+            # Always queue the program (persists through manual starts)
+            draft['queued_program'].update({
+                'has_queued': True,
+                'program_id': program_id,
+                'program_name': program_name,
+                'scheduled_start_time': scheduled_start_str
+            })
+
+            # Only show waiting view if nothing is currently running
+            if not state or not state[0]:
+                draft['current_timer'].update({
+                    'waiting_for_start': True,
+                    'scheduled_start_time': scheduled_start_str,
+                    'waiting_program_name': program_name,
+                    'is_running': False,
+                    'is_paused': False
+                })
+        timer_log.info('Program %s queued for %s', program_name, scheduled_start_str)
 
         conn.close()
         return
 
     # Clear queue and waiting state when actually starting
-    queued_program.update({
-        'has_queued': False,
-        'program_id': None,
-        'program_name': '',
-        'scheduled_start_time': ''
-    })
-    current_timer['waiting_for_start'] = False
-    current_timer['scheduled_start_time'] = ''
-    current_timer['waiting_program_name'] = ''
+    with display_state.edit() as draft:
+        draft['queued_program'].update(EMPTY_QUEUE)
+        draft['current_timer'].update(NO_WAITING_VIEW)
 
     # If we're at or after scheduled start time, proceed with normal smart start
     current_schedule_id = calculate_current_activity(program_id)
@@ -664,12 +1206,14 @@ def start_program_smart_internal(program_id):
                 break
             activity_start_time += timedelta(minutes=duration)
         
-        c.execute('''
+        log_service_event('end')
+        db_writer.execute('''
             UPDATE current_state 
             SET current_program_id = ?, current_schedule_id = ?, 
                 is_running = TRUE, is_paused = FALSE, start_time = ?
             WHERE id = 1
         ''', (program_id, current_schedule_id, activity_start_time.isoformat()))
+        log_service_event('start', activity_start_time)
     else:
         # Fallback: start from beginning
         c.execute('''
@@ -680,16 +1224,18 @@ def start_program_smart_internal(program_id):
         first_schedule = c.fetchone()
         
         if first_schedule:
-            c.execute('''
+            log_service_event('end')
+            db_writer.execute('''
                 UPDATE current_state 
                 SET current_program_id = ?, current_schedule_id = ?, 
                     is_running = TRUE, is_paused = FALSE, start_time = ?
                 WHERE id = 1
             ''', (program_id, first_schedule[0], scheduled_start.isoformat()))
+            log_service_event('start', scheduled_start)
+    resync_projection()
     
-    conn.commit()
     conn.close()
-    print(f"Program {program_name} started successfully")
+    timer_log.info('Program %s started successfully', program_name)
 
 # Routes - NOW they can use the @app.route decorator
 @app.route('/')
@@ -700,6 +1246,109 @@ def kiosk_display():
 def admin_portal():
     return render_template('admin.html')
 
+@app.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    """Serve a content-hashed asset, precompressed if the client accepts it"""
+    found = asset_manifest.lookup(filename, request.headers.get('Accept-Encoding'))
+    if found is None:
+        abort(404)
+    path, mimetype, encoding = found
+
+    response = send_file(path, mimetype=mimetype, conditional=True, max_age=31536000)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/sw.js')
+def kiosk_service_worker():
+    # Served from the root so its scope covers the kiosk page; always
+    # revalidated so a new version is picked up on the next load
+    response = send_file(os.path.join(app.static_folder, 'js', 'kiosk-sw.js'),
+                         mimetype='text/javascript', max_age=0)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/remote/programs', methods=['POST'])
+def ingest_remote_programs():
+    """Push endpoint for the RFM app, taking the same payload as the polled feed.
+
+    The body must be signed: X-RFM-Signature: sha256=<hex HMAC-SHA256 of the
+    raw body keyed with RFM_WEBHOOK_SECRET>. Programs are applied on the
+    remote_push worker; the response doesn't wait for them.
+    """
+    global last_remote_push
+
+    if not REMOTE_WEBHOOK_SECRET:
+        return jsonify({'error': 'Remote push is not configured'}), 503
+
+    body = request.get_data()
+    expected = 'sha256=' + hmac.new(REMOTE_WEBHOOK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, request.headers.get('X-RFM-Signature', '')):
+        return jsonify({'error': 'Invalid signature'}), 401
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return jsonify({'error': 'Body is not valid JSON'}), 400
+    programs = data.get('programs') if isinstance(data, dict) else None
+    if not isinstance(programs, list):
+        return jsonify({'error': 'Expected {"programs": [...]}'}), 400
+    if not all(isinstance(prog, dict) and prog.get('id') and prog.get('hash') for prog in programs):
+        return jsonify({'error': 'Every program needs an id and a hash'}), 400
+
+    last_remote_push = time.monotonic()
+    remote_push_queue.put(programs)
+    return jsonify({'status': 'accepted', 'programs': len(programs)}), 202
+
+# Health checks - used by the boot scripts instead of fixed sleeps
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok', 'uptime_seconds': health.status()['uptime_seconds']})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: migrations done, state recovered and background workers running"""
+    status = health.status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+@app.route('/api/admin/profiler', methods=['GET'])
+def profiler_status():
+    return jsonify({**thread_profiler.status(), 'files': profiling.list_profiles()})
+
+@app.route('/api/admin/profiler', methods=['POST'])
+def control_profiler():
+    """{"action": "start", "threads": [...], "interval_ms": 5} or {"action": "stop"}"""
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action == 'start':
+        threads = data.get('threads') or PROFILED_THREADS
+        if not all(name in PROFILED_THREADS for name in threads):
+            return jsonify({'error': f"threads must be from {', '.join(PROFILED_THREADS)}"}), 400
+        interval_ms = data.get('interval_ms', 5)
+        if not isinstance(interval_ms, (int, float)) or not 1 <= interval_ms <= 1000:
+            return jsonify({'error': 'interval_ms must be between 1 and 1000'}), 400
+        if not thread_profiler.start(threads, interval_ms / 1000):
+            return jsonify({'error': 'Profiler is already running'}), 409
+        log.info('Sampling profiler started for %s every %sms', ', '.join(threads), interval_ms)
+        return jsonify(thread_profiler.status())
+    if action == 'stop':
+        path = thread_profiler.stop()
+        if path is None:
+            return jsonify({'error': 'Profiler is not running'}), 409
+        log.info('Sampling profiler stopped -> %s', path)
+        return jsonify({**thread_profiler.status(), 'file': os.path.basename(path)})
+    return jsonify({'error': 'action must be start or stop'}), 400
+
+@app.route('/api/admin/profiles/<name>')
+def download_profile(name):
+    if name not in profiling.list_profiles():
+        abort(404)
+    return send_file(os.path.join(profiling.PROFILE_DIR, name), mimetype='text/plain' if name.endswith('.folded')
+                     else 'application/octet-stream', as_attachment=True)
+
 # API Routes for Timer Control
 @app.route('/api/start_program', methods=['POST'])
 def start_program():
@@ -716,23 +1365,24 @@ def start_program():
     ''', (program_id,))
     first_schedule = c.fetchone()
 
+    conn.close()
+
     if first_schedule:
-        c.execute('''
+        now = clock.now()
+        # History: close out whatever was running, then start the new program
+        log_service_event('end', now)
+        db_writer.execute('''
             UPDATE current_state
             SET current_program_id = ?, current_schedule_id = ?,
                 is_running = TRUE, is_paused = FALSE, start_time = ?,
                 manual_override = TRUE
             WHERE id = 1
-        ''', (program_id, first_schedule[0], datetime.now().isoformat()))
-
-        conn.commit()
-
-    conn.close()
+        ''', (program_id, first_schedule[0], now.isoformat()))
+        log_service_event('start', now)
+        resync_projection()
 
     # Clear waiting view but keep the queued program intact
-    current_timer['waiting_for_start'] = False
-    current_timer['scheduled_start_time'] = ''
-    current_timer['waiting_program_name'] = ''
+    display_state.update('current_timer', **NO_WAITING_VIEW)
 
     return jsonify({'status': 'success'})
 
@@ -753,6 +1403,7 @@ def start_program_smart():
     start_program_smart_internal(program_id)
 
     # Return appropriate status based on what happened
+    queued_program = display_state['queued_program']
     if queued_program['has_queued'] and queued_program['program_id'] == program_id:
         return jsonify({
             'status': 'waiting',
@@ -765,112 +1416,181 @@ def start_program_smart():
     
 @app.route('/api/pause_timer', methods=['POST'])
 def pause_timer():
-    conn = init_database()
-    c = conn.cursor()
-    
-    c.execute('UPDATE current_state SET is_paused = TRUE, paused_at = ? WHERE id = 1', 
-              (datetime.now().isoformat(),))
-    conn.commit()
-    conn.close()
+    paused_at = clock.now()
+
+    def pause(c):
+        # A second pause would move paused_at and log the pause twice
+        c.execute('SELECT is_paused FROM current_state WHERE id = 1')
+        result = c.fetchone()
+        if result and result[0]:
+            return False
+        c.execute('UPDATE current_state SET is_paused = TRUE, paused_at = ? WHERE id = 1',
+                  (paused_at.isoformat(),))
+        _insert_service_event(c, 'pause', paused_at)
+        return True
+
+    after_commit(db_writer.submit(pause), lambda paused: paused and projection.pause(paused_at))
     
-    current_timer['is_paused'] = True
+    display_state.update('current_timer', is_paused=True)
     return jsonify({'status': 'success'})
 
 @app.route('/api/resume_timer', methods=['POST'])
 def resume_timer():
-    conn = init_database()
-    c = conn.cursor()
-    
-    c.execute('SELECT start_time, paused_at FROM current_state WHERE id = 1')
-    result = c.fetchone()
-    
-    if result and result[1]:
-        start_time = datetime.fromisoformat(result[0])
-        paused_at = datetime.fromisoformat(result[1])
-        paused_duration = datetime.now() - paused_at
-        new_start_time = start_time + paused_duration
-        
-        c.execute('''
-            UPDATE current_state 
-            SET is_paused = FALSE, start_time = ?, paused_at = NULL 
-            WHERE id = 1
-        ''', (new_start_time.isoformat(),))
+    resumed_at = clock.now()
+
+    def resume(c):
+        # Read on the writer thread so a still-queued pause is already applied
+        c.execute('SELECT start_time, paused_at FROM current_state WHERE id = 1')
+        result = c.fetchone()
         
-        conn.commit()
-    
-    conn.close()
-    current_timer['is_paused'] = False
+        if result and result[1]:
+            start_time = datetime.fromisoformat(result[0])
+            paused_at = datetime.fromisoformat(result[1])
+            paused_duration = resumed_at - paused_at
+            new_start_time = start_time + paused_duration
+            
+            c.execute('''
+                UPDATE current_state 
+                SET is_paused = FALSE, start_time = ?, paused_at = NULL 
+                WHERE id = 1
+            ''', (new_start_time.isoformat(),))
+            _insert_service_event(c, 'resume', resumed_at)
+            return True
+        return False
+
+    after_commit(db_writer.submit(resume), lambda resumed: resumed and projection.resume(resumed_at))
+    display_state.update('current_timer', is_paused=False)
     return jsonify({'status': 'success'})
 
 @app.route('/api/stop_timer', methods=['POST'])
 def stop_timer():
     global live_schedule_override
 
-    conn = init_database()
-    c = conn.cursor()
-
-    c.execute('UPDATE current_state SET is_running = FALSE, is_paused = FALSE, manual_override = FALSE WHERE id = 1')
-    conn.commit()
-    conn.close()
+    log_service_event('end')
+    db_writer.execute('UPDATE current_state SET is_running = FALSE, is_paused = FALSE, manual_override = FALSE WHERE id = 1')
 
     # Clear live override when stopping
     live_schedule_override = None
 
-    # Clear timer state
-    current_timer.update({
-        'is_running': False,
-        'is_paused': False,
-        'time_remaining': '00:00',
-        'current_activity': '',
-    })
+    persist_state('live_schedule_override')
+    projection.clear()
+
+    with display_state.edit() as draft:
+        # Clear timer state
+        timer = draft['current_timer']
+        timer.update({
+            'is_running': False,
+            'is_paused': False,
+            'time_remaining': '00:00',
+            'current_activity': '',
+        })
 
-    # If there's a queued program, restore the waiting view
-    if queued_program['has_queued']:
-        current_timer['waiting_for_start'] = True
-        current_timer['scheduled_start_time'] = queued_program['scheduled_start_time']
-        current_timer['waiting_program_name'] = queued_program['program_name']
-    else:
-        current_timer['waiting_for_start'] = False
-        current_timer['scheduled_start_time'] = ''
-        current_timer['waiting_program_name'] = ''
+        # If there's a queued program, restore the waiting view
+        queued_program = draft['queued_program']
+        if queued_program['has_queued']:
+            timer['waiting_for_start'] = True
+            timer['scheduled_start_time'] = queued_program['scheduled_start_time']
+            timer['waiting_program_name'] = queued_program['program_name']
+        else:
+            timer.update(NO_WAITING_VIEW)
 
     return jsonify({'status': 'success'})
 
 @app.route('/api/next_item', methods=['POST'])
 def next_item():
-    move_to_next_item()
+    move_to_next_item('skip')
     return jsonify({'status': 'success'})
 
 @app.route('/api/clear_manual_override', methods=['POST'])
 def clear_manual_override():
     """Clear the manual override flag to allow auto-start to work again"""
-    conn = init_database()
-    c = conn.cursor()
-    c.execute('UPDATE current_state SET manual_override = FALSE WHERE id = 1')
-    conn.commit()
-    conn.close()
+    db_writer.execute('UPDATE current_state SET manual_override = FALSE WHERE id = 1')
     return jsonify({'status': 'success', 'message': 'Manual override cleared. Auto-start will resume.'})
 
 @app.route('/api/clear_queue', methods=['POST'])
 def clear_queue():
     """Clear the queued program"""
-    global queued_program
-    queued_program.update({
-        'has_queued': False,
-        'program_id': None,
-        'program_name': '',
-        'scheduled_start_time': ''
-    })
-    # Also clear waiting view if it was showing the queued program
-    current_timer['waiting_for_start'] = False
-    current_timer['scheduled_start_time'] = ''
-    current_timer['waiting_program_name'] = ''
+    with display_state.edit() as draft:
+        draft['queued_program'].update(EMPTY_QUEUE)
+        # Also clear waiting view if it was showing the queued program
+        draft['current_timer'].update(NO_WAITING_VIEW)
     return jsonify({'status': 'success'})
 
 
+# Paginated listing: ?q= (name search), ?fields=a,b, ?limit= (max 200), ?offset=
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+
+PROGRAM_LIST_FIELDS = ['id', 'name', 'description', 'scheduled_start_time', 'day_of_week', 'auto_start', 'activity_count']
+PROGRAM_LIST_QUERY = '''
+    SELECT p.id, p.name, p.description, p.scheduled_start_time, p.day_of_week, p.auto_start,
+           COUNT(ps.id) as activity_count
+    FROM programs p
+    LEFT JOIN program_schedules ps ON p.id = ps.program_id
+    {where}
+    GROUP BY p.id
+    ORDER BY p.name
+    {page}
+'''
+ACTIVITY_LIST_FIELDS = ['id', 'name', 'default_duration', 'description']
+ACTIVITY_LIST_QUERY = '''
+    SELECT id, name, default_duration, description FROM activities
+    {where}
+    ORDER BY name
+    {page}
+'''
+
+def wants_listing_page():
+    return any(key in request.args for key in ('q', 'fields', 'limit', 'offset'))
+
+def list_page(table, id_column, query, all_fields, index):
+    """One page of a list endpoint; search results come back best match first"""
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else all_fields
+    unknown = [f for f in fields if f not in all_fields]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    limit = min(max(request.args.get('limit', LIST_DEFAULT_LIMIT, type=int), 1), LIST_MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    search = request.args.get('q', '').strip()
+
+    conn = init_database()
+    c = conn.cursor()
+    if search:
+        ids = index.search(search)
+        if ids:
+            # Count only ids that still have a row, so a stale index entry can't stall paging
+            c.execute(f'SELECT id FROM {table} WHERE id IN ({",".join("?" * len(ids))})', ids)
+            existing = {row[0] for row in c.fetchall()}
+            for stale in set(ids) - existing:
+                index.remove(stale)
+            ids = [i for i in ids if i in existing]
+        total, page_ids = len(ids), ids[offset:offset + limit]
+        rows = []
+        if page_ids:
+            c.execute(query.format(where=f'WHERE {id_column} IN ({",".join("?" * len(page_ids))})', page=''), page_ids)
+            by_id = {row[0]: row for row in c.fetchall()}
+            rows = [by_id[i] for i in page_ids if i in by_id]
+    else:
+        total = c.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        c.execute(query.format(where='', page='LIMIT ? OFFSET ?'), (limit, offset))
+        rows = c.fetchall()
+    conn.close()
+
+    positions = [all_fields.index(f) for f in fields]
+    items = [{f: (bool(row[i]) if f == 'auto_start' else row[i]) for f, i in zip(fields, positions)}
+             for row in rows]
+    end = offset + len(items)
+    return jsonify({'items': items, 'total': total, 'offset': offset, 'limit': limit,
+                    'next_offset': end if end < total else None})
+
 # API Routes for Program Management
 @app.route('/api/programs')
 def get_programs():
+    """All programs, or one page of them when ?q/fields/limit/offset is given"""
+    if wants_listing_page():
+        return list_page('programs', 'p.id', PROGRAM_LIST_QUERY, PROGRAM_LIST_FIELDS, program_index)
+
     conn = init_database()
     c = conn.cursor()
     
@@ -896,7 +1616,7 @@ def get_program(program_id):
     c = conn.cursor()
     
     # Get program details including day_of_week and auto_start
-    c.execute('SELECT id, name, description, scheduled_start_time, day_of_week, auto_start FROM programs WHERE id = ?', (program_id,))
+    c.execute('SELECT id, name, description, scheduled_start_time, day_of_week, auto_start, recurrence FROM programs WHERE id = ?', (program_id,))
     program = c.fetchone()
     
     if not program:
@@ -924,9 +1644,15 @@ def get_program(program_id):
         'scheduled_start_time': program[3],
         'day_of_week': program[4],
         'auto_start': bool(program[5]),
+        'recurrence': json.loads(program[6]) if program[6] else None,
         'schedule': schedule
     })
 
+def parse_recurrence(data):
+    """Validated rule JSON from a request's 'recurrence' (empty clears it); raises ValueError"""
+    rule = data.get('recurrence')
+    return json.dumps(validate_rule(rule)) if rule else None
+
 @app.route('/api/programs', methods=['POST'])
 def create_program():
     data = request.json
@@ -938,16 +1664,22 @@ def create_program():
     
     if not name:
         return jsonify({'error': 'Program name is required'}), 400
+    try:
+        recurrence = parse_recurrence(data)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid recurrence: {e}'}), 400
     
     conn = init_database()
     c = conn.cursor()
     
     try:
-        c.execute('INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start) VALUES (?, ?, ?, ?, ?)', 
-                 (name, description, scheduled_start_time, day_of_week, auto_start))
+        c.execute('INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start, recurrence) VALUES (?, ?, ?, ?, ?, ?)', 
+                 (name, description, scheduled_start_time, day_of_week, auto_start, recurrence))
         program_id = c.lastrowid
         conn.commit()
         conn.close()
+        refresh_program_occurrences(program_id)
+        program_index.add(program_id, name)
         return jsonify({'status': 'success', 'program_id': program_id})
     except sqlite3.IntegrityError:
         conn.close()
@@ -961,12 +1693,20 @@ def update_program(program_id):
     scheduled_start_time = data.get('scheduled_start_time', '')
     day_of_week = data.get('day_of_week', '')
     auto_start = data.get('auto_start', False)
+    # Leave the stored rule alone unless the request includes one
+    try:
+        recurrence = parse_recurrence(data)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid recurrence: {e}'}), 400
     
     conn = init_database()
     c = conn.cursor()
     
-    c.execute('UPDATE programs SET name = ?, description = ?, scheduled_start_time = ?, day_of_week = ?, auto_start = ? WHERE id = ?', 
-             (name, description, scheduled_start_time, day_of_week, auto_start, program_id))
+    c.execute('''UPDATE programs SET name = ?, description = ?, scheduled_start_time = ?, day_of_week = ?, auto_start = ?,
+                 recurrence = CASE WHEN ? THEN ? ELSE recurrence END
+                 WHERE id = ?''', 
+             (name, description, scheduled_start_time, day_of_week, auto_start,
+              'recurrence' in data, recurrence, program_id))
     
     if c.rowcount == 0:
         conn.close()
@@ -974,6 +1714,9 @@ def update_program(program_id):
     
     conn.commit()
     conn.close()
+    refresh_program_occurrences(program_id)
+    program_index.add(program_id, name)
+    refresh_projection(program_id)
     return jsonify({'status': 'success'})
 
 @app.route('/api/programs/<int:program_id>', methods=['DELETE'])
@@ -989,11 +1732,65 @@ def delete_program(program_id):
     
     conn.commit()
     conn.close()
+    occurrence_cache.remove_program(program_id)
+    program_index.remove(program_id)
+    if program_id == projection.program_id:
+        projection.clear()
     return jsonify({'status': 'success'})
 
+# Bulk export/import (see transfer.py; same format as the CLI)
+TRANSFER_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def transfer_format():
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    return fmt if fmt in transfer.FORMATS else None
+
+@app.route('/api/export')
+def export_data():
+    """Stream activities, programs and schedules (?format=ndjson|csv, ?types=activity,program)"""
+    fmt = transfer_format()
+    if fmt is None:
+        return jsonify({'error': f"format must be one of {', '.join(transfer.FORMATS)}"}), 400
+    types = request.args.get('types', ','.join(transfer.RECORD_TYPES)).split(',')
+
+    def generate():
+        conn = init_database()
+        try:
+            yield from transfer.encode(transfer.export_records(conn, types), fmt)
+        finally:
+            conn.close()
+
+    filename = f"church-timer-{clock.now().strftime('%Y%m%d')}.{fmt}"
+    return app.response_class(stream_with_context(generate()), mimetype=TRANSFER_MIMETYPES[fmt],
+                              headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/import', methods=['POST'])
+def import_data():
+    """Import an export from the request body (?format=, ?on_conflict=skip|update|error)"""
+    fmt = transfer_format()
+    on_conflict = request.args.get('on_conflict', 'skip')
+    if fmt is None or on_conflict not in transfer.CONFLICT_MODES:
+        return jsonify({'error': 'Invalid format or on_conflict'}), 400
+
+    # Read the body line by line; each batch commits on the writer thread
+    lines = codecs.iterdecode(request.stream, 'utf-8')
+    result = transfer.import_stream(transfer.decode(lines, fmt),
+                                    lambda func: db_writer.submit(func).result(), on_conflict)
+    load_occurrence_cache()
+    load_search_indexes()
+    # on_conflict=update may have rewritten the running program's schedule
+    refresh_projection(projection.program_id)
+    return jsonify(result.as_dict()), (200 if not result.error_count else 207)
+
 # API Routes for Activity Management
 @app.route('/api/activities')
 def get_activities():
+    """All activities, or one page of them when ?q/fields/limit/offset is given"""
+    if wants_listing_page():
+        return list_page('activities', 'id', ACTIVITY_LIST_QUERY, ACTIVITY_LIST_FIELDS, activity_index)
+
     conn = init_database()
     c = conn.cursor()
     
@@ -1023,6 +1820,7 @@ def create_activity():
         activity_id = c.lastrowid
         conn.commit()
         conn.close()
+        activity_index.add(activity_id, name)
         return jsonify({'status': 'success', 'activity_id': activity_id})
     except sqlite3.IntegrityError:
         conn.close()
@@ -1074,6 +1872,7 @@ def add_to_schedule(program_id):
         
         conn.commit()
         conn.close()
+        refresh_projection(program_id)
         return jsonify({'status': 'success'})
         
     except sqlite3.IntegrityError as e:
@@ -1099,19 +1898,19 @@ def remove_from_schedule(program_id, schedule_id):
     
     conn.commit()
     conn.close()
+    refresh_projection(program_id)
     return jsonify({'status': 'success'})
     
 @app.route('/api/set_waiting_state', methods=['POST'])
 def set_waiting_state():
     """Set the waiting state for the kiosk display"""
     data = request.json
-    global current_timer
     
-    # You could store this in the database, but for simplicity we'll use a global
-    # In a production app, you'd want to store this in the database
-    current_timer['waiting_for_start'] = data.get('waiting', False)
-    current_timer['scheduled_start_time'] = data.get('scheduled_start', '')
-    current_timer['waiting_program_name'] = data.get('program_name', '')
+    # Kept in memory (and journaled) rather than in the database
+    display_state.update('current_timer',
+                         waiting_for_start=data.get('waiting', False),
+                         scheduled_start_time=data.get('scheduled_start', ''),
+                         waiting_program_name=data.get('program_name', ''))
     
     return jsonify({'status': 'success'})       
 
@@ -1144,6 +1943,7 @@ def reorder_schedule(program_id):
         
         conn.commit()
         conn.close()
+        refresh_projection(program_id)
         return jsonify({'status': 'success'})
     except Exception as e:
         conn.rollback()
@@ -1155,145 +1955,268 @@ def next_autostart():
     """Get information about the next scheduled auto-start program"""
     try:
         conn = init_database()
-        c = conn.cursor()
-        
-        # Get current day and time
-        now = datetime.now()
-        current_day = now.strftime('%A')
-        current_time = now.strftime('%H:%M')
-        
-        # Check if timer is already running
-        c.execute('SELECT is_running FROM current_state WHERE id = 1')
-        result = c.fetchone()
-        is_running = result[0] if result else False
-        
-        if is_running:
+        try:
+            return jsonify(next_autostart_info(conn.cursor(), clock.now()))
+        finally:
             conn.close()
-            return jsonify({'has_autostart': False, 'reason': 'Program already running'})
-        
-        # Find next auto-start program for today
-        c.execute('''
-            SELECT id, name, scheduled_start_time, day_of_week
-            FROM programs 
-            WHERE day_of_week = ? AND auto_start = TRUE AND scheduled_start_time > ?
-            ORDER BY scheduled_start_time
-            LIMIT 1
-        ''', (current_day, current_time))
-        
-        program = c.fetchone()
-        
-        if program:
-            program_id, name, scheduled_time, day = program
-            
-            # Calculate time until start
-            try:
-                scheduled_hour, scheduled_minute = map(int, scheduled_time.split(':'))
-                scheduled_datetime = now.replace(hour=scheduled_hour, minute=scheduled_minute, second=0, microsecond=0)
-                time_until = scheduled_datetime - now
-                
-                minutes_until = int(time_until.total_seconds() / 60)
-                hours_until = minutes_until // 60
-                mins_remaining = minutes_until % 60
-                
-                conn.close()
-                return jsonify({
-                    'has_autostart': True,
-                    'program_id': program_id,
-                    'program_name': name,
-                    'scheduled_time': scheduled_time,
-                    'day_of_week': day,
-                    'minutes_until': minutes_until,
-                    'time_display': f"{hours_until}h {mins_remaining}m" if hours_until > 0 else f"{mins_remaining} minutes"
-                })
-            except Exception as e:
-                print(f"Error calculating time until start: {e}")
-        
-        # If no program today, check for programs on other days
-        c.execute('''
-            SELECT id, name, scheduled_start_time, day_of_week
-            FROM programs 
-            WHERE auto_start = TRUE
-            ORDER BY 
-                CASE day_of_week
-                    WHEN 'Monday' THEN 1
-                    WHEN 'Tuesday' THEN 2
-                    WHEN 'Wednesday' THEN 3
-                    WHEN 'Thursday' THEN 4
-                    WHEN 'Friday' THEN 5
-                    WHEN 'Saturday' THEN 6
-                    WHEN 'Sunday' THEN 7
-                END,
-                scheduled_start_time
-            LIMIT 1
-        ''')
-        
-        program = c.fetchone()
-        conn.close()
-        
-        if program:
-            program_id, name, scheduled_time, day = program
-            return jsonify({
-                'has_autostart': True,
-                'program_id': program_id,
-                'program_name': name,
-                'scheduled_time': scheduled_time,
-                'day_of_week': day,
-                'is_future_day': True
-            })
-        
-        return jsonify({'has_autostart': False, 'reason': 'No auto-start programs configured'})
         
     except Exception as e:
-        print(f"Error getting next autostart: {e}")
+        schedule_log.exception('Error getting next autostart: %s', e)
         return jsonify({'has_autostart': False, 'error': str(e)}), 500
 
-@app.route('/api/stage_message', methods=['GET'])
-def get_stage_message():
-    """Get the current active stage message if any"""
+def next_autostart_info(c, now):
+    # Check if timer is already running
+    c.execute('SELECT is_running FROM current_state WHERE id = 1')
+    result = c.fetchone()
+    is_running = result[0] if result else False
+    
+    if is_running:
+        return {'has_autostart': False, 'reason': 'Program already running'}
+    
+    # Next start across all programs, from the occurrence cache
+    program = None
+    upcoming = occurrence_cache.upcoming(1, after=now)
+    if upcoming:
+        starts_at, program_id = upcoming[0]
+        c.execute('SELECT name, scheduled_start_time FROM programs WHERE id = ?', (program_id,))
+        program = c.fetchone()
+    
+    if not program:
+        return {'has_autostart': False, 'reason': 'No auto-start programs configured'}
+    
+    name, scheduled_time = program
+    info = {
+        'has_autostart': True,
+        'program_id': program_id,
+        'program_name': name,
+        'scheduled_time': scheduled_time,
+        'day_of_week': starts_at.strftime('%A'),
+        'date': starts_at.date().isoformat()
+    }
+    
+    if starts_at.date() == now.date():
+        # Calculate time until start
+        minutes_until = int((starts_at - now).total_seconds() / 60)
+        hours_until = minutes_until // 60
+        mins_remaining = minutes_until % 60
+        info.update({
+            'minutes_until': minutes_until,
+            'time_display': f"{hours_until}h {mins_remaining}m" if hours_until > 0 else f"{mins_remaining} minutes"
+        })
+    else:
+        info['is_future_day'] = True
+    
+    return info
+
+# Admin dashboard: everything the admin page polls, in one payload
+ADMIN_STREAM_INTERVAL = 1      # seconds between checks for changed sections
+ADMIN_STREAM_KEEPALIVE = 15    # seconds between comments on an idle stream
+
+def section_version(data):
+    # Derived from the content, so every tab and every request agrees on it
+    return format(zlib.crc32(serialization.dumps(data)), '08x')
+
+def admin_state_sections():
+    """{section: (version, data)} for the admin dashboard"""
+    snapshot = display_state.snapshot
+    conn = init_database()
     try:
+        c = conn.cursor()
+        sections = {
+            'status': dict(snapshot['current_timer']),
+            'queue': dict(snapshot['queued_program']),
+            'live_schedule': live_schedule_info(c),
+            'next_autostart': next_autostart_info(c, clock.now()),
+            'stage_messages': [stage_message_info(m) for m in stage_queue.pending(clock.now())],
+            'projected_timeline': projection.project(clock.now()),
+        }
+    finally:
+        conn.close()
+    return {name: (section_version(data), data) for name, data in sections.items()}
+
+def admin_state_payload(sections, known):
+    """All versions, plus the data of each section whose version isn't in known"""
+    payload = {'versions': {name: version for name, (version, _) in sections.items()}}
+    for name, (version, data) in sections.items():
+        if known.get(name) != version:
+            payload[name] = data
+    return payload
+
+def parse_known_versions(value):
+    # ?have=status:1a2b3c4d,queue:5e6f7a8b
+    known = {}
+    for item in (value or '').split(','):
+        name, _, version = item.partition(':')
+        if name and version:
+            known[name] = version
+    return known
+
+@app.route('/api/admin_state')
+def admin_state():
+    """Timer status, queue, live schedule and next auto-start with a version per
+    section; sections whose version matches ?have= are left out"""
+    return jsonify(admin_state_payload(admin_state_sections(), parse_known_versions(request.args.get('have'))))
+
+class AdminStateBroadcaster:
+    """Computes the admin sections once per interval for every open stream.
+
+    The producer thread only runs while a stream is subscribed. Streams wait
+    for the next round and compare versions; none of them touches SQLite.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._subscribers = 0
+        self._round = 0
+        self._sections = None
+        self._thread = None
+
+    def subscribe(self):
+        with self._cond:
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='admin_state', daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self):
+        with self._cond:
+            self._subscribers -= 1
+
+    def wait(self, after, timeout):
+        """(round, sections) of the first round newer than after; the latest ones on timeout"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._round > after, timeout)
+            return self._round, self._sections
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                sections = admin_state_sections()
+            except Exception as e:
+                log.exception('Error building admin state: %s', e)
+            else:
+                with self._cond:
+                    self._round += 1
+                    self._sections = sections
+                    self._cond.notify_all()
+            time.sleep(self.interval)
+
+admin_state_broadcaster = AdminStateBroadcaster(ADMIN_STREAM_INTERVAL)
+
+@app.route('/api/admin_state/stream')
+def admin_state_stream():
+    """Server-sent events: the same payload whenever a section changes"""
+    known = parse_known_versions(request.args.get('have'))
+
+    def generate():
+        admin_state_broadcaster.subscribe()
+        try:
+            seen = 0
+            idle_since = time.monotonic()
+            while True:
+                seen, sections = admin_state_broadcaster.wait(seen, ADMIN_STREAM_KEEPALIVE)
+                payload = admin_state_payload(sections, known) if sections else {}
+                if len(payload) > 1:
+                    known.update(payload['versions'])
+                    idle_since = time.monotonic()
+                    yield f"data: {serialization.dumps(payload).decode('utf-8')}\n\n"
+                elif time.monotonic() - idle_since >= ADMIN_STREAM_KEEPALIVE:
+                    # Also how a closed tab is noticed: the write fails and the stream unsubscribes
+                    idle_since = time.monotonic()
+                    yield ': keepalive\n\n'
+        finally:
+            admin_state_broadcaster.unsubscribe()
+
+    return app.response_class(stream_with_context(generate()), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/upcoming_starts')
+def upcoming_starts():
+    """Next ?limit= (default 10, max 100) auto-starts across all programs"""
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    starts = occurrence_cache.upcoming(limit, after=clock.now())
+    
+    names = {}
+    if starts:
         conn = init_database()
         c = conn.cursor()
-        
-        now = datetime.now()
-        
-        # Get active message that hasn't expired
-        c.execute('''
-            SELECT id, message, duration_seconds, end_time, created_at
-            FROM stage_messages
-            WHERE is_active = TRUE AND end_time > ?
-            ORDER BY created_at DESC
-            LIMIT 1
-        ''', (now,))
-        
-        message = c.fetchone()
+        ids = sorted({program_id for _, program_id in starts})
+        c.execute(f'SELECT id, name FROM programs WHERE id IN ({",".join("?" * len(ids))})', ids)
+        names = dict(c.fetchall())
         conn.close()
-        
-        if message:
-            msg_id, msg_text, duration, end_time_str, created_at = message
-            end_time = datetime.fromisoformat(end_time_str)
-            
-            # Check if actually expired
-            if end_time > now:
-                time_remaining = (end_time - now).total_seconds()
-                
-                return jsonify({
-                    'has_message': True,
-                    'message': msg_text,
-                    'duration_seconds': duration,
-                    'end_time': end_time.isoformat(),
-                    'time_remaining': int(time_remaining),
-                    'expired': False
-                })
-        
+    
+    return jsonify([{'program_id': program_id, 'program_name': names.get(program_id, ''),
+                     'starts_at': starts_at.isoformat(timespec='minutes'),
+                     'day_of_week': starts_at.strftime('%A')}
+                    for starts_at, program_id in starts])
+
+def parse_message_start(value, now):
+    """start_at as 'HH:MM' (today) or an ISO datetime, converted to local time if it
+    has an offset; None or past means now. Raises ValueError."""
+    if not value:
+        return now
+    if not isinstance(value, str):
+        raise ValueError("start_at must be 'HH:MM' or an ISO datetime")
+    if len(value) <= 5:
+        starts_at = datetime.combine(now.date(), datetime.strptime(value, '%H:%M').time())
+    else:
+        starts_at = datetime.fromisoformat(value)
+        if starts_at.tzinfo is not None:
+            # Everything else is naive local time
+            starts_at = starts_at.astimezone().replace(tzinfo=None)
+    return max(starts_at, now)
+
+def stage_message_info(message):
+    return {
+        'id': message['id'],
+        'message': message['message'],
+        'priority': message['priority'],
+        'starts_at': message['starts_at'].isoformat(),
+        'end_time': message['ends_at'].isoformat(),
+    }
+
+@app.route('/api/stage_message', methods=['GET'])
+def get_stage_message():
+    """Get the stage message showing now, if any"""
+    now = clock.now()
+    message = stage_queue.current(now)
+    if message is None:
         return jsonify({'has_message': False, 'expired': True})
-        
-    except Exception as e:
-        print(f"Error getting stage message: {e}")
-        return jsonify({'has_message': False, 'error': str(e)}), 500
+    return jsonify({
+        'has_message': True,
+        'id': message['id'],
+        'message': message['message'],
+        'priority': message['priority'],
+        'duration_seconds': int((message['ends_at'] - message['starts_at']).total_seconds()),
+        'end_time': message['ends_at'].isoformat(),
+        'time_remaining': int((message['ends_at'] - now).total_seconds()),
+        'expired': False
+    })
+
+@app.route('/api/stage_messages')
+def get_stage_messages():
+    """The queue flattened into display windows (epoch ms) for the kiosk to step through"""
+    now = clock.now()
+    deactivate_stage_messages(stage_queue.prune(now))
+    return jsonify({
+        'version': stage_queue.version,
+        'now': int(clock.time_ms()),
+        # ends_at is the message's own end, for its countdown bar; end is when this window yields
+        'windows': [{'start': epoch_ms(start), 'end': epoch_ms(end), 'ends_at': epoch_ms(message['ends_at']),
+                     'duration': int((message['ends_at'] - message['starts_at']).total_seconds()),
+                     'id': message['id'], 'message': message['message'], 'priority': message['priority']}
+                    for start, end, message in stage_queue.windows(now)],
+        'messages': [stage_message_info(m) for m in stage_queue.pending(now)],
+    })
 
 @app.route('/api/stage_message', methods=['POST'])
 def send_stage_message():
-    """Send a message to display on stage"""
+    """Queue a message to display on stage; higher priorities cover lower ones"""
     try:
         data = request.get_json()
         message = data.get('message', '').strip()
@@ -1304,77 +2227,82 @@ def send_stage_message():
         
         # Limit duration to 5 minutes (300 seconds)
         duration = min(max(duration, 10), 300)
+
+        try:
+            priority = parse_priority(data.get('priority'))
+            starts_at = parse_message_start(data.get('start_at'), clock.now())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        end_time = starts_at + timedelta(seconds=duration)
+
+        queued = stage_queue.add(message, priority, starts_at, end_time)
+        publish_stage_messages()
+
+        # Written behind; the id was assigned in memory
+        db_writer.submit(lambda c: c.execute('''
+            INSERT INTO stage_messages (id, message, duration_seconds, priority, starts_at, end_time, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, TRUE)
+        ''', (queued['id'], message, duration, priority, starts_at, end_time)))
         
-        conn = init_database()
-        c = conn.cursor()
-        
-        # Deactivate any existing messages
-        c.execute('UPDATE stage_messages SET is_active = FALSE WHERE is_active = TRUE')
-        
-        # Create new message
-        now = datetime.now()
-        end_time = now + timedelta(seconds=duration)
-        
-        c.execute('''
-            INSERT INTO stage_messages (message, duration_seconds, end_time, is_active)
-            VALUES (?, ?, ?, TRUE)
-        ''', (message, duration, end_time))
-        
-        message_id = c.lastrowid
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"[STAGE MESSAGE] Sent: '{message}' for {duration}s")
+        stage_log.info("Queued #%d: '%s' for %ds at priority %d from %s",
+                       queued['id'], message, duration, priority, starts_at.strftime('%H:%M:%S'))
         
         return jsonify({
             'status': 'success',
-            'message_id': message_id,
+            'message_id': queued['id'],
             'duration': duration,
+            'priority': priority,
+            'starts_at': starts_at.isoformat(),
             'end_time': end_time.isoformat()
         })
         
     except Exception as e:
-        print(f"Error sending stage message: {e}")
+        stage_log.exception('Error sending stage message: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/stage_message', methods=['DELETE'])
 def clear_stage_message():
-    """Clear the current stage message"""
-    try:
-        conn = init_database()
-        c = conn.cursor()
-        
-        c.execute('UPDATE stage_messages SET is_active = FALSE WHERE is_active = TRUE')
-        
-        conn.commit()
-        conn.close()
-        
-        print("[STAGE MESSAGE] Cleared")
-        
-        return jsonify({'status': 'success'})
-        
-    except Exception as e:
-        print(f"Error clearing stage message: {e}")
-        return jsonify({'error': str(e)}), 500
+    """Clear every queued stage message, or just ?id=N"""
+    message_id = request.args.get('id', type=int)
+    if message_id is None:
+        removed = stage_queue.clear()
+    elif stage_queue.remove(message_id):
+        removed = [message_id]
+    else:
+        return jsonify({'error': 'Message not found'}), 404
+    publish_stage_messages()
+    deactivate_stage_messages(removed)
 
-@app.route('/api/countdown_timer', methods=['GET'])
-def get_countdown_timer():
-    """Get the current active countdown timer"""
-    return jsonify(countdown_timer)
+    stage_log.info('Cleared %s', 'all' if message_id is None else f'#{message_id}')
 
-@app.route('/api/countdown_timer', methods=['POST'])
-def start_countdown_timer():
-    """Start a new countdown timer - stops any running programs"""
-    try:
-        data = request.get_json()
-        timer_type = data.get('timer_type', 'duration')
-        name = data.get('name', 'Countdown').strip()
-        
-        conn = init_database()
-        c = conn.cursor()
-        
+    return jsonify({'status': 'success', 'removed': removed})
+
+@app.route('/api/analytics/overruns')
+def overrun_analytics():
+    """Planned vs actual activity durations and overrun distribution from service history"""
+    if analytics.np is None:
+        return jsonify({'error': 'NumPy is required for analytics (pip install numpy)'}), 503
+
+    days = request.args.get('days', 365, type=int)
+    program_id = request.args.get('program_id', type=int)
+    since = (clock.now() - timedelta(days=days)).isoformat()
+
+    conn = init_database()
+    events = analytics.load_events(conn, since, program_id)
+    conn.close()
+
+    report = analytics.overrun_report(events)
+    report.update({'days': days, 'program_id': program_id})
+    return jsonify(report)
+
+def activate_countdown(name, timer_type, timeline, insert):
+    """Stop any running program, replace the active countdown with insert's row
+    and switch the timer to timeline; returns the new row id"""
+    now = timeline[0][1]
+
+    def save_countdown(c):
         # Stop any running programs
+        _insert_service_event(c, 'end', now)
         c.execute('''
             UPDATE current_state 
             SET is_running = FALSE, 
@@ -1387,9 +2315,32 @@ def start_countdown_timer():
         
         # Clear any existing countdown timers
         c.execute('UPDATE countdown_timers SET is_active = FALSE WHERE is_active = TRUE')
+        c.execute(*insert)
+        return c.lastrowid
+
+    timer_id = db_writer.submit(save_countdown).result()
+    projection.clear()
+    countdown_timeline.start(timer_id, name, timer_type, timeline)
+    publish_countdown(clock.now())
+    return timer_id
+
+@app.route('/api/countdown_timer', methods=['GET'])
+def get_countdown_timer():
+    """Get the current active countdown timer (?compact=1 for the short-key form)"""
+    if request.args.get('compact'):
+        return snapshot_json('countdown_timer:compact', serialization.compact_countdown)
+    return snapshot_json('countdown_timer', lambda s: dict(s['countdown_timer']))
+
+@app.route('/api/countdown_timer', methods=['POST'])
+def start_countdown_timer():
+    """Start a new countdown timer - stops any running programs"""
+    try:
+        data = request.get_json()
+        timer_type = data.get('timer_type', 'duration')
+        name = data.get('name', 'Countdown').strip()
         
         # Create new countdown timer
-        now = datetime.now()
+        now = clock.now()
         
         if timer_type == 'target_time':
             # Countdown to a specific time
@@ -1410,26 +2361,25 @@ def start_countdown_timer():
                 # Full ISO datetime
                 target_time = datetime.fromisoformat(target_time_str)
             
-            c.execute('''
+            insert = ('''
                 INSERT INTO countdown_timers (name, target_time, timer_type, started_at, is_active)
                 VALUES (?, ?, 'target_time', ?, TRUE)
             ''', (name, target_time.isoformat(), now.isoformat()))
+            timeline = [(name, now, target_time)]
             
         else:  # duration type
             duration_seconds = int(data.get('duration_seconds', 300))
             duration_seconds = max(10, min(duration_seconds, 86400))  # 10 seconds to 24 hours
             
-            c.execute('''
+            insert = ('''
                 INSERT INTO countdown_timers (name, duration_seconds, timer_type, started_at, is_active)
                 VALUES (?, ?, 'duration', ?, TRUE)
             ''', (name, duration_seconds, now.isoformat()))
+            timeline = [(name, now, now + timedelta(seconds=duration_seconds))]
+
+        timer_id = activate_countdown(name, timer_type, timeline, insert)
         
-        timer_id = c.lastrowid
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"[COUNTDOWN] Started: '{name}' (type: {timer_type})")
+        countdown_log.info("Started: '%s' (type: %s)", name, timer_type)
         
         return jsonify({
             'status': 'success',
@@ -1438,57 +2388,249 @@ def start_countdown_timer():
         })
         
     except Exception as e:
-        print(f"Error starting countdown timer: {e}")
+        countdown_log.exception('Error starting countdown timer: %s', e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/countdown_timer', methods=['DELETE'])
 def stop_countdown_timer():
     """Stop the active countdown timer"""
     try:
-        conn = init_database()
-        c = conn.cursor()
+        db_writer.execute('UPDATE countdown_timers SET is_active = FALSE WHERE is_active = TRUE')
+        countdown_timeline.stop()
         
-        c.execute('UPDATE countdown_timers SET is_active = FALSE WHERE is_active = TRUE')
-        
-        conn.commit()
-        conn.close()
-        
-        print("[COUNTDOWN] Stopped")
+        countdown_log.info('Stopped')
         
         # Reset global state
-        countdown_timer['is_active'] = False
-        countdown_timer['is_expired'] = False
+        display_state.update('countdown_timer', is_active=False, is_expired=False,
+                             sequence_name='', step=0, steps=[])
         
         return jsonify({'status': 'success'})
         
     except Exception as e:
-        print(f"Error stopping countdown timer: {e}")
+        countdown_log.exception('Error stopping countdown timer: %s', e)
         return jsonify({'error': str(e)}), 500
 
+# Saved countdown sequences - compiled into one timeline when started
+def sequence_info(row):
+    steps = json.loads(row[2])
+    return {'id': row[0], 'name': row[1], 'steps': steps,
+            'total_seconds': sum(step['duration_seconds'] for step in steps)}
+
+def parse_sequence(data):
+    """(name, steps JSON) from a request; raises ValueError"""
+    name = (data.get('name') or '').strip()
+    if not name:
+        raise ValueError('Sequence name is required')
+    return name, json.dumps(parse_steps(data.get('steps')))
+
+@app.route('/api/countdown_sequences')
+def get_countdown_sequences():
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT id, name, steps FROM countdown_sequences ORDER BY name')
+    sequences = [sequence_info(row) for row in c.fetchall()]
+    conn.close()
+    return jsonify(sequences)
+
+@app.route('/api/countdown_sequences', methods=['POST'])
+def create_countdown_sequence():
+    try:
+        name, steps = parse_sequence(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    sequence_id = db_writer.submit(
+        lambda c: c.execute('INSERT INTO countdown_sequences (name, steps) VALUES (?, ?)', (name, steps)).lastrowid
+    ).result()
+    countdown_log.info("Saved sequence '%s'", name)
+    return jsonify({'status': 'success', 'sequence_id': sequence_id})
+
+@app.route('/api/countdown_sequences/<int:sequence_id>', methods=['PUT'])
+def update_countdown_sequence(sequence_id):
+    try:
+        name, steps = parse_sequence(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    updated = db_writer.submit(
+        lambda c: c.execute('UPDATE countdown_sequences SET name = ?, steps = ? WHERE id = ?',
+                            (name, steps, sequence_id)).rowcount
+    ).result()
+    if not updated:
+        return jsonify({'error': 'Sequence not found'}), 404
+    return jsonify({'status': 'success'})
+
+@app.route('/api/countdown_sequences/<int:sequence_id>', methods=['DELETE'])
+def delete_countdown_sequence(sequence_id):
+    deleted = db_writer.submit(
+        lambda c: c.execute('DELETE FROM countdown_sequences WHERE id = ?', (sequence_id,)).rowcount
+    ).result()
+    if not deleted:
+        return jsonify({'error': 'Sequence not found'}), 404
+    return jsonify({'status': 'success'})
+
+@app.route('/api/countdown_sequences/<int:sequence_id>/start', methods=['POST'])
+def start_countdown_sequence(sequence_id):
+    """Run a saved sequence as one countdown timeline - stops any running programs"""
+    conn = init_database()
+    c = conn.cursor()
+    c.execute('SELECT id, name, steps FROM countdown_sequences WHERE id = ?', (sequence_id,))
+    row = c.fetchone()
+    conn.close()
+    if not row:
+        return jsonify({'error': 'Sequence not found'}), 404
+
+    sequence = sequence_info(row)
+    now = clock.now()
+    timeline = compile_steps(sequence['steps'], now)
+    insert = ('''
+        INSERT INTO countdown_timers (name, target_time, timer_type, started_at, is_active, steps)
+        VALUES (?, ?, 'target_time', ?, TRUE, ?)
+    ''', (sequence['name'], timeline[-1][2].isoformat(), now.isoformat(), json.dumps(timeline_to_json(timeline))))
+    timer_id = activate_countdown(sequence['name'], 'target_time', timeline, insert)
+
+    countdown_log.info("Started sequence '%s': %d steps, ends %s",
+                       sequence['name'], len(timeline), timeline[-1][2].strftime('%H:%M:%S'))
+    return jsonify({
+        'status': 'success',
+        'timer_id': timer_id,
+        'steps': [{'name': name, 'starts_at': starts_at.isoformat(), 'ends_at': ends_at.isoformat()}
+                  for name, starts_at, ends_at in timeline]
+    })
+
+@app.route('/api/time')
+def server_time():
+    """NTP-style clock sync for the displays.
+
+    The client sends ?t0=<its clock at send, epoch ms> and notes t3 when the
+    reply arrives; offset = ((t1 - t0) + (t2 - t3)) / 2 and round-trip delay =
+    (t3 - t0) - (t2 - t1).
+    """
+    received = clock.time_ms()
+    response = jsonify({'t0': request.args.get('t0', type=float),
+                        't1': round(received, 3),
+                        't2': round(clock.time_ms(), 3)})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def epoch_ms(dt):
+    return int(dt.timestamp() * 1000)
+
+def schedule_items(schedule):
+    return [[item['activity_name'], item['duration_minutes'] * 60] for item in schedule]
+
+@app.route('/api/kiosk_plan')
+def kiosk_plan():
+    """Absolute deadlines and upcoming activities for the kiosk.
+
+    The kiosk's service worker caches the latest plan so the display can keep
+    counting down and moving through the schedule on its own while the server
+    is unreachable.
+    """
+    snapshot = display_state.snapshot
+    timer, queued, countdown = snapshot['current_timer'], snapshot['queued_program'], snapshot['countdown_timer']
+    now = clock.now()
+    plan = {'now': epoch_ms(now), 'countdown': None, 'activity': None, 'upcoming': [],
+            'waiting': None, 'queued': None}
+
+    if countdown['is_active'] and countdown['target_time']:
+        plan['countdown'] = {'name': countdown['name'],
+                             'ends_at': epoch_ms(datetime.fromisoformat(countdown['target_time'])),
+                             'steps': serialization.countdown_steps(countdown)}
+
+    state = get_current_state()
+    if state and state[0] and state[2]:
+        is_paused, start_time, activity_name, duration_minutes, schedule_id = state[1:]
+        schedule = get_current_schedule()
+        ids = [item['id'] for item in schedule]
+        plan['activity'] = {
+            'name': activity_name,
+            'started_at': epoch_ms(datetime.fromisoformat(start_time)),
+            'seconds': (duration_minutes or 0) * 60,
+            'paused': bool(is_paused),
+            'remaining': serialization.hms_to_seconds(timer['time_remaining']),
+        }
+        if schedule_id in ids:
+            plan['upcoming'] = schedule_items(schedule[ids.index(schedule_id) + 1:])
+
+    if timer['waiting_for_start']:
+        plan['waiting'] = [timer['waiting_program_name'], timer['scheduled_start_time']]
+
+    if queued['has_queued']:
+        # The auto-start checker only fires on the exact minute, so a start
+        # time that has already passed today never happens
+        try:
+            hour, minute = (int(part) for part in queued['scheduled_start_time'].split(':'))
+            starts_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            starts_at = None
+        conn = init_database()
+        queued_schedule = get_program_schedule(conn.cursor(), queued['program_id'])
+        conn.close()
+        plan['queued'] = {
+            'q': [queued['program_id'], queued['program_name'], queued['scheduled_start_time']],
+            'starts_at': epoch_ms(starts_at) if starts_at and starts_at >= now.replace(second=0, microsecond=0) else None,
+            'items': schedule_items(queued_schedule),
+        }
+
+    return jsonify(plan)
+
 @app.route('/api/timer_status')
 def timer_status():
+    # ?compact=1: short keys and integer seconds, see serialization.compact_timer_status
+    if request.args.get('compact'):
+        return snapshot_json('timer_status:compact', serialization.compact_timer_status)
     # Include waiting state and queue information in the response
-    response_data = current_timer.copy()
-    response_data['queued_program'] = queued_program.copy()
-    return jsonify(response_data)
+    return snapshot_json('timer_status', lambda s: {**s['current_timer'],
+                                                    'queued_program': dict(s['queued_program'])})
 
 if __name__ == '__main__':
-    from database import init_db
-    init_db()
+    structured_log.configure()
+
+    from database import MigrationError, init_db
+    try:
+        with health.phase('migrations'):
+            init_db()
+    except MigrationError as e:
+        # Never serve on a half-migrated schema
+        log.critical('Not starting: %s', e)
+        raise SystemExit(1)
+    db_writer.start()
+
+    with health.phase('occurrences'):
+        load_occurrence_cache()
+
+    with health.phase('search_index'):
+        load_search_indexes()
+
+    with health.phase('assets'):
+        log.info('Fingerprinted %d static files', asset_manifest.build())
+
+    # Restore journaled display state before any thread can touch it
+    with health.phase('recovery'):
+        restore_state()
+        state_journal.start()
+        load_stage_messages()
+        load_countdown()
+        sync_projection()
 
     # Start background threads AFTER database is initialized
-    timer_thread = threading.Thread(target=update_timer_display, daemon=True)
+    timer_thread = threading.Thread(target=update_timer_display, name='timer', daemon=True)
     timer_thread.start()
 
-    auto_start_thread = threading.Thread(target=auto_start_checker, daemon=True)
+    auto_start_thread = threading.Thread(target=auto_start_checker, name='auto_start', daemon=True)
     auto_start_thread.start()
-    print("Auto-start checker thread started")
+    log.info('Auto-start checker thread started')
 
-    remote_sync_thread = threading.Thread(target=sync_programs_from_remote, daemon=True)
+    remote_sync_thread = threading.Thread(target=sync_programs_from_remote, name='remote_sync', daemon=True)
     remote_sync_thread.start()
-    print("Remote program sync thread started")
+    log.info('Remote program sync thread started')
+
+    remote_push_thread = threading.Thread(target=remote_push_worker, name='remote_push', daemon=True)
+    remote_push_thread.start()
 
     # Check and auto-start programs after database initialization
-    check_and_auto_start()
+    with health.phase('auto_start_check'):
+        # Today's prefetched programs, in case the remote feed is unreachable
+        promote_staged_programs()
+        check_and_auto_start()
 
     app.run(host='0.0.0.0', port=80, debug=False, threaded=True)
\ No newline at end of file
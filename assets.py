@@ -0,0 +1,91 @@
+# assets.py
+"""Content-hashed, precompressed static assets.
+
+At startup every .js/.css file under static/ is hashed. Templates reference
+it as /assets/<path>.<hash>.<ext> via asset_url(), so the URL changes
+whenever the content does and can be cached forever by the browser. gzip
+(and brotli, if the brotli package is installed) variants are written once
+per content hash into cache_dir and reused on later boots.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+class AssetManifest:
+    def __init__(self, static_folder, cache_dir='asset_cache', extensions=('.js', '.css')):
+        self.static_folder = static_folder
+        self.cache_dir = cache_dir
+        self.extensions = extensions
+        self.urls = {}   # {'js/admin.js': 'js/admin.1a2b3c4d5e6f.js'}
+        self.files = {}  # {'js/admin.1a2b3c4d5e6f.js': {'mimetype': ..., 'identity': path, 'gzip': path, 'br': path}}
+
+    def build(self):
+        """Hash and precompress every asset; returns the number of assets"""
+        urls, files = {}, {}
+        for root, _, filenames in os.walk(self.static_folder):
+            for filename in filenames:
+                if not filename.endswith(self.extensions):
+                    continue
+                path = os.path.join(root, filename)
+                rel = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                stem, ext = os.path.splitext(rel)
+                hashed = f'{stem}.{digest}{ext}'
+
+                urls[rel] = hashed
+                files[hashed] = {
+                    'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                    'identity': path,
+                    **self._precompress(hashed, data),
+                }
+
+        # Swap in the complete manifest at once
+        self.urls, self.files = urls, files
+        return len(files)
+
+    def _precompress(self, hashed, data):
+        variants = {'gzip': (lambda d: gzip.compress(d, compresslevel=9, mtime=0), '.gz')}
+        if brotli is not None:
+            variants['br'] = (lambda d: brotli.compress(d, quality=11), '.br')
+
+        paths = {}
+        for encoding, (compress, suffix) in variants.items():
+            out_path = os.path.join(self.cache_dir, hashed + suffix)
+            # Same hash means same content, so a previous boot's output is still valid
+            if not os.path.exists(out_path):
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                tmp_path = out_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(compress(data))
+                os.replace(tmp_path, out_path)
+            paths[encoding] = out_path
+        return paths
+
+    def url(self, rel):
+        """Fingerprinted URL for a static file, or the plain static URL if it isn't in the manifest"""
+        hashed = self.urls.get(rel)
+        if hashed is None:
+            return f'/static/{rel}'
+        return f'/assets/{hashed}'
+
+    def lookup(self, hashed, accept_encoding):
+        """Return (path, mimetype, content_encoding) of the best variant, or None"""
+        entry = self.files.get(hashed)
+        if entry is None:
+            return None
+        accept_encoding = accept_encoding or ''
+        for encoding in ('br', 'gzip'):
+            if encoding in entry and encoding in accept_encoding:
+                return entry[encoding], entry['mimetype'], encoding
+        return entry['identity'], entry['mimetype'], None
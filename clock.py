@@ -0,0 +1,58 @@
+# clock.py
+"""The app's time source.
+
+Everything that schedules by wall-clock time calls clock.now()/today()
+instead of datetime.now(), and the timer and auto-start loops sleep with
+clock.sleep(), so a SimulatedClock can be installed to run services in
+virtual time (see simulate.py).
+"""
+import time
+from datetime import datetime, timedelta
+
+class SystemClock:
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class SimulatedClock:
+    """Virtual local time that only moves when advanced - runs are deterministic"""
+
+    def __init__(self, start):
+        self._now = start
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._now.timestamp()
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+_current = SystemClock()
+
+def install(source):
+    """Use source for all clock calls; returns the previous one"""
+    global _current
+    previous, _current = _current, source
+    return previous
+
+def now():
+    return _current.now()
+
+def today():
+    return _current.now().date()
+
+def time_ms():
+    return _current.time() * 1000
+
+def sleep(seconds):
+    _current.sleep(seconds)
@@ -0,0 +1,73 @@
+# countdown_timeline.py
+"""Countdowns as precomputed timelines of absolute deadlines.
+
+A countdown sequence is a list of steps - e.g. 10 min walk-in, 2 min video,
+30 s silence. Starting it compiles the steps into (name, starts_at,
+ends_at) once, so the timer thread and the kiosks find the current step by
+comparing the clock with the deadlines instead of looking anything up. A
+plain countdown is a one-step timeline.
+"""
+from datetime import datetime, timedelta
+
+MIN_STEP_SECONDS = 10
+MAX_STEP_SECONDS = 86400
+MAX_STEPS = 50
+
+def parse_steps(steps):
+    """[{'name', 'duration_seconds'}] from a request -> [{'name', 'duration_seconds'}]; raises ValueError"""
+    if not isinstance(steps, list) or not steps:
+        raise ValueError('steps must be a non-empty list')
+    if len(steps) > MAX_STEPS:
+        raise ValueError(f'a sequence can have at most {MAX_STEPS} steps')
+    parsed = []
+    for number, step in enumerate(steps, 1):
+        name = str(step.get('name') or '').strip() if isinstance(step, dict) else ''
+        if not name:
+            raise ValueError(f'step {number} needs a name')
+        try:
+            seconds = int(step.get('duration_seconds'))
+        except (TypeError, ValueError):
+            raise ValueError(f'step {number} needs duration_seconds') from None
+        if not MIN_STEP_SECONDS <= seconds <= MAX_STEP_SECONDS:
+            raise ValueError(f'step {number} must last {MIN_STEP_SECONDS}-{MAX_STEP_SECONDS} seconds')
+        parsed.append({'name': name, 'duration_seconds': seconds})
+    return parsed
+
+def compile_steps(steps, start):
+    """Parsed steps run back to back from start -> [(name, starts_at, ends_at)]"""
+    timeline = []
+    for step in steps:
+        end = start + timedelta(seconds=step['duration_seconds'])
+        timeline.append((step['name'], start, end))
+        start = end
+    return timeline
+
+def timeline_to_json(timeline):
+    return [[name, starts_at.isoformat(), ends_at.isoformat()] for name, starts_at, ends_at in timeline]
+
+def timeline_from_json(rows):
+    return [(name, datetime.fromisoformat(starts_at), datetime.fromisoformat(ends_at))
+            for name, starts_at, ends_at in rows]
+
+class CountdownTimeline:
+    """The active countdown, if any. Replaced whole on start/stop, so readers need no lock."""
+
+    def __init__(self):
+        self.active = None  # {'id', 'name', 'timer_type', 'steps': [(name, starts_at, ends_at)]}
+
+    def start(self, timer_id, name, timer_type, steps):
+        self.active = {'id': timer_id, 'name': name, 'timer_type': timer_type, 'steps': steps}
+
+    def stop(self):
+        self.active = None
+
+    def position(self, now):
+        """(active countdown, step index, expired) at now, or None when nothing is running"""
+        active = self.active
+        if active is None:
+            return None
+        steps = active['steps']
+        for index, (_, _, ends_at) in enumerate(steps):
+            if now < ends_at:
+                return active, index, False
+        return active, len(steps) - 1, True
@@ -1,93 +1,53 @@
 # database.py
 import sqlite3
+import sys
 from datetime import datetime
 import os
 
+from structured_log import get_logger
+
+log = get_logger('database')
+
+DB_PATH = 'church_timer.db'
+
+class MigrationError(RuntimeError):
+    """A migration failed; the database was left at the last applied version"""
+
+    def __init__(self, version, error):
+        super().__init__(f'Migration {version} failed: {error}')
+        self.version = version
+
+# Migration registry: (version, description, function) in ascending order.
+# The schema version is stored in PRAGMA user_version, so a database that is
+# already current costs a single integer read at startup.
+MIGRATIONS = []
+
+def migration(version, description):
+    """Register a schema migration under the given version number"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
 def get_table_columns(cursor, table_name):
     """Get list of columns for a table"""
     cursor.execute(f"PRAGMA table_info({table_name})")
     return [row[1] for row in cursor.fetchall()]
 
-def run_migrations(conn):
-    """Run all necessary migrations to update schema"""
-    c = conn.cursor()
-    migrations_run = []
-    
-    try:
-        # Migration 1: Add columns to programs table
-        programs_columns = get_table_columns(c, 'programs')
-        
-        if 'day_of_week' not in programs_columns:
-            print("Running migration: Adding day_of_week to programs...")
-            c.execute('ALTER TABLE programs ADD COLUMN day_of_week TEXT')
-            migrations_run.append("day_of_week")
-        
-        if 'auto_start' not in programs_columns:
-            print("Running migration: Adding auto_start to programs...")
-            c.execute('ALTER TABLE programs ADD COLUMN auto_start BOOLEAN DEFAULT FALSE')
-            migrations_run.append("auto_start")
-        
-        if 'scheduled_start_time' not in programs_columns:
-            print("Running migration: Adding scheduled_start_time to programs...")
-            c.execute('ALTER TABLE programs ADD COLUMN scheduled_start_time TEXT')
-            migrations_run.append("scheduled_start_time")
-        
-        # Migration 2: Add columns to current_state table
-        current_state_columns = get_table_columns(c, 'current_state')
-        
-        if 'manual_override' not in current_state_columns:
-            print("Running migration: Adding manual_override to current_state...")
-            c.execute('ALTER TABLE current_state ADD COLUMN manual_override BOOLEAN DEFAULT FALSE')
-            migrations_run.append("manual_override")
-        
-        # Migration 3: Add columns to activities table
-        activities_columns = get_table_columns(c, 'activities')
-        
-        if 'default_duration' not in activities_columns:
-            print("Running migration: Adding default_duration to activities...")
-            c.execute('ALTER TABLE activities ADD COLUMN default_duration INTEGER DEFAULT 5')
-            migrations_run.append("default_duration")
-        
-        if 'description' not in activities_columns:
-            print("Running migration: Adding description to activities...")
-            c.execute('ALTER TABLE activities ADD COLUMN description TEXT')
-            migrations_run.append("description")
-        
-        # Migration 4: Add sort_order to program_schedules
-        schedule_columns = get_table_columns(c, 'program_schedules')
-        
-        if 'sort_order' not in schedule_columns:
-            print("Running migration: Adding sort_order to program_schedules...")
-            c.execute('ALTER TABLE program_schedules ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0')
-            
-            # Update sort_order for existing records
-            c.execute('SELECT id, program_id FROM program_schedules ORDER BY program_id, id')
-            records = c.fetchall()
-            
-            current_program = None
-            order = 0
-            for rec_id, program_id in records:
-                if program_id != current_program:
-                    current_program = program_id
-                    order = 0
-                c.execute('UPDATE program_schedules SET sort_order = ? WHERE id = ?', (order, rec_id))
-                order += 1
-            
-            migrations_run.append("sort_order")
-        
-        if migrations_run:
-            print(f"Migrations completed: {', '.join(migrations_run)}")
-        
-        conn.commit()
-        
-    except Exception as e:
-        print(f"Migration error: {e}")
-        # Don't fail - the tables might already have the columns
-
-def init_db():
-    conn = sqlite3.connect('church_timer.db')
-    c = conn.cursor()
-    
+def add_column_if_missing(c, table_name, column_name, column_def):
+    """Add a column to a table created by an older version of the app"""
+    if column_name not in get_table_columns(c, table_name):
+        c.execute(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_def}')
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def latest_schema_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+@migration(1, 'Base tables and default data')
+def _create_base_tables(c):
     # Only create tables if they don't exist - DON'T drop existing tables
     c.execute('''
         CREATE TABLE IF NOT EXISTS programs (
@@ -100,7 +60,7 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS activities (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -110,7 +70,7 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS program_schedules (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -125,7 +85,7 @@ def init_db():
             UNIQUE(program_id, sort_order)
         )
     ''')
-    
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS current_state (
             id INTEGER PRIMARY KEY CHECK (id = 1),
@@ -140,7 +100,7 @@ def init_db():
             FOREIGN KEY (current_schedule_id) REFERENCES program_schedules (id)
         )
     ''')
-    
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS stage_messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -151,7 +111,7 @@ def init_db():
             is_active BOOLEAN DEFAULT TRUE
         )
     ''')
-    
+
     c.execute('''
         CREATE TABLE IF NOT EXISTS countdown_timers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -164,14 +124,53 @@ def init_db():
             is_active BOOLEAN DEFAULT FALSE
         )
     ''')
-    
-    # Run migrations for existing tables
-    run_migrations(conn)
-    
+
+@migration(2, 'Add day_of_week, auto_start and scheduled_start_time to programs')
+def _add_program_scheduling_columns(c):
+    add_column_if_missing(c, 'programs', 'day_of_week', 'TEXT')
+    add_column_if_missing(c, 'programs', 'auto_start', 'BOOLEAN DEFAULT FALSE')
+    add_column_if_missing(c, 'programs', 'scheduled_start_time', 'TEXT')
+
+@migration(3, 'Ensure current_state has all state columns including manual_override')
+def _add_current_state_columns(c):
+    required_columns = [
+        ('current_program_id', 'INTEGER'),
+        ('current_schedule_id', 'INTEGER'),
+        ('is_running', 'BOOLEAN DEFAULT FALSE'),
+        ('is_paused', 'BOOLEAN DEFAULT FALSE'),
+        ('start_time', 'TIMESTAMP'),
+        ('paused_at', 'TIMESTAMP'),
+        ('manual_override', 'BOOLEAN DEFAULT FALSE'),
+    ]
+    for column_name, column_def in required_columns:
+        add_column_if_missing(c, 'current_state', column_name, column_def)
+
+@migration(4, 'Add default_duration and description to activities')
+def _add_activity_columns(c):
+    add_column_if_missing(c, 'activities', 'default_duration', 'INTEGER DEFAULT 5')
+    add_column_if_missing(c, 'activities', 'description', 'TEXT')
+
+@migration(5, 'Add sort_order to program_schedules')
+def _add_schedule_sort_order(c):
+    if 'sort_order' in get_table_columns(c, 'program_schedules'):
+        return
+    c.execute('ALTER TABLE program_schedules ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0')
+
+    # Number existing records per program in id order with one statement
+    c.execute('''
+        UPDATE program_schedules
+        SET sort_order = (
+            SELECT COUNT(*) FROM program_schedules earlier
+            WHERE earlier.program_id = program_schedules.program_id
+              AND earlier.id < program_schedules.id
+        )
+    ''')
+
+@migration(6, 'Seed default activities, programs and current state')
+def _seed_default_data(c):
     # Only insert default data if tables are empty
     c.execute('SELECT COUNT(*) FROM activities')
     if c.fetchone()[0] == 0:
-        # Insert default activities only if table is empty
         default_activities = [
             ('Prayer', 15, 'Prayer time'),
             ('Praise', 15, 'Praise and worship'),
@@ -181,61 +180,174 @@ def init_db():
             ('Word', 60, 'Sermon/Message'),
             ('Admin/close', 5, 'Administration and closing')
         ]
-        
-        for activity_name, duration, desc in default_activities:
-            c.execute('INSERT INTO activities (name, default_duration, description) VALUES (?, ?, ?)', 
-                     (activity_name, duration, desc))
-    
+        c.executemany('INSERT INTO activities (name, default_duration, description) VALUES (?, ?, ?)',
+                      default_activities)
+
     c.execute('SELECT COUNT(*) FROM programs')
     if c.fetchone()[0] == 0:
-        # Insert default programs only if table is empty
-        c.execute('INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start) VALUES (?, ?, ?, ?, ?)', 
-                 ('Sunday Program', 'Regular Sunday service schedule', '09:30', 'Sunday', True))
-        sunday_id = c.lastrowid
-        
-        sunday_schedule = [
-            ('Prayer', 15),
-            ('Praise', 15),
-            ('Announcements', 5),
-            ('Bible reading', 5),
-            ('Worship', 15),
-            ('Word', 60),
-            ('Admin/close', 5)
-        ]
-        
-        for i, (activity_name, duration) in enumerate(sunday_schedule):
-            c.execute('SELECT id FROM activities WHERE name = ?', (activity_name,))
-            activity_id = c.fetchone()[0]
-            c.execute('''
-                INSERT INTO program_schedules (program_id, activity_id, duration_minutes, sort_order)
-                VALUES (?, ?, ?, ?)
-            ''', (sunday_id, activity_id, duration, i))
-        
-        c.execute('INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start) VALUES (?, ?, ?, ?, ?)', 
-                 ('Friday Service', 'Friday evening service', '18:00', 'Friday', True))
-        friday_id = c.lastrowid
-        
-        friday_schedule = [
-            ('Prayer', 80),
-            ('Admin/close', 10)
+        default_programs = [
+            ('Sunday Program', 'Regular Sunday service schedule', '09:30', 'Sunday', [
+                ('Prayer', 15),
+                ('Praise', 15),
+                ('Announcements', 5),
+                ('Bible reading', 5),
+                ('Worship', 15),
+                ('Word', 60),
+                ('Admin/close', 5)
+            ]),
+            ('Friday Service', 'Friday evening service', '18:00', 'Friday', [
+                ('Prayer', 80),
+                ('Admin/close', 10)
+            ]),
         ]
-        
-        for i, (activity_name, duration) in enumerate(friday_schedule):
-            c.execute('SELECT id FROM activities WHERE name = ?', (activity_name,))
-            activity_id = c.fetchone()[0]
-            c.execute('''
+
+        for name, description, start_time, day, schedule in default_programs:
+            c.execute('INSERT INTO programs (name, description, scheduled_start_time, day_of_week, auto_start) VALUES (?, ?, ?, ?, ?)',
+                     (name, description, start_time, day, True))
+            program_id = c.lastrowid
+            c.executemany('''
                 INSERT INTO program_schedules (program_id, activity_id, duration_minutes, sort_order)
-                VALUES (?, ?, ?, ?)
-            ''', (friday_id, activity_id, duration, i))
-    
+                SELECT ?, id, ?, ? FROM activities WHERE name = ?
+            ''', [(program_id, duration, i, activity_name)
+                  for i, (activity_name, duration) in enumerate(schedule)])
+
     # Initialize current state only if it doesn't exist
-    c.execute('SELECT COUNT(*) FROM current_state')
-    if c.fetchone()[0] == 0:
-        c.execute('INSERT INTO current_state (id) VALUES (1)')
-    
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully!")
+    c.execute('INSERT OR IGNORE INTO current_state (id) VALUES (1)')
+
+@migration(7, 'Add service_runs history table')
+def _create_service_runs(c):
+    # One row per activity start/pause/resume/skip/end, in the order they happened
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS service_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_id INTEGER,
+            program_name TEXT,
+            schedule_id INTEGER,
+            activity_id INTEGER,
+            activity_name TEXT,
+            planned_seconds INTEGER,
+            event TEXT NOT NULL CHECK(event IN ('start', 'pause', 'resume', 'skip', 'end')),
+            occurred_at TIMESTAMP NOT NULL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_service_runs_occurred_at ON service_runs (occurred_at)')
+
+@migration(8, 'Add recurrence rules to programs')
+def _add_program_recurrence(c):
+    # JSON rule (see recurrence.py); NULL means weekly on day_of_week
+    add_column_if_missing(c, 'programs', 'recurrence', 'TEXT')
+
+@migration(9, 'Add remote sync state tables')
+def _create_remote_sync_state(c):
+    # Last applied version of each remote program, so a restart doesn't re-sync them
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS remote_sync_state (
+            remote_id TEXT PRIMARY KEY,
+            hash TEXT NOT NULL,
+            program_id INTEGER,
+            last_synced_at TIMESTAMP NOT NULL
+        )
+    ''')
+    # ETag of the last fully applied feed response, for conditional polling
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS remote_feed_state (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            updated_at TIMESTAMP NOT NULL
+        )
+    ''')
+
+@migration(10, 'Add staging table for prefetched remote programs')
+def _create_remote_staged_programs(c):
+    # Remote program payloads for the coming week, applied on their day
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS remote_staged_programs (
+            remote_id TEXT NOT NULL,
+            service_date TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (remote_id, service_date)
+        )
+    ''')
+
+@migration(11, 'Add priority and start time to stage messages')
+def _add_stage_message_windows(c):
+    # Messages queue by priority; NULL starts_at (older rows) means end_time - duration_seconds
+    add_column_if_missing(c, 'stage_messages', 'priority', 'INTEGER NOT NULL DEFAULT 0')
+    add_column_if_missing(c, 'stage_messages', 'starts_at', 'TIMESTAMP')
+
+@migration(12, 'Add countdown sequences')
+def _create_countdown_sequences(c):
+    # Saved chains of countdowns; steps is a JSON list of {name, duration_seconds}
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS countdown_sequences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            steps TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Compiled timeline of a started sequence (see countdown_timeline.py); NULL for single countdowns
+    add_column_if_missing(c, 'countdown_timers', 'steps', 'TEXT')
+
+def run_migrations(conn, target_version=None):
+    """Apply pending migrations, each in its own transaction.
+
+    Returns the list of versions applied. The first failure is rolled back
+    and raised as MigrationError, leaving the database at the last
+    successfully applied version.
+    """
+    current_version = get_schema_version(conn)
+    if target_version is None:
+        target_version = latest_schema_version()
+    if current_version >= target_version:
+        return []
+
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version <= current_version or version > target_version:
+            continue
+
+        log.info('Running migration %d: %s...', version, description)
+        c = conn.cursor()
+        try:
+            c.execute('BEGIN IMMEDIATE')
+            func(c)
+            # user_version lives in the database header and is part of the transaction
+            c.execute(f'PRAGMA user_version = {int(version)}')
+            c.execute('COMMIT')
+        except Exception as e:
+            c.execute('ROLLBACK')
+            log.error('Migration %d failed: %s', version, e)
+            if applied:
+                log.info('Migrations completed before the failure: %s', ', '.join(str(v) for v in applied))
+            raise MigrationError(version, e) from e
+        applied.append(version)
+
+    if applied:
+        log.info('Migrations completed: %s', ', '.join(str(v) for v in applied))
+    return applied
+
+def connect(db_path=DB_PATH):
+    # Autocommit mode so run_migrations controls its own transactions
+    return sqlite3.connect(db_path, isolation_level=None)
+
+def init_db(db_path=DB_PATH):
+    """Bring the database up to the latest schema; raises MigrationError otherwise"""
+    conn = connect(db_path)
+    try:
+        run_migrations(conn)
+        version = get_schema_version(conn)
+    finally:
+        conn.close()
+    if version < latest_schema_version():
+        raise MigrationError(version + 1, f'schema is at version {version}, expected {latest_schema_version()}')
+    log.info('Database initialized successfully!')
 
 if __name__ == '__main__':
-    init_db()
+    try:
+        init_db()
+    except MigrationError as e:
+        log.error('Database not initialized: %s', e)
+        sys.exit(1)
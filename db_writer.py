@@ -0,0 +1,120 @@
+# db_writer.py
+"""Single-writer, write-behind queue for SQLite.
+
+All control and logging writes go through one thread holding one
+connection, so request handlers and background loops never contend for the
+database lock. Queued writes are grouped into one transaction per batch;
+each write runs inside its own savepoint so a failing write doesn't take the
+rest of the batch with it.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from server_timing import TimedFuture
+from structured_log import get_logger
+
+log = get_logger('db_writer')
+
+class DatabaseWriter:
+    def __init__(self, db_path, batch_window=0.005, max_batch=100):
+        self.db_path = db_path
+        self.batch_window = batch_window  # seconds to wait for more writes to group
+        self.max_batch = max_batch
+        self._pending = OrderedDict()     # {key: (func, future)} in submission order
+        self._cond = threading.Condition()
+        self._counter = 0
+        self._thread = None
+        self.stats = {'batches': 0, 'writes': 0, 'coalesced': 0, 'errors': 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, coalesce_key=None):
+        """Queue func(cursor) to run in the writer's transaction.
+
+        Returns a Future with func's return value. If a write with the same
+        coalesce_key is still queued, it is replaced by this one and both
+        futures resolve when the replacement commits.
+        """
+        future = TimedFuture()
+        with self._cond:
+            if coalesce_key is not None and coalesce_key in self._pending:
+                _, previous = self._pending.pop(coalesce_key)
+                future.add_done_callback(lambda f: _copy_outcome(f, previous))
+                self.stats['coalesced'] += 1
+            key = coalesce_key
+            if key is None:
+                self._counter += 1
+                key = ('_', self._counter)
+            self._pending[key] = (func, future)
+            self._cond.notify()
+        return future
+
+    def execute(self, sql, params=(), coalesce_key=None):
+        """Queue a single statement; the future resolves to (rowcount, lastrowid)"""
+        def run(c):
+            c.execute(sql, params)
+            return c.rowcount, c.lastrowid
+        return self.submit(run, coalesce_key)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been committed"""
+        return self.submit(lambda c: None).result(timeout)
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+        # Give concurrent callers a moment to join this transaction
+        time.sleep(self.batch_window)
+        with self._cond:
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False)[1])
+            return batch
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')  # readers don't block the writer
+        conn.execute('PRAGMA busy_timeout=5000')
+        c = conn.cursor()
+
+        while True:
+            batch = self._take_batch()
+            results = []
+            try:
+                c.execute('BEGIN IMMEDIATE')
+                for func, future in batch:
+                    c.execute('SAVEPOINT write')
+                    try:
+                        results.append((future, func(c), None))
+                        c.execute('RELEASE write')
+                    except Exception as e:
+                        c.execute('ROLLBACK TO write')
+                        c.execute('RELEASE write')
+                        log.error('Write failed: %s', e)
+                        results.append((future, None, e))
+                c.execute('COMMIT')
+            except Exception as e:
+                if conn.in_transaction:
+                    c.execute('ROLLBACK')
+                log.exception('Batch of %d failed: %s', len(batch), e)
+                results = [(future, None, e) for _, future in batch]
+
+            self.stats['batches'] += 1
+            self.stats['writes'] += len(batch)
+            for future, result, error in results:
+                if error is not None:
+                    self.stats['errors'] += 1
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+def _copy_outcome(source, target):
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
@@ -0,0 +1,92 @@
+# health.py
+"""Liveness/readiness tracking and startup phase timings"""
+import threading
+import time
+from contextlib import contextmanager
+
+from structured_log import get_logger
+
+log = get_logger('startup')
+
+class HealthMonitor:
+    """Tracks startup phases and background worker heartbeats.
+
+    The app is ready once every required phase has completed and every
+    expected worker has reported at least one heartbeat.
+    """
+
+    def __init__(self, required_phases=(), expected_workers=()):
+        self.started_at = time.time()
+        self._boot = time.monotonic()
+        self._lock = threading.Lock()
+        self.required_phases = list(required_phases)
+        self.expected_workers = list(expected_workers)
+        self.phases = {}        # {name: {'started': s, 'duration': s}} offsets from boot
+        self.heartbeats = {}    # {worker: monotonic time of last heartbeat}
+        self.first_heartbeats = {}  # {worker: seconds from boot}
+        self.ready_after = None
+
+    def _elapsed(self):
+        return time.monotonic() - self._boot
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase; it only counts as complete if it doesn't raise"""
+        started = self._elapsed()
+        yield
+        with self._lock:
+            self.phases[name] = {'started': round(started, 4),
+                                 'duration': round(self._elapsed() - started, 4)}
+        self._check_ready()
+
+    def heartbeat(self, worker):
+        now = time.monotonic()
+        with self._lock:
+            self.heartbeats[worker] = now
+            if worker not in self.first_heartbeats:
+                self.first_heartbeats[worker] = round(now - self._boot, 4)
+                first = True
+            else:
+                first = False
+        if first:
+            self._check_ready()
+
+    def _check_ready(self):
+        with self._lock:
+            if self.ready_after is not None:
+                return
+            if any(p not in self.phases for p in self.required_phases):
+                return
+            if any(w not in self.first_heartbeats for w in self.expected_workers):
+                return
+            self.ready_after = round(self._elapsed(), 4)
+        log.info('Ready in %.3fs — %s', self.ready_after, self.format_breakdown(), extra={'ready_after': self.ready_after})
+
+    @property
+    def is_ready(self):
+        return self.ready_after is not None
+
+    def format_breakdown(self):
+        parts = [f"{name} {info['duration']:.3f}s" for name, info in self.phases.items()]
+        parts += [f"{worker} first heartbeat at {t:.3f}s" for worker, t in self.first_heartbeats.items()]
+        return ', '.join(parts)
+
+    def status(self):
+        """Snapshot of readiness details for the health endpoints"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'ready': self.ready_after is not None,
+                'uptime_seconds': round(now - self._boot, 3),
+                'ready_after_seconds': self.ready_after,
+                'phases': dict(self.phases),
+                'pending_phases': [p for p in self.required_phases if p not in self.phases],
+                'workers': {
+                    worker: {
+                        'first_heartbeat_seconds': self.first_heartbeats.get(worker),
+                        'last_heartbeat_age_seconds': round(now - self.heartbeats[worker], 3)
+                            if worker in self.heartbeats else None,
+                    }
+                    for worker in self.expected_workers
+                },
+            }
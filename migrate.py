@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Migration tool for Church Timer database
+Replaces the old one-off migrate_*.py scripts with the versioned registry in database.py
+
+Usage:
+    python migrate.py              # apply all pending migrations
+    python migrate.py status       # show current and latest schema version
+    python migrate.py up --to 3    # migrate up to a specific version
+"""
+import argparse
+import logging
+import os
+import sys
+
+from database import (DB_PATH, MIGRATIONS, MigrationError, connect, get_schema_version, latest_schema_version,
+                      run_migrations)
+
+def show_status(conn):
+    current_version = get_schema_version(conn)
+    print(f"Schema version: {current_version} (latest: {latest_schema_version()})")
+    print()
+    for version, description, _ in MIGRATIONS:
+        marker = '✓' if version <= current_version else ' '
+        print(f"  [{marker}] {version:3d}  {description}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Church Timer database migrations')
+    parser.add_argument('command', nargs='?', default='up', choices=['up', 'status'])
+    parser.add_argument('--db', default=DB_PATH, help=f'database file (default: {DB_PATH})')
+    parser.add_argument('--to', type=int, default=None, help='target schema version (default: latest)')
+    args = parser.parse_args(argv)
+    # Show migration progress from database.py as plain lines
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
+    if args.command == 'status' and not os.path.exists(args.db):
+        print(f"Database file '{args.db}' not found!")
+        return 1
+
+    conn = connect(args.db)
+    try:
+        if args.command == 'status':
+            show_status(conn)
+            return 0
+
+        target_version = args.to if args.to is not None else latest_schema_version()
+        try:
+            applied = run_migrations(conn, target_version)
+        except MigrationError:
+            applied = None
+        current_version = get_schema_version(conn)
+
+        if current_version < target_version:
+            print(f"❌ Migration stopped at version {current_version}")
+            return 1
+        if not applied:
+            print(f"✅ Database schema is up to date (version {current_version})")
+        else:
+            print(f"✅ Migrated to version {current_version}")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
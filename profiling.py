@@ -0,0 +1,150 @@
+# profiling.py
+"""Opt-in profiling that writes flamegraph-compatible output.
+
+- save_profile(): write a cProfile run (the app profiles single requests
+  sent with ?profile=1 or an X-Profile: 1 header) as both the raw .prof,
+  for pstats/snakeviz, and a .folded file.
+- SamplingProfiler: samples the stacks of named background threads every
+  few milliseconds while enabled and saves what it saw as a .folded file.
+
+.folded files are the collapsed-stack format ("a;b;c 42" per line) read by
+flamegraph.pl, speedscope and inferno.
+"""
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_DIR = 'profiles'
+MAX_STACK_DEPTH = 64
+
+def _frame_label(filename, line, name):
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+def _output_path(label, suffix):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in label)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'{int(now % 1 * 1000):03d}'
+    return os.path.join(PROFILE_DIR, f"{stamp}-{safe}{suffix}")
+
+def write_folded(path, counts):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in sorted(counts.items()):
+            f.write(f"{stack} {count}\n")
+
+def pstats_to_folded(stats):
+    """Approximate collapsed stacks from cProfile data, weighted in microseconds.
+
+    cProfile only records caller -> callee edges, so each function's own time
+    is split between its callers in proportion to the time they spent calling
+    it (the same approach flameprof uses).
+    """
+    entries = stats.stats  # {func: (cc, nc, tt, ct, callers)}
+    counts = Counter()
+
+    def walk(func, weight, path, depth):
+        callers = entries.get(func, (0, 0, 0, 0, {}))[4]
+        callers = {caller: timing for caller, timing in callers.items() if caller not in path}
+        total = sum(timing[3] for timing in callers.values())
+        if not callers or total <= 0 or depth >= MAX_STACK_DEPTH:
+            stack = ';'.join(_frame_label(*f) for f in reversed(path))
+            counts[stack] += weight
+            return
+        for caller, timing in callers.items():
+            walk(caller, weight * timing[3] / total, path + (caller,), depth + 1)
+
+    for func, (_, _, own_time, _, _) in entries.items():
+        if own_time > 0:
+            walk(func, own_time * 1e6, (func,), 0)
+    return Counter({stack: int(round(us)) for stack, us in counts.items() if us >= 1})
+
+def save_profile(label, profiler):
+    """Write profiler's data as .prof and .folded; returns the .folded path"""
+    prof_path = _output_path(label, '.prof')
+    profiler.dump_stats(prof_path)
+    folded_path = prof_path[:-len('.prof')] + '.folded'
+    write_folded(folded_path, pstats_to_folded(pstats.Stats(prof_path)))
+    return folded_path
+
+class SamplingProfiler:
+    """Low-overhead stack sampler for long-running background threads.
+
+    Nothing runs until start(); the sampler thread then reads
+    sys._current_frames() every `interval` seconds, which costs the sampled
+    threads nothing beyond the GIL hand-off.
+    """
+
+    def __init__(self, thread_names=(), interval=0.005):
+        self.thread_names = list(thread_names)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._samples = 0
+        self._started_at = None
+        self._stop = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, thread_names=None, interval=None):
+        with self._lock:
+            if self._thread is not None:
+                return False
+            if thread_names:
+                self.thread_names = list(thread_names)
+            if interval:
+                self.interval = interval
+            self._counts, self._samples = Counter(), 0
+            self._started_at = time.time()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name='sampling-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """Stop sampling and save the result; returns the .folded path, or None if not running"""
+        with self._lock:
+            if self._thread is None:
+                return None
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        thread.join()
+        path = _output_path('threads', '.folded')
+        write_folded(path, self._counts)
+        return path
+
+    def status(self):
+        return {
+            'running': self.running,
+            'threads': self.thread_names,
+            'interval_ms': round(self.interval * 1000, 3),
+            'samples': self._samples,
+            'started_at': self._started_at if self.running else None,
+        }
+
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            wanted = {t.ident: t.name for t in threading.enumerate() if t.name in self.thread_names}
+            frames = sys._current_frames()
+            for ident, name in wanted.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(_frame_label(code.co_filename, frame.f_lineno, code.co_name))
+                    frame = frame.f_back
+                if stack:
+                    self._counts[';'.join([name, *reversed(stack)])] += 1
+            self._samples += 1
+
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith(('.folded', '.prof'))),
+                  reverse=True)
@@ -0,0 +1,134 @@
+# projection.py
+"""Projected start and end of every remaining item in the running program.
+
+Maintained from the events that move the schedule instead of recomputed
+from SQL on each request. The items' planned durations are kept as
+cumulative offsets in live order, so after the current item everything is
+"current end + offset", and each event only moves one anchor:
+
+    pause/resume  the current item's end shifts by the time spent paused
+    next          the anchor becomes the next item's start
+    reorder       the offsets are rebuilt from the new order (no SQL)
+
+Overrun is measured against the program's scheduled_start_time plus the
+planned durations in the same order.
+"""
+import threading
+from datetime import timedelta
+
+class ProjectedTimeline:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._program = None      # {'id', 'name', 'scheduled_start'}; None while nothing runs
+        self._items = []          # [(schedule_id, activity name, planned seconds)] in live order
+        self._offsets = [0]       # seconds from the program start to each item's start, then the total
+        self._index = None        # current item in _items
+        self._started_at = None   # current item's start, moved forward by resumes
+        self._paused_at = None
+
+    def _set_items(self, schedule):
+        self._items = [(item['id'], item['activity_name'], item['duration_minutes'] * 60) for item in schedule]
+        self._offsets = [0]
+        for _, _, seconds in self._items:
+            self._offsets.append(self._offsets[-1] + seconds)
+
+    def _index_of(self, schedule_id):
+        return next((i for i, item in enumerate(self._items) if item[0] == schedule_id), None)
+
+    def start(self, program, schedule, schedule_id, started_at, paused_at=None):
+        """Project program from its schedule item schedule_id, which started at started_at"""
+        with self._lock:
+            self._set_items(schedule)
+            self._index = self._index_of(schedule_id)
+            self._program = program if self._index is not None else None
+            self._started_at = started_at
+            self._paused_at = paused_at
+
+    def clear(self):
+        with self._lock:
+            self._program = None
+            self._index = None
+
+    def reorder(self, schedule):
+        with self._lock:
+            if self._program is None:
+                return
+            current = self._items[self._index][0]
+            self._set_items(schedule)
+            self._index = self._index_of(current)
+            if self._index is None:
+                self._program = None
+
+    def advance(self, schedule_id, now):
+        """The current item is now schedule_id, started at now"""
+        with self._lock:
+            if self._program is None:
+                return
+            self._index = self._index_of(schedule_id)
+            if self._index is None:
+                self._program = None
+            self._started_at = now
+            self._paused_at = None
+
+    def pause(self, now):
+        with self._lock:
+            if self._program is not None and self._paused_at is None:
+                self._paused_at = now
+
+    def resume(self, now):
+        with self._lock:
+            if self._program is not None and self._paused_at is not None:
+                self._started_at += now - self._paused_at
+                self._paused_at = None
+
+    @property
+    def program_id(self):
+        program = self._program
+        return program['id'] if program else None
+
+    def project(self, now):
+        """{program, items, projected_end, planned_end, overrun_seconds} as of now"""
+        with self._lock:
+            program, index = self._program, self._index
+            items, offsets = self._items, self._offsets
+            started_at, paused_at = self._started_at, self._paused_at
+        if program is None:
+            return {'is_running': False, 'items': []}
+
+        # A paused item keeps its remaining time, so its end moves with the clock
+        held = now - paused_at if paused_at else timedelta(0)
+        current_end = started_at + timedelta(seconds=items[index][2]) + held
+        base = offsets[index + 1]
+        scheduled_start = program['scheduled_start']
+
+        projected = []
+        for k in range(index, len(items)):
+            schedule_id, name, seconds = items[k]
+            start = started_at if k == index else current_end + timedelta(seconds=offsets[k] - base)
+            entry = {
+                'schedule_id': schedule_id,
+                'activity_name': name,
+                'planned_seconds': seconds,
+                'is_current': k == index,
+                'projected_start': start.isoformat(timespec='seconds'),
+                'projected_end': (current_end if k == index else start + timedelta(seconds=seconds)).isoformat(timespec='seconds'),
+            }
+            if scheduled_start:
+                planned = scheduled_start + timedelta(seconds=offsets[k])
+                entry['planned_start'] = planned.isoformat(timespec='seconds')
+                entry['delay_seconds'] = int((start - planned).total_seconds())
+            projected.append(entry)
+
+        projected_end = current_end + timedelta(seconds=offsets[-1] - base)
+        planned_end = scheduled_start + timedelta(seconds=offsets[-1]) if scheduled_start else None
+        return {
+            'is_running': True,
+            'is_paused': paused_at is not None,
+            'program_id': program['id'],
+            'program_name': program['name'],
+            'scheduled_start_time': scheduled_start.isoformat(timespec='seconds') if scheduled_start else None,
+            'items': projected,
+            'projected_end': projected_end.isoformat(timespec='seconds'),
+            'planned_end': planned_end.isoformat(timespec='seconds') if planned_end else None,
+            'overrun_seconds': int((projected_end - planned_end).total_seconds()) if planned_end else None,
+        }
@@ -0,0 +1,218 @@
+# recurrence.py
+"""Recurrence rules for program start times and a cache of upcoming starts.
+
+A rule is stored as JSON in programs.recurrence:
+
+    {"freq": "weekly", "days": ["Sunday"], "interval": 2, "anchor": "2026-01-04"}
+    {"freq": "monthly", "monthdays": [1, 15]}
+    {"freq": "monthly", "weekday": "Sunday", "nth": 1}      # nth -1 = last
+    {"freq": "dates", "dates": ["2026-12-25"]}
+
+Any rule may also carry "dates" (extra one-off dates), "except" (dates to
+skip) and "start"/"until" bounds. Programs without a rule recur weekly on
+their day_of_week. The start time is always programs.scheduled_start_time.
+
+OccurrenceCache expands every auto-start program's rule over a rolling
+horizon into one sorted list, so "what starts next" is a bisect instead of
+a query. Programs are added/removed incrementally as they are edited.
+"""
+import bisect
+import calendar
+import json
+import threading
+from datetime import date, datetime, time, timedelta
+
+WEEKDAYS = list(calendar.day_name)  # Monday .. Sunday, matching date.weekday()
+FREQUENCIES = ('weekly', 'monthly', 'dates')
+
+def _parse_date(value, field):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: expected YYYY-MM-DD, got {value!r}")
+
+def _parse_weekday(value, field):
+    if value not in WEEKDAYS:
+        raise ValueError(f"{field}: expected a weekday name, got {value!r}")
+    return WEEKDAYS.index(value)
+
+def parse_start_time(value):
+    """'HH:MM' -> datetime.time, or None if unset/invalid"""
+    try:
+        hour, minute = (int(part) for part in (value or '').split(':'))
+        return time(hour, minute)
+    except ValueError:
+        return None
+
+def validate_rule(rule):
+    """Check a rule dict and return it normalised; raises ValueError"""
+    if not isinstance(rule, dict):
+        raise ValueError('recurrence must be an object')
+    freq = rule.get('freq')
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq: expected one of {', '.join(FREQUENCIES)}")
+
+    normalised = {'freq': freq}
+    if freq == 'weekly':
+        days = rule.get('days') or []
+        if not days:
+            raise ValueError('days: at least one weekday is required')
+        for day in days:
+            _parse_weekday(day, 'days')
+        interval = rule.get('interval', 1)
+        if not isinstance(interval, int) or interval < 1:
+            raise ValueError('interval: expected a positive integer')
+        normalised.update(days=list(days), interval=interval)
+        if interval > 1:
+            # Alternate weeks are counted from the week containing the anchor
+            normalised['anchor'] = _parse_date(rule.get('anchor'), 'anchor').isoformat()
+    elif freq == 'monthly':
+        if 'weekday' in rule:
+            _parse_weekday(rule['weekday'], 'weekday')
+            nth = rule.get('nth')
+            if nth not in (1, 2, 3, 4, 5, -1):
+                raise ValueError('nth: expected 1-5 or -1 (last)')
+            normalised.update(weekday=rule['weekday'], nth=nth)
+        else:
+            monthdays = rule.get('monthdays') or []
+            if not monthdays or not all(isinstance(d, int) and 1 <= d <= 31 for d in monthdays):
+                raise ValueError('monthdays: expected day numbers 1-31')
+            normalised['monthdays'] = list(monthdays)
+
+    for field in ('dates', 'except'):
+        if rule.get(field):
+            normalised[field] = sorted(_parse_date(d, field).isoformat() for d in rule[field])
+    if freq == 'dates' and not normalised.get('dates'):
+        raise ValueError('dates: at least one date is required')
+    for field in ('start', 'until'):
+        if rule.get(field):
+            normalised[field] = _parse_date(rule[field], field).isoformat()
+    return normalised
+
+def load_rule(recurrence_json, day_of_week):
+    """The stored rule for a program, or the legacy weekly rule from day_of_week"""
+    if recurrence_json:
+        return json.loads(recurrence_json)
+    if day_of_week in WEEKDAYS:
+        return {'freq': 'weekly', 'days': [day_of_week], 'interval': 1}
+    return None
+
+def _nth_weekday(year, month, weekday, nth):
+    days = [week[weekday] for week in calendar.monthcalendar(year, month) if week[weekday]]
+    if nth == -1:
+        return date(year, month, days[-1])
+    return date(year, month, days[nth - 1]) if nth <= len(days) else None
+
+def occurrence_dates(rule, start, end):
+    """Sorted dates in [start, end) on which the rule occurs"""
+    if rule.get('start'):
+        start = max(start, date.fromisoformat(rule['start']))
+    if rule.get('until'):
+        end = min(end, date.fromisoformat(rule['until']) + timedelta(days=1))
+    if start >= end:
+        return []
+
+    found = set()
+    freq = rule['freq']
+    if freq == 'weekly':
+        weekdays = {WEEKDAYS.index(d) for d in rule['days']}
+        interval = rule.get('interval', 1)
+        anchor = date.fromisoformat(rule['anchor']) if interval > 1 else start
+        anchor_week = anchor - timedelta(days=anchor.weekday())
+        day = start
+        while day < end:
+            weeks = (day - anchor_week).days // 7
+            if day.weekday() in weekdays and weeks % interval == 0:
+                found.add(day)
+            day += timedelta(days=1)
+    elif freq == 'monthly':
+        year, month = start.year, start.month
+        while date(year, month, 1) < end:
+            if 'weekday' in rule:
+                candidates = [_nth_weekday(year, month, WEEKDAYS.index(rule['weekday']), rule['nth'])]
+            else:
+                last = calendar.monthrange(year, month)[1]
+                candidates = [date(year, month, d) for d in rule['monthdays'] if d <= last]
+            found.update(d for d in candidates if d and start <= d < end)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    found.update(d for d in map(date.fromisoformat, rule.get('dates', [])) if start <= d < end)
+    found.difference_update(map(date.fromisoformat, rule.get('except', [])))
+    return sorted(found)
+
+class OccurrenceCache:
+    """Upcoming (start datetime, program id) pairs for all auto-start programs.
+
+    Readers use the current sorted tuple without locking; writers build a new
+    tuple and swap it in under the lock.
+    """
+
+    def __init__(self, horizon_days=62):
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._programs = {}   # program_id: (rule, start_time)
+        self._starts = ()     # sorted ((datetime, program_id), ...)
+        self._window = (date.min, date.min)
+
+    def _expand(self, program_id, rule, start_time, window):
+        return [(datetime.combine(day, start_time), program_id)
+                for day in occurrence_dates(rule, *window)]
+
+    def _window_for(self, today):
+        return today, today + timedelta(days=self.horizon_days)
+
+    def rebuild(self, programs, today=None):
+        """programs: iterable of (program_id, rule, 'HH:MM')"""
+        window = self._window_for(today or date.today())
+        tracked = {}
+        for program_id, rule, start_time in programs:
+            start_time = parse_start_time(start_time)
+            if rule and start_time:
+                tracked[program_id] = (rule, start_time)
+        starts = sorted(entry for program_id, (rule, start_time) in tracked.items()
+                        for entry in self._expand(program_id, rule, start_time, window))
+        with self._lock:
+            self._programs, self._starts, self._window = tracked, tuple(starts), window
+        return len(starts)
+
+    def set_program(self, program_id, rule, start_time):
+        """Add, replace or (rule/time None) remove one program's occurrences"""
+        start_time = parse_start_time(start_time)
+        with self._lock:
+            starts = [entry for entry in self._starts if entry[1] != program_id]
+            if rule and start_time:
+                self._programs[program_id] = (rule, start_time)
+                for entry in self._expand(program_id, rule, start_time, self._window):
+                    bisect.insort(starts, entry)
+            else:
+                self._programs.pop(program_id, None)
+            self._starts = tuple(starts)
+
+    def remove_program(self, program_id):
+        self.set_program(program_id, None, None)
+
+    def _roll(self, today):
+        # Re-expand from the in-memory rules once the window start is behind
+        if today > self._window[0]:
+            with self._lock:
+                programs = [(pid, rule, start_time.strftime('%H:%M'))
+                            for pid, (rule, start_time) in self._programs.items()]
+            self.rebuild(programs, today)
+
+    def upcoming(self, limit=1, after=None):
+        """The next `limit` (datetime, program_id) starts at or after `after`"""
+        after = after or datetime.now()
+        self._roll(after.date())
+        starts = self._starts
+        index = bisect.bisect_left(starts, (after,))
+        return list(starts[index:index + limit])
+
+    def starting_between(self, start, end):
+        """(datetime, program_id) starts in [start, end)"""
+        self._roll(start.date())
+        starts = self._starts
+        return list(starts[bisect.bisect_left(starts, (start,)):bisect.bisect_left(starts, (end,))])
+
+    def on(self, day):
+        start = datetime.combine(day, time.min)
+        return self.starting_between(start, start + timedelta(days=1))
@@ -0,0 +1,102 @@
+# search_index.py
+"""In-memory name search for activities and programs.
+
+Names are indexed two ways:
+- a sorted list of (token, id) for the whole name and each word in it, so
+  prefix matches are a bisect ("wor" finds "Worship" and "Word", "rea"
+  finds "Bible reading");
+- trigram sets, so typos and substrings still find something ("worshp").
+
+Results are ranked: whole-name prefix, then word prefix, then trigram
+similarity. The index is updated in place as rows are written.
+"""
+import bisect
+import threading
+from collections import Counter, defaultdict
+
+MIN_SIMILARITY = 0.4  # share of the query's trigrams a fuzzy match must have
+
+def normalise(text):
+    return ' '.join((text or '').lower().split())
+
+def trigrams(text):
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _tokens(name):
+    words = name.split(' ')
+    return {name, *words} if len(words) > 1 else {name}
+
+class NameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {}                  # {id: normalised name}
+        self._prefixes = []               # sorted [(token, id)]
+        self._trigrams = defaultdict(set)  # {trigram: {id}}
+
+    def __len__(self):
+        return len(self._names)
+
+    def rebuild(self, rows):
+        """rows: iterable of (id, name)"""
+        names = {row_id: normalise(name) for row_id, name in rows}
+        prefixes = sorted((token, row_id) for row_id, name in names.items() for token in _tokens(name))
+        grams = defaultdict(set)
+        for row_id, name in names.items():
+            for gram in trigrams(name):
+                grams[gram].add(row_id)
+        with self._lock:
+            self._names, self._prefixes, self._trigrams = names, prefixes, grams
+
+    def add(self, row_id, name):
+        """Index a new row, or re-index a renamed one"""
+        with self._lock:
+            self._remove(row_id)
+            name = self._names[row_id] = normalise(name)
+            for token in _tokens(name):
+                bisect.insort(self._prefixes, (token, row_id))
+            for gram in trigrams(name):
+                self._trigrams[gram].add(row_id)
+
+    def remove(self, row_id):
+        with self._lock:
+            self._remove(row_id)
+
+    def _remove(self, row_id):
+        name = self._names.pop(row_id, None)
+        if name is None:
+            return
+        for token in _tokens(name):
+            index = bisect.bisect_left(self._prefixes, (token, row_id))
+            if index < len(self._prefixes) and self._prefixes[index] == (token, row_id):
+                del self._prefixes[index]
+        for gram in trigrams(name):
+            self._trigrams[gram].discard(row_id)
+
+    def search(self, query, limit=None):
+        """Matching ids, best first"""
+        query = normalise(query)
+        if not query:
+            return []
+
+        with self._lock:
+            ranked = {}  # {id: (tier, -similarity, name)}
+            index = bisect.bisect_left(self._prefixes, (query,))
+            while index < len(self._prefixes) and self._prefixes[index][0].startswith(query):
+                row_id = self._prefixes[index][1]
+                name = self._names[row_id]
+                tier = 0 if name.startswith(query) else 1
+                ranked[row_id] = min(ranked.get(row_id, (2,)), (tier, 0, name))
+                index += 1
+
+            if len(query) >= 3:
+                query_grams = trigrams(query)
+                counts = Counter(row_id for gram in query_grams for row_id in self._trigrams.get(gram, ()))
+                for row_id, shared in counts.items():
+                    similarity = shared / len(query_grams)
+                    name = self._names[row_id]
+                    if row_id not in ranked and (similarity >= MIN_SIMILARITY or query in name):
+                        ranked[row_id] = (2, -similarity, name)
+
+        ids = sorted(ranked, key=ranked.get)
+        return ids[:limit] if limit else ids
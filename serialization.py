@@ -0,0 +1,112 @@
+# serialization.py
+"""JSON encoding for API responses.
+
+- dumps() uses orjson when it is installed and falls back to the stdlib.
+- FastJSONProvider plugs the same encoder into Flask so jsonify() uses it.
+- compact_* build the short-key, integer-seconds form of the polled state
+  endpoints (requested with ?compact=1).
+- gzip_response() compresses larger JSON responses for clients that accept it.
+"""
+import gzip
+import json
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+import server_timing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MIN_SIZE = 1024  # bytes; smaller payloads aren't worth the CPU
+GZIP_LEVEL = 5
+
+def dumps(obj, default=None):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    with server_timing.span('serialize'):
+        if orjson is not None:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps()"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, default=self.default), mimetype=self.mimetype)
+
+def hms_to_seconds(value):
+    """'HH:MM:SS' or 'MM:SS' -> int seconds"""
+    total = 0
+    for part in (value or '').split(':'):
+        total = total * 60 + (int(part) if part.isdigit() else 0)
+    return total
+
+def iso_to_epoch_ms(value):
+    """Naive local ISO datetime -> epoch milliseconds, or None"""
+    return int(datetime.fromisoformat(value).timestamp() * 1000) if value else None
+
+def compact_timer_status(snapshot):
+    """Short-key form of /api/timer_status"""
+    timer, queued = snapshot['current_timer'], snapshot['queued_program']
+    return {
+        'v': snapshot.version,
+        'a': timer['current_activity'],
+        'r': hms_to_seconds(timer['time_remaining']),
+        'run': int(bool(timer['is_running'])),
+        'p': int(bool(timer['is_paused'])),
+        'w': int(bool(timer['waiting_for_start'])),
+        'ws': timer['scheduled_start_time'],
+        'wn': timer['waiting_program_name'],
+        # End of the running activity (epoch ms) so displays count down off a synced clock
+        'e': iso_to_epoch_ms(timer['end_time']) if timer['is_running'] and not timer['is_paused'] else None,
+        # [program_id, name, scheduled start] or null
+        'q': [queued['program_id'], queued['program_name'], queued['scheduled_start_time']]
+             if queued['has_queued'] else None,
+        # Stage message queue version - refetch /api/stage_messages when it changes
+        'm': snapshot['stage_messages']['version'],
+    }
+
+def countdown_steps(countdown):
+    """A running sequence's [[step name, end epoch ms], ...], or None for a single countdown"""
+    return [[name, iso_to_epoch_ms(ends_at)] for name, ends_at in countdown['steps']] or None
+
+def compact_countdown(snapshot):
+    """Short-key form of /api/countdown_timer"""
+    countdown = snapshot['countdown_timer']
+    return {
+        'v': snapshot.version,
+        'on': int(bool(countdown['is_active'])),
+        'n': countdown['name'],
+        'r': hms_to_seconds(countdown['time_remaining']),
+        'x': int(bool(countdown['is_expired'])),
+        't': countdown['timer_type'],
+        'e': iso_to_epoch_ms(countdown['target_time']),
+        # Sequence deadlines, so displays move to the next step on their own clock
+        'sq': countdown_steps(countdown),
+        'm': snapshot['stage_messages']['version'],
+    }
+
+def gzip_response(response, accept_encoding):
+    """Gzip a JSON response in place if it is large enough and the client accepts gzip"""
+    if (response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in (accept_encoding or '')):
+        return response
+
+    body = response.get_data()
+    if len(body) < GZIP_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,116 @@
+# server_timing.py
+"""Per-request latency breakdown for the Server-Timing response header.
+
+A recorder lives in a thread-local for the duration of one API request.
+Instrumented code adds to named spans:
+
+    db-connect  opening SQLite connections (init_database)
+    db-query    executing statements and fetching rows on those connections
+    lock        waiting for the state lock or for the DB writer to commit
+    serialize   encoding JSON (jsonify, snapshot_json)
+
+Outside a request (background threads) there is no recorder and every hook
+is a cheap no-op. Browser devtools show the header under Network > Timing.
+"""
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from time import perf_counter
+
+SPANS = ('db-connect', 'db-query', 'lock', 'serialize')
+
+_local = threading.local()
+
+def start():
+    _local.spans = dict.fromkeys(SPANS, 0.0)
+    _local.queries = 0
+    _local.started = perf_counter()
+
+def discard():
+    _local.spans = None
+
+def active():
+    return getattr(_local, 'spans', None) is not None
+
+def record(name, seconds):
+    spans = getattr(_local, 'spans', None)
+    if spans is not None:
+        spans[name] += seconds
+
+class span:
+    """with span('serialize'): ...  - adds the block's duration to the current request"""
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.name, perf_counter() - self.started)
+
+@contextmanager
+def acquire(lock):
+    """Hold lock, counting the time spent waiting for it as 'lock'"""
+    started = perf_counter()
+    with lock:
+        record('lock', perf_counter() - started)
+        yield
+
+def finish(request_id=None):
+    """The Server-Timing header value for the current request; clears the recorder"""
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        return None
+    total = perf_counter() - _local.started
+    entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in spans.items()]
+    entries[1] += f';desc="statements={_local.queries}"'
+    entries.append(f'total;dur={total * 1000:.2f}')
+    if request_id:
+        entries.append(f'request;desc="{request_id}"')
+    _local.spans = None
+    return ', '.join(entries)
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that counts statement execution and row fetching as 'db-query'"""
+
+    def execute(self, *args):
+        if not active():
+            return super().execute(*args)
+        _local.queries += 1
+        with span('db-query'):
+            return super().execute(*args)
+
+    def executemany(self, *args):
+        if not active():
+            return super().executemany(*args)
+        _local.queries += 1
+        with span('db-query'):
+            return super().executemany(*args)
+
+    def fetchone(self):
+        with span('db-query'):
+            return super().fetchone()
+
+    def fetchmany(self, *args):
+        with span('db-query'):
+            return super().fetchmany(*args)
+
+    def fetchall(self):
+        with span('db-query'):
+            return super().fetchall()
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3.connect(..., factory=TimedConnection); conn.execute() goes through cursor() too"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+class TimedFuture(Future):
+    """Future whose result() wait counts as 'lock' (used for DB writer commits)"""
+
+    def result(self, timeout=None):
+        with span('lock'):
+            return super().result(timeout)
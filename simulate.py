@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Run services in virtual time and print a trace of every state transition
+
+The timer and auto-start loops run in-process against a copy of the
+database on a SimulatedClock (see clock.py), one timer tick per virtual
+second while something is running and one auto-start check per 30 virtual
+seconds while idle, exactly as the real threads would. The trace is
+deterministic for a given database and start time, so it can be diffed
+between versions; timing statistics go to stderr.
+
+Usage:
+    python simulate.py --start "2026-10-25 00:00" --days 7        # a week of auto-starts
+    python simulate.py --start "2026-10-25 09:25" --program 3     # one program, until it ends
+    python simulate.py ... --speed 0 --trace trace.ndjson         # as fast as possible
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import clock
+from database import DB_PATH, init_db
+
+# Fields whose changes are transitions (time_remaining changes every tick)
+TRACKED_FIELDS = {
+    'current_timer': ('current_activity', 'is_running', 'is_paused', 'waiting_for_start', 'waiting_program_name'),
+    'queued_program': ('has_queued', 'program_name', 'scheduled_start_time'),
+    'countdown_timer': ('is_active', 'name', 'is_expired'),
+}
+
+def _tracked(app):
+    state = {section: {field: app.display_state[section][field] for field in fields}
+             for section, fields in TRACKED_FIELDS.items()}
+    # The display keeps is_running after the last item (for the kiosk's end
+    # screen), so whether a program is running comes from current_state
+    row = app.get_current_state()
+    state['program'] = {'running': bool(row and row[0]), 'paused': bool(row and row[1])}
+    return state
+
+def _running(state):
+    return state['program']['running'] or state['countdown_timer']['is_active']
+
+def _busy(state):
+    return _running(state) or state['current_timer']['waiting_for_start'] or state['queued_program']['has_queued']
+
+class Simulation:
+    """Drives an imported app module's timer and auto-start loops in virtual time"""
+
+    def __init__(self, app, start, speed=1000):
+        self.app = app
+        self.start = start
+        self.speed = speed  # virtual seconds per real second; 0 = unthrottled
+        self.clock = clock.SimulatedClock(start)
+        self.tick_seconds = []
+        self.transitions = 0
+
+    def run(self, end, program_id=None):
+        """Yield trace entries until end, or until program_id has run to completion"""
+        app = self.app
+        previous = clock.install(self.clock)
+        try:
+            app.load_occurrence_cache()
+            checker = app.AutoStartChecker()
+            state = _tracked(app)
+            if program_id is not None:
+                app.start_program_smart_internal(program_id)
+                app.db_writer.flush()
+            was_busy = False
+            next_check = self.start
+            wall_start = time.perf_counter()
+
+            while self.clock.now() < end:
+                tick_start = time.perf_counter()
+                # Flushing after each step lets the next one read what it wrote
+                if self.clock.now() >= next_check:
+                    checker.tick()
+                    app.db_writer.flush()
+                    next_check += timedelta(seconds=app.AUTO_START_INTERVAL)
+                app.timer_tick()
+                app.db_writer.flush()
+                self.tick_seconds.append(time.perf_counter() - tick_start)
+
+                current = _tracked(app)
+                for section, fields in current.items():
+                    changes = {k: v for k, v in fields.items() if v != state[section][k]}
+                    if changes:
+                        self.transitions += 1
+                        yield {'at': self.clock.now().isoformat(), 'section': section, **changes}
+                state = current
+
+                busy = _busy(state)
+                if program_id is not None and was_busy and not busy:
+                    return
+                was_busy = was_busy or busy
+
+                # One tick per second while the timer matters, else jump to the next check
+                step = 1 if _running(state) else max(1, (next_check - self.clock.now()).total_seconds())
+                self.clock.advance(step)
+
+                if self.speed:
+                    ahead = (self.clock.now() - self.start).total_seconds() / self.speed \
+                        - (time.perf_counter() - wall_start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        finally:
+            clock.install(previous)
+
+    def summary(self, wall_seconds):
+        ticks = sorted(self.tick_seconds)
+        virtual = (self.clock.now() - self.start).total_seconds()
+        return {
+            'virtual_seconds': virtual,
+            'wall_seconds': round(wall_seconds, 3),
+            'speedup': round(virtual / wall_seconds) if wall_seconds else None,
+            'ticks': len(ticks),
+            'transitions': self.transitions,
+            'tick_ms': {
+                'mean': round(sum(ticks) / len(ticks) * 1000, 3),
+                'p99': round(ticks[int(len(ticks) * 0.99)] * 1000, 3),
+                'max': round(ticks[-1] * 1000, 3),
+            } if ticks else None,
+        }
+
+def prepare_database(source, directory):
+    """Copy source into directory with nothing running; returns the copy's path"""
+    path = os.path.join(directory, 'simulation.db')
+    if os.path.exists(source):
+        shutil.copyfile(source, path)
+    init_db(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute('UPDATE current_state SET is_running = FALSE, is_paused = FALSE, manual_override = FALSE')
+        conn.execute('UPDATE countdown_timers SET is_active = FALSE')
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Church Timer service simulation')
+    parser.add_argument('--start', required=True, type=datetime.fromisoformat,
+                        help='virtual start time, e.g. "2026-10-25 09:00"')
+    parser.add_argument('--days', type=float, help='virtual days to run (default: 1 with --program, else 7)')
+    parser.add_argument('--program', type=int, help='smart-start this program id and stop when it ends')
+    parser.add_argument('--speed', type=float, default=1000, help='times real time, 0 = unthrottled (default: 1000)')
+    parser.add_argument('--trace', default='-', help='trace output file (default: stdout)')
+    parser.add_argument('--db', default=DB_PATH, help=f'database to copy (default: {DB_PATH})')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        import app
+        # Point the app and its writer at the copy before anything connects
+        app.DB_PATH = app.db_writer.db_path = prepare_database(args.db, directory)
+        app.db_writer.batch_window = 0  # every tick flushes; nothing to wait for
+        app.db_writer.start()
+
+        simulation = Simulation(app, args.start, args.speed)
+        end = args.start + timedelta(days=args.days or (1 if args.program is not None else 7))
+        out = sys.stdout if args.trace == '-' else open(args.trace, 'w', encoding='utf-8')
+        started = time.perf_counter()
+        try:
+            for entry in simulation.run(end, args.program):
+                out.write(json.dumps(entry) + '\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(json.dumps(simulation.summary(time.perf_counter() - started), indent=2), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
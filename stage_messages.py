@@ -0,0 +1,113 @@
+# stage_messages.py
+"""In-memory priority queue of stage messages with display windows.
+
+Every message has a window [starts_at, ends_at) and a priority. At any
+moment the stage shows the highest-priority message whose window is open,
+newest first among equals; when it ends, whatever it covered shows again.
+So an urgent "wrap up" note interrupts a "car alarm" note instead of
+replacing it.
+
+windows() flattens the queue into non-overlapping display segments, which
+the kiosk steps through on its own clock. Persistence is the caller's job
+(the app queues the writes on the DB writer).
+"""
+import threading
+import time
+
+PRIORITIES = {'normal': 0, 'high': 5, 'urgent': 10}
+
+def parse_priority(value):
+    """'normal' / 'high' / 'urgent' or an integer -> int; raises ValueError"""
+    if value is None:
+        return 0
+    if isinstance(value, str) and value in PRIORITIES:
+        return PRIORITIES[value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"priority must be an integer or one of {', '.join(PRIORITIES)}")
+
+class StageMessageQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = {}  # {id: message dict}
+        self._next_id = 1
+        # Bumped on every change; starts from the clock so it never repeats across restarts
+        self.version = int(time.time() * 1000)
+
+    def _changed(self):
+        self.version = max(self.version + 1, int(time.time() * 1000))
+
+    def load(self, rows, next_id):
+        """rows: (id, message, priority, starts_at, ends_at) of unexpired messages"""
+        with self._lock:
+            self._messages = {row[0]: self._message(*row) for row in rows}
+            self._next_id = next_id
+            self._changed()
+
+    @staticmethod
+    def _message(message_id, text, priority, starts_at, ends_at):
+        return {'id': message_id, 'message': text, 'priority': priority,
+                'starts_at': starts_at, 'ends_at': ends_at}
+
+    def add(self, text, priority, starts_at, ends_at):
+        """Queue a message; returns it with its new id"""
+        with self._lock:
+            message = self._message(self._next_id, text, priority, starts_at, ends_at)
+            self._messages[message['id']] = message
+            self._next_id += 1
+            self._changed()
+            return message
+
+    def remove(self, message_id):
+        with self._lock:
+            if self._messages.pop(message_id, None) is None:
+                return False
+            self._changed()
+            return True
+
+    def clear(self):
+        with self._lock:
+            removed = list(self._messages)
+            self._messages = {}
+            self._changed()
+            return removed
+
+    def prune(self, now):
+        """Forget messages that have ended (their rows stay in the database)"""
+        with self._lock:
+            ended = [mid for mid, m in self._messages.items() if m['ends_at'] <= now]
+            for message_id in ended:
+                del self._messages[message_id]
+            return ended
+
+    def pending(self, now):
+        """Messages not yet ended, soonest first"""
+        with self._lock:
+            return sorted((m for m in self._messages.values() if m['ends_at'] > now),
+                          key=lambda m: (m['starts_at'], m['id']))
+
+    @staticmethod
+    def _top(messages, at):
+        open_now = [m for m in messages if m['starts_at'] <= at < m['ends_at']]
+        return max(open_now, key=lambda m: (m['priority'], m['id'])) if open_now else None
+
+    def current(self, now):
+        with self._lock:
+            return self._top(list(self._messages.values()), now)
+
+    def windows(self, now):
+        """[(start, end, message)] segments from now on, in order, never overlapping"""
+        with self._lock:
+            messages = [m for m in self._messages.values() if m['ends_at'] > now]
+        # Which message is on top can only change where some window starts or ends
+        boundaries = sorted({now} | {t for m in messages for t in (m['starts_at'], m['ends_at']) if t > now})
+        segments = []
+        for start, end in zip(boundaries, boundaries[1:]):
+            top = self._top(messages, start)
+            if top is None:
+                continue
+            if segments and segments[-1][2] is top and segments[-1][1] == start:
+                segments[-1] = (segments[-1][0], end, top)
+            else:
+                segments.append((start, end, top))
+        return segments
@@ -1,8 +1,7 @@
 #!/bin/bash
 
 # Church Timer Kiosk Startup
-# Wait for the church timer service to start
-sleep 20
+TIMER_URL="${TIMER_URL:-http://localhost}"
 
 # Hide cursor
 unclutter -idle 0.1 -root &
@@ -12,9 +11,12 @@ xset s off
 xset -dpms
 xset s noblank
 
-# Wait for the Flask app to be fully started
-until curl -f http://localhost:5000/ > /dev/null 2>&1; do
-    sleep 5
+# Wait for the church timer to report ready (migrations done, state recovered,
+# background workers running) instead of sleeping a fixed amount.
+# Give up waiting after 120s so the screen still shows something.
+for i in $(seq 1 240); do
+    curl -sf "$TIMER_URL/readyz" > /dev/null 2>&1 && break
+    sleep 0.5
 done
 
 # Start Chromium in kiosk mode
@@ -26,6 +28,8 @@ chromium-browser \
     --disable-pinch \
     --kiosk \
     --incognito \
-    http://localhost:5000/ &
+    "$TIMER_URL/" &
 
 echo "Kiosk mode started at $(date)" >> /home/russel/church-timer/kiosk.log
+curl -s "$TIMER_URL/readyz" >> /home/russel/church-timer/kiosk.log 2>&1
+echo >> /home/russel/church-timer/kiosk.log
@@ -3,9 +3,6 @@
 # Church Timer Startup Script
 cd /home/russel/church-timer
 
-# Wait for system to be fully ready
-sleep 10
-
 # Set display environment
 export DISPLAY=:0
 export XAUTHORITY=/home/russel/.Xauthority
@@ -0,0 +1,147 @@
+# state_journal.py
+"""Append-only journal of in-memory display state with compacted snapshots.
+
+Request threads call record(), which only puts the value on a queue. A
+background writer appends the records to journal.jsonl (fsynced per batch)
+and periodically folds everything into snapshot.json, so load() at boot
+only has to read one small snapshot plus a short journal tail.
+"""
+import copy
+import json
+import os
+import queue
+import threading
+import time
+
+from structured_log import get_logger
+
+log = get_logger('state_journal')
+
+class StateJournal:
+    def __init__(self, directory='state', snapshot_every=500, snapshot_interval=300):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, 'journal.jsonl')
+        self.snapshot_path = os.path.join(directory, 'snapshot.json')
+        self.snapshot_every = snapshot_every        # records before compacting
+        self.snapshot_interval = snapshot_interval  # seconds before compacting a dirty journal
+        self._queue = queue.Queue()
+        self._state = {}     # latest value per key, as written
+        self._seq = 0
+        self._records_since_snapshot = 0
+        self._last_snapshot = time.monotonic()
+        self._thread = None
+
+    def load(self):
+        """Rebuild state from the snapshot and the journal tail. Call before start()."""
+        os.makedirs(self.directory, exist_ok=True)
+        state, seq = {}, 0
+
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            state, seq = snapshot.get('state', {}), snapshot.get('seq', 0)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            log.warning('Ignoring unreadable snapshot: %s', e)
+
+        replayed = 0
+        try:
+            with open(self.journal_path, 'rb+') as f:
+                good = 0  # end of the last complete entry
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError('unterminated line')
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write from a power cut - everything before it is intact
+                        break
+                    good += len(line)
+                    # Entries already folded into the snapshot are skipped
+                    if entry['seq'] > seq:
+                        state[entry['key']] = entry['value']
+                        seq = entry['seq']
+                        replayed += 1
+                # Cut the torn tail off so new appends start on a clean line
+                if f.seek(0, os.SEEK_END) > good:
+                    log.warning('Truncating torn journal tail at byte %d', good)
+                    f.truncate(good)
+        except FileNotFoundError:
+            pass
+
+        self._state, self._seq = state, seq
+        self._records_since_snapshot = replayed
+        return copy.deepcopy(state)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record(self, key, value):
+        """Queue a new value for key. Never blocks on disk I/O."""
+        self._queue.put((key, copy.deepcopy(value)))
+
+    def flush(self, timeout=None):
+        """Wait until everything recorded so far has been written"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.snapshot_interval)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch([item for item in batch if not isinstance(item, threading.Event)])
+                if self._should_compact():
+                    self._compact()
+            except Exception as e:
+                log.exception('Write error: %s', e)
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write_batch(self, records):
+        lines = []
+        for key, value in records:
+            if self._state.get(key) == value:
+                continue  # unchanged since the last write
+            self._seq += 1
+            self._state[key] = value
+            lines.append(json.dumps({'seq': self._seq, 'ts': time.time(), 'key': key, 'value': value},
+                                    separators=(',', ':')) + '\n')
+        if not lines:
+            return
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._records_since_snapshot += len(lines)
+
+    def _should_compact(self):
+        if self._records_since_snapshot >= self.snapshot_every:
+            return True
+        return (self._records_since_snapshot > 0
+                and time.monotonic() - self._last_snapshot >= self.snapshot_interval)
+
+    def _compact(self):
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': self._seq, 'saved_at': time.time(), 'state': self._state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Safe to crash here: load() skips journal entries covered by the snapshot
+        open(self.journal_path, 'w').close()
+        self._records_since_snapshot = 0
+        self._last_snapshot = time.monotonic()
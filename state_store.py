@@ -0,0 +1,79 @@
+# state_store.py
+"""Immutable, atomically swapped snapshots of the shared display state.
+
+Writers build a complete new snapshot under a single lock and publish it by
+replacing one reference. Readers take store.snapshot without locking or
+copying and always see a consistent set of fields, never a half-applied
+update.
+"""
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from types import MappingProxyType
+
+import server_timing
+
+class Snapshot(Mapping):
+    """Read-only {section: read-only dict} with a version and memoized derived values"""
+    __slots__ = ('_sections', 'version', '_memo')
+
+    def __init__(self, sections, version):
+        self._sections = {name: MappingProxyType(dict(fields)) for name, fields in sections.items()}
+        self.version = version
+        self._memo = {}
+
+    def __getitem__(self, name):
+        return self._sections[name]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+    def memo(self, key, build):
+        """Compute a value derived from this snapshot once (e.g. its serialized form)"""
+        try:
+            return self._memo[key]
+        except KeyError:
+            # Two readers racing here both compute the same value; either result is fine
+            value = self._memo[key] = build(self)
+            return value
+
+class StateStore:
+    def __init__(self, **sections):
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot(sections, 0)
+        self._listeners = []
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def __getitem__(self, name):
+        return self._snapshot[name]
+
+    def add_listener(self, callback):
+        """callback(old_snapshot, new_snapshot) runs after each publish; it must not block"""
+        self._listeners.append(callback)
+
+    @contextmanager
+    def edit(self):
+        """Yield mutable copies of every section; publish them together on exit.
+
+        Nothing is published if the block raises or changes nothing.
+        """
+        with server_timing.acquire(self._lock):
+            old = self._snapshot
+            draft = {name: dict(fields) for name, fields in old.items()}
+            yield draft
+            if all(draft[name] == old[name] for name in old):
+                return
+            new = self._snapshot = Snapshot(draft, old.version + 1)
+            # Called under the lock so listeners see publishes in order
+            for callback in self._listeners:
+                callback(old, new)
+
+    def update(self, section, **changes):
+        with self.edit() as draft:
+            draft[section].update(changes)
@@ -11,6 +11,7 @@ let liveScheduleSortable = null;
 document.addEventListener('DOMContentLoaded', function() {
     loadPrograms();
     loadActivities();
+    loadCountdownSequences();
     startTimerStatusUpdates();
 });
 
@@ -573,12 +574,18 @@ async function removeFromScheduleInModal(scheduleId) {
 // ACTIVITY MANAGEMENT
 // ============================================================================
 
-async function loadActivities() {
+const ACTIVITY_PAGE_SIZE = 50;
+let activitiesNextOffset = null;
+
+async function loadActivities(append = false) {
     try {
-        const response = await fetch('/api/activities');
-        activities = await response.json();
+        const offset = append ? activitiesNextOffset : 0;
+        const response = await fetch(`/api/activities?limit=${ACTIVITY_PAGE_SIZE}&offset=${offset}`);
+        const page = await response.json();
+        activities = append ? activities.concat(page.items) : page.items;
+        activitiesNextOffset = page.next_offset;
         displayActivities();
-        populateActivitySelect();
+        if (!append) populateActivitySelect();
     } catch (error) {
         console.error('Error loading activities:', error);
         showAlert('Error loading activities', 'error');
@@ -615,6 +622,14 @@ function displayActivities() {
         `;
         activityList.appendChild(activityItem);
     });
+
+    if (activitiesNextOffset !== null) {
+        const more = document.createElement('button');
+        more.className = 'btn btn-secondary full-width';
+        more.textContent = 'Load more';
+        more.onclick = () => loadActivities(true);
+        activityList.appendChild(more);
+    }
 }
 
 async function createActivity(event) {
@@ -653,19 +668,19 @@ function showCreateActivityModal() {
 }
 
 function populateActivitySelect() {
-    populateActivitySelector();
+    populateActivitySelector(activities);
 }
 
-function populateActivitySelector() {
+function populateActivitySelector(options) {
     const activitySelect = document.getElementById('activitySelect');
     activitySelect.innerHTML = '';
     
-    if (activities.length === 0) {
-        activitySelect.innerHTML = '<option value="">No activities available - create one first</option>';
+    if (options.length === 0) {
+        activitySelect.innerHTML = '<option value="">No matching activities - create one first</option>';
         return;
     }
     
-    activities.forEach(activity => {
+    options.forEach(activity => {
         const option = document.createElement('option');
         option.value = activity.id;
         option.textContent = `${activity.name} (${activity.default_duration}min default)`;
@@ -673,17 +688,39 @@ function populateActivitySelector() {
     });
     
     // Auto-populate duration with first activity's default
-    if (activities.length > 0) {
-        document.getElementById('scheduleActivityDuration').value = activities[0].default_duration;
-        
-        // Update duration when selection changes
-        activitySelect.addEventListener('change', function() {
-            const selectedActivity = activities.find(a => a.id == this.value);
-            if (selectedActivity) {
-                document.getElementById('scheduleActivityDuration').value = selectedActivity.default_duration;
-            }
-        });
-    }
+    document.getElementById('scheduleActivityDuration').value = options[0].default_duration;
+    
+    // Update duration when selection changes
+    activitySelect.onchange = function() {
+        const selectedActivity = options.find(a => a.id == this.value);
+        if (selectedActivity) {
+            document.getElementById('scheduleActivityDuration').value = selectedActivity.default_duration;
+        }
+    };
+}
+
+// Activity picker search - asks the server's name index instead of filtering a full list
+let activitySearchTimer = null;
+let activitySearchSeq = 0;
+
+function searchActivities(query) {
+    clearTimeout(activitySearchTimer);
+    activitySearchTimer = setTimeout(async () => {
+        const seq = ++activitySearchSeq;
+        if (!query.trim()) {
+            populateActivitySelect();
+            return;
+        }
+        try {
+            const params = new URLSearchParams({ q: query, limit: 20, fields: 'id,name,default_duration' });
+            const response = await fetch(`/api/activities?${params}`);
+            const page = await response.json();
+            // Ignore answers to queries the user has already typed past
+            if (seq === activitySearchSeq) populateActivitySelector(page.items);
+        } catch (error) {
+            console.error('Error searching activities:', error);
+        }
+    }, 150);
 }
 
 // Placeholder function for activity editing
@@ -829,11 +866,8 @@ function updateTimerControls(isRunning, isPaused) {
 // LIVE SCHEDULE MANAGEMENT
 // ============================================================================
 
-async function updateLiveSchedule() {
+function renderLiveSchedule(data) {
     try {
-        const response = await fetch('/api/live_schedule');
-        const data = await response.json();
-        
         const liveScheduleList = document.getElementById('liveScheduleList');
         liveScheduleList.innerHTML = '';
         
@@ -857,11 +891,12 @@ async function updateLiveSchedule() {
                     <strong>${item.activity_name}</strong>
                 </div>
                 <div class="live-schedule-item-duration">
-                    ${item.duration_minutes} min
+                    ${item.duration_minutes} min <span class="projected-time"></span>
                 </div>
             `;
             liveScheduleList.appendChild(scheduleItem);
         });
+        renderProjectedTimeline(adminProjection);
         
         // Initialize or update sortable
         if (liveScheduleSortable) {
@@ -882,6 +917,40 @@ async function updateLiveSchedule() {
     }
 }
 
+// Latest /api/projected_timeline, kept so a re-rendered live schedule gets its times back
+let adminProjection = null;
+
+function formatClockTime(iso) {
+    return iso.slice(11, 16);
+}
+
+function formatOverrun(seconds) {
+    const minutes = Math.round(Math.abs(seconds) / 60);
+    if (minutes === 0) return 'on time';
+    return `${minutes} min ${seconds > 0 ? 'late' : 'early'}`;
+}
+
+// Projected start of each remaining item and the projected end of the program
+function renderProjectedTimeline(data) {
+    const summary = document.getElementById('projectedSummary');
+    if (!data || !data.is_running) {
+        summary.textContent = '';
+        return;
+    }
+    let text = `Projected end ${formatClockTime(data.projected_end)}`;
+    if (data.overrun_seconds !== null) text += ` (${formatOverrun(data.overrun_seconds)})`;
+    summary.textContent = text;
+    summary.style.color = data.overrun_seconds > 60 ? '#e74c3c' : '#27ae60';
+    
+    const projected = new Map(data.items.map(item => [item.schedule_id, item]));
+    document.querySelectorAll('#liveScheduleList .live-schedule-item').forEach(element => {
+        const item = projected.get(parseInt(element.getAttribute('data-id')));
+        element.querySelector('.projected-time').textContent = item
+            ? `· ${formatClockTime(item.projected_start)}-${formatClockTime(item.projected_end)}`
+            : '';
+    });
+}
+
 async function reorderLiveSchedule(scheduleOrder) {
     try {
         const response = await fetch('/api/live_schedule/reorder', {
@@ -903,17 +972,62 @@ async function reorderLiveSchedule(scheduleOrder) {
 // TIMER STATUS UPDATES
 // ============================================================================
 
+// One /api/admin_state payload carries every section with a version; only
+// sections whose version changed are sent and re-rendered. The stream
+// variant pushes changes; polling is the fallback.
+const ADMIN_POLL_INTERVAL = 1000;
+const adminVersions = {};
+let adminQueue = null;
+let adminPollTimer = null;
+
+function applyAdminState(payload) {
+    if (payload.status) renderTimerStatus(payload.status);
+    if (payload.queue) { adminQueue = payload.queue; renderQueuedProgram(); }
+    if (payload.live_schedule) renderLiveSchedule(payload.live_schedule);
+    if (payload.next_autostart) renderAutoStartStatus(payload.next_autostart);
+    if (payload.stage_messages) renderStageQueue(payload.stage_messages);
+    if (payload.projected_timeline) { adminProjection = payload.projected_timeline; renderProjectedTimeline(adminProjection); }
+    Object.assign(adminVersions, payload.versions);
+}
+
+function knownVersions() {
+    return Object.entries(adminVersions).map(([name, version]) => name + ':' + version).join(',');
+}
+
+async function pollAdminState() {
+    try {
+        const response = await fetch('/api/admin_state?have=' + encodeURIComponent(knownVersions()));
+        applyAdminState(await response.json());
+    } catch (error) {
+        console.error('Error updating admin state:', error);
+    }
+}
+
+function startPollingAdminState() {
+    if (!adminPollTimer) adminPollTimer = setInterval(pollAdminState, ADMIN_POLL_INTERVAL);
+}
+
 async function startTimerStatusUpdates() {
-    setInterval(updateTimerStatus, 1000);
-    setInterval(updateAutoStartStatus, 10000); // Update every 10 seconds
-    updateAutoStartStatus(); // Initial call
+    // The queued countdown is computed locally, so it ticks between updates
+    setInterval(renderQueuedProgram, 1000);
+
+    if (!window.EventSource) {
+        pollAdminState();
+        startPollingAdminState();
+        return;
+    }
+    const stream = new EventSource('/api/admin_state/stream');
+    stream.onmessage = event => {
+        // Streaming again after an outage - the poll is no longer needed
+        if (adminPollTimer) { clearInterval(adminPollTimer); adminPollTimer = null; }
+        applyAdminState(JSON.parse(event.data));
+    };
+    // EventSource reconnects by itself; poll meanwhile so the page stays current
+    stream.onerror = () => startPollingAdminState();
 }
 
-async function updateAutoStartStatus() {
+function renderAutoStartStatus(data) {
     try {
-        const response = await fetch('/api/next_autostart');
-        const data = await response.json();
-        
         const autoStartCard = document.getElementById('autoStartCard');
         const autoStartMessage = document.getElementById('autoStartMessage');
         const autoStartCountdown = document.getElementById('autoStartCountdown');
@@ -962,59 +1076,48 @@ async function updateAutoStartStatus() {
     }
 }
 
-async function updateTimerStatus() {
-    try {
-        const response = await fetch('/api/timer_status');
-        const status = await response.json();
-        
-        document.getElementById('statusText').textContent = 
-            status.is_running ? (status.is_paused ? 'PAUSED' : 'RUNNING') : 'STOPPED';
-        document.getElementById('currentActivity').textContent = status.current_activity || '-';
-        document.getElementById('timeRemaining').textContent = status.time_remaining;
-        
-        // Update status indicator
-        const statusIndicator = document.querySelector('.status-indicator');
-        statusIndicator.className = 'status-indicator ' + 
-            (status.is_running ? (status.is_paused ? 'status-paused' : 'status-running') : 'status-stopped');
-        
-        // Update control buttons
-        updateTimerControls(status.is_running, status.is_paused);
-        
-        // Show/hide live schedule card based on running state
-        const liveScheduleCard = document.getElementById('liveScheduleCard');
-        if (status.is_running) {
-            liveScheduleCard.style.display = 'block';
-            updateLiveSchedule();
-        } else {
-            liveScheduleCard.style.display = 'none';
-        }
+function renderTimerStatus(status) {
+    document.getElementById('statusText').textContent = 
+        status.is_running ? (status.is_paused ? 'PAUSED' : 'RUNNING') : 'STOPPED';
+    document.getElementById('currentActivity').textContent = status.current_activity || '-';
+    document.getElementById('timeRemaining').textContent = status.time_remaining;
+    
+    // Update status indicator
+    const statusIndicator = document.querySelector('.status-indicator');
+    statusIndicator.className = 'status-indicator ' + 
+        (status.is_running ? (status.is_paused ? 'status-paused' : 'status-running') : 'status-stopped');
+    
+    // Update control buttons
+    updateTimerControls(status.is_running, status.is_paused);
+    
+    // Show/hide live schedule card based on running state
+    document.getElementById('liveScheduleCard').style.display = status.is_running ? 'block' : 'none';
+}
 
-        // Show/hide queued program card
-        const queuedCard = document.getElementById('queuedProgramCard');
-        const qp = status.queued_program;
-        if (qp && qp.has_queued) {
-            queuedCard.style.display = 'block';
-            document.getElementById('queuedProgramName').textContent = qp.program_name;
-            // Calculate countdown
-            const parts = qp.scheduled_start_time.split(':');
-            if (parts.length === 2) {
-                const now = new Date();
-                const target = new Date();
-                target.setHours(parseInt(parts[0]), parseInt(parts[1]), 0, 0);
-                const diff = Math.max(0, Math.floor((target - now) / 1000));
-                const h = Math.floor(diff / 3600);
-                const m = Math.floor((diff % 3600) / 60);
-                const s = diff % 60;
-                const pad = n => String(n).padStart(2, '0');
-                document.getElementById('queuedProgramCountdown').textContent =
-                    'Starting in ' + pad(h) + ':' + pad(m) + ':' + pad(s) +
-                    '  (at ' + qp.scheduled_start_time + ')';
-            }
-        } else {
-            queuedCard.style.display = 'none';
+function renderQueuedProgram() {
+    // Show/hide queued program card
+    const queuedCard = document.getElementById('queuedProgramCard');
+    const qp = adminQueue;
+    if (qp && qp.has_queued) {
+        queuedCard.style.display = 'block';
+        document.getElementById('queuedProgramName').textContent = qp.program_name;
+        // Calculate countdown
+        const parts = qp.scheduled_start_time.split(':');
+        if (parts.length === 2) {
+            const now = new Date();
+            const target = new Date();
+            target.setHours(parseInt(parts[0]), parseInt(parts[1]), 0, 0);
+            const diff = Math.max(0, Math.floor((target - now) / 1000));
+            const h = Math.floor(diff / 3600);
+            const m = Math.floor((diff % 3600) / 60);
+            const s = diff % 60;
+            const pad = n => String(n).padStart(2, '0');
+            document.getElementById('queuedProgramCountdown').textContent =
+                'Starting in ' + pad(h) + ':' + pad(m) + ':' + pad(s) +
+                '  (at ' + qp.scheduled_start_time + ')';
         }
-    } catch (error) {
-        console.error('Error updating timer status:', error);
+    } else {
+        queuedCard.style.display = 'none';
     }
 }
 
@@ -1042,6 +1145,8 @@ async function sendStageMessage() {
     
     const message = messageInput.value.trim();
     const duration = parseInt(durationSlider.value);
+    const priority = document.getElementById('messagePriority').value;
+    const startAt = document.getElementById('messageStartAt').value;
     
     if (!message) {
         showMessageStatus('Please enter a message', 'error');
@@ -1056,7 +1161,9 @@ async function sendStageMessage() {
             },
             body: JSON.stringify({
                 message: message,
-                duration_seconds: duration
+                duration_seconds: duration,
+                priority: priority,
+                start_at: startAt || null
             })
         });
         
@@ -1067,10 +1174,12 @@ async function sendStageMessage() {
             const secs = duration % 60;
             const timeStr = `${minutes}:${secs.toString().padStart(2, '0')}`;
             
-            showMessageStatus(`✓ Message sent to stage! Will display for ${timeStr}`, 'success');
+            const when = startAt ? ` from ${startAt}` : '';
+            showMessageStatus(`✓ Message sent to stage! Will display${when} for ${timeStr}`, 'success');
             
             // Clear input after successful send
             messageInput.value = '';
+            document.getElementById('messageStartAt').value = '';
             document.getElementById('messageCharCount').textContent = '0';
         } else {
             showMessageStatus('Error: ' + (data.error || 'Failed to send message'), 'error');
@@ -1100,6 +1209,47 @@ async function clearStageMessage() {
     }
 }
 
+async function removeStageMessage(id) {
+    try {
+        const response = await fetch('/api/stage_message?id=' + id, {
+            method: 'DELETE'
+        });
+        
+        if (response.ok) {
+            showMessageStatus('✓ Message removed', 'success');
+        } else {
+            showMessageStatus('Error: Failed to remove message', 'error');
+        }
+    } catch (error) {
+        console.error('Error removing stage message:', error);
+        showMessageStatus('Error: Failed to remove message', 'error');
+    }
+}
+
+const PRIORITY_LABELS = { 0: 'Normal', 5: 'High', 10: 'Urgent' };
+
+// Queued and showing stage messages, soonest first, each with a remove button
+function renderStageQueue(messages) {
+    const container = document.getElementById('stageMessageQueue');
+    container.replaceChildren(...messages.map(m => {
+        const row = document.createElement('div');
+        row.style.cssText = 'display: flex; gap: 0.5rem; align-items: center; padding: 0.5rem; border-bottom: 1px solid #eee;';
+        const text = document.createElement('span');
+        text.style.flex = '1';
+        text.textContent = m.message;
+        const when = document.createElement('span');
+        when.style.cssText = 'font-size: 0.85rem; color: #7f8c8d;';
+        const time = iso => iso.slice(11, 16);
+        when.textContent = `${PRIORITY_LABELS[m.priority] || 'Priority ' + m.priority} · ${time(m.starts_at)}-${time(m.end_time)}`;
+        const remove = document.createElement('button');
+        remove.className = 'btn btn-danger';
+        remove.innerHTML = '<i class="fas fa-times"></i>';
+        remove.onclick = () => removeStageMessage(m.id);
+        row.append(text, when, remove);
+        return row;
+    }));
+}
+
 function showMessageStatus(message, type) {
     const statusDiv = document.getElementById('messageStatus');
     
@@ -1263,6 +1413,130 @@ async function stopCountdownTimer() {
     }
 }
 
+// ============================================================================
+// COUNTDOWN SEQUENCES
+// ============================================================================
+
+// "10:00 Walk-in" per line -> [{name, duration_seconds}], or null if a line doesn't parse
+function parseSequenceSteps(text) {
+    const steps = [];
+    for (const line of text.split('\n').map(l => l.trim()).filter(Boolean)) {
+        const match = line.match(/^(\d+):(\d{1,2})\s+(.+)$/);
+        if (!match) return null;
+        steps.push({ name: match[3], duration_seconds: parseInt(match[1]) * 60 + parseInt(match[2]) });
+    }
+    return steps;
+}
+
+function formatStepDuration(seconds) {
+    return `${Math.floor(seconds / 60)}:${(seconds % 60).toString().padStart(2, '0')}`;
+}
+
+async function loadCountdownSequences() {
+    try {
+        const response = await fetch('/api/countdown_sequences');
+        renderCountdownSequences(await response.json());
+    } catch (error) {
+        console.error('Error loading countdown sequences:', error);
+    }
+}
+
+function renderCountdownSequences(sequences) {
+    const container = document.getElementById('countdownSequenceList');
+    container.replaceChildren(...sequences.map(sequence => {
+        const row = document.createElement('div');
+        row.style.cssText = 'display: flex; gap: 0.5rem; align-items: center; padding: 0.5rem; border-bottom: 1px solid #eee;';
+        const label = document.createElement('span');
+        label.style.flex = '1';
+        label.textContent = sequence.name;
+        label.title = sequence.steps.map(step => `${formatStepDuration(step.duration_seconds)} ${step.name}`).join('\n');
+        const total = document.createElement('span');
+        total.style.cssText = 'font-size: 0.85rem; color: #7f8c8d;';
+        total.textContent = `${sequence.steps.length} steps · ${formatStepDuration(sequence.total_seconds)}`;
+        const start = document.createElement('button');
+        start.className = 'btn btn-primary';
+        start.innerHTML = '<i class="fas fa-play"></i>';
+        start.onclick = () => startCountdownSequence(sequence);
+        const remove = document.createElement('button');
+        remove.className = 'btn btn-danger';
+        remove.innerHTML = '<i class="fas fa-trash"></i>';
+        remove.onclick = () => deleteCountdownSequence(sequence);
+        row.append(label, total, start, remove);
+        return row;
+    }));
+}
+
+async function saveCountdownSequence() {
+    const name = document.getElementById('sequenceName').value.trim();
+    const steps = parseSequenceSteps(document.getElementById('sequenceSteps').value);
+    
+    if (!name || !steps || !steps.length) {
+        showCountdownStatus('Enter a name and one "minutes:seconds name" step per line', 'error');
+        return;
+    }
+    
+    try {
+        const response = await fetch('/api/countdown_sequences', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ name: name, steps: steps })
+        });
+        
+        if (response.ok) {
+            showCountdownStatus(`✓ Sequence saved: ${name}`, 'success');
+            document.getElementById('sequenceName').value = '';
+            document.getElementById('sequenceSteps').value = '';
+            loadCountdownSequences();
+        } else {
+            const error = await response.json();
+            showCountdownStatus(`Error: ${error.error || 'Failed to save sequence'}`, 'error');
+        }
+    } catch (error) {
+        console.error('Error saving countdown sequence:', error);
+        showCountdownStatus('Error: Failed to save sequence', 'error');
+    }
+}
+
+async function startCountdownSequence(sequence) {
+    try {
+        const response = await fetch(`/api/countdown_sequences/${sequence.id}/start`, {
+            method: 'POST'
+        });
+        
+        if (response.ok) {
+            showCountdownStatus(`✓ Sequence started: ${sequence.name}`, 'success');
+            showAlert(`Countdown sequence "${sequence.name}" started`, 'success');
+        } else {
+            const error = await response.json();
+            showCountdownStatus(`Error: ${error.error || 'Failed to start sequence'}`, 'error');
+        }
+    } catch (error) {
+        console.error('Error starting countdown sequence:', error);
+        showCountdownStatus('Error: Failed to start sequence', 'error');
+    }
+}
+
+async function deleteCountdownSequence(sequence) {
+    if (!confirm(`Delete sequence "${sequence.name}"?`)) return;
+    
+    try {
+        const response = await fetch(`/api/countdown_sequences/${sequence.id}`, {
+            method: 'DELETE'
+        });
+        
+        if (response.ok) {
+            loadCountdownSequences();
+        } else {
+            showCountdownStatus('Error: Failed to delete sequence', 'error');
+        }
+    } catch (error) {
+        console.error('Error deleting countdown sequence:', error);
+        showCountdownStatus('Error: Failed to delete sequence', 'error');
+    }
+}
+
 function showCountdownStatus(message, type) {
     const statusDiv = document.getElementById('countdownStatus');
     
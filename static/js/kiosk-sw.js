@@ -0,0 +1,78 @@
+// kiosk-sw.js - Service worker for the stage display
+//
+// Keeps the kiosk page, its assets and the last /api/kiosk_plan available
+// when the server restarts or Wi-Fi drops, so kiosk.js can keep counting
+// down locally until the server comes back.
+
+const CACHE = 'kiosk-v1';
+const SHELL = '/';
+const PLAN = '/api/kiosk_plan';
+
+function assetUrls(html) {
+    return html.match(/\/assets\/[^"']+/g) || [];
+}
+
+// Cache the page and the fingerprinted assets it references
+async function cacheShell(response) {
+    const cache = await caches.open(CACHE);
+    const urls = assetUrls(await response.clone().text());
+    await cache.put(SHELL, response);
+    await Promise.all(urls.map(url => cache.match(url).then(hit => hit || cache.add(url))));
+
+    // Drop assets from older deployments
+    const keep = new Set(urls);
+    for (const request of await cache.keys()) {
+        const path = new URL(request.url).pathname;
+        if (path.startsWith('/assets/') && !keep.has(path)) await cache.delete(request);
+    }
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(fetch(SHELL, { cache: 'no-store' }).then(cacheShell).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names.filter(n => n !== CACHE).map(n => caches.delete(n))))
+        .then(() => self.clients.claim()));
+});
+
+// Network first; on failure answer from the cache. Cached plans are marked
+// so the page knows the deadlines are not fresh.
+async function networkFirst(request, path) {
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            if (path === SHELL) await cacheShell(response.clone());
+            else await (await caches.open(CACHE)).put(path, response.clone());
+        }
+        return response;
+    } catch (err) {
+        const cached = await caches.match(path);
+        if (!cached) throw err;
+        if (path !== PLAN) return cached;
+        const headers = new Headers(cached.headers);
+        headers.set('X-Kiosk-Offline', '1');
+        return new Response(await cached.blob(), { status: 200, headers });
+    }
+}
+
+// Fingerprinted assets never change, so the cached copy is always valid
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) await (await caches.open(CACHE)).put(request, response.clone());
+    return response;
+}
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin) return;
+
+    if (url.pathname.startsWith('/assets/')) {
+        event.respondWith(cacheFirst(event.request));
+    } else if (url.pathname === SHELL || url.pathname === PLAN) {
+        event.respondWith(networkFirst(event.request, url.pathname));
+    }
+});
@@ -0,0 +1,506 @@
+// kiosk.js - Stage display
+
+let waitingForStart = false;
+let scheduledStartTime = '';
+let waitingProgramName = '';
+let showingEndScreen = false;
+let endScreenTimer = null;
+let totalProgramSeconds = 0;
+
+// Render layer: every DOM write goes through view, which remembers the last
+// value written per node and skips writes that would change nothing, so a
+// tick where only the seconds move touches only the seconds node. Progress
+// bars move with transform: scaleX(), which the compositor animates without
+// layout.
+const view = {
+    nodes: {},
+    last: new Map(),
+    writes: 0,
+    skipped: 0,
+
+    node(id) {
+        return this.nodes[id] || (this.nodes[id] = document.getElementById(id));
+    },
+    changed(key, value) {
+        if (this.last.get(key) === value) { this.skipped++; return false; }
+        this.last.set(key, value);
+        this.writes++;
+        return true;
+    },
+    text(id, value) {
+        value = String(value);
+        if (this.changed('text:' + id, value)) this.node(id).textContent = value;
+    },
+    cls(id, name, on) {
+        on = !!on;
+        if (this.changed('class:' + id + '.' + name, on)) this.node(id).classList.toggle(name, on);
+    },
+    hasClass(id, name) {
+        return this.last.get('class:' + id + '.' + name) === true;
+    },
+    style(id, prop, value) {
+        if (this.changed('style:' + id + '.' + prop, value)) this.node(id).style[prop] = value;
+    },
+    progress(id, fraction) {
+        this.style(id, 'transform', 'scaleX(' + Math.max(0, Math.min(1, fraction)).toFixed(4) + ')');
+    },
+};
+
+// Frame stats for checking the render cost on the Pi: kioskStats() in the
+// console. With ?stats=1 the display also samples requestAnimationFrame
+// intervals and logs a summary every minute.
+const STATS_WINDOW = 600;
+const renderTimes = [];
+const frameIntervals = [];
+let renders = 0;
+
+function frame(render) {
+    const started = performance.now();
+    render();
+    renders++;
+    renderTimes.push(performance.now() - started);
+    if (renderTimes.length > STATS_WINDOW) renderTimes.shift();
+}
+
+function summarize(samples) {
+    if (!samples.length) return null;
+    const sorted = samples.slice().sort((a, b) => a - b);
+    const round = n => Math.round(n * 1000) / 1000;
+    return {
+        mean: round(sorted.reduce((a, b) => a + b, 0) / sorted.length),
+        p95: round(sorted[Math.floor(sorted.length * 0.95)]),
+        max: round(sorted[sorted.length - 1]),
+    };
+}
+
+function kioskStats() {
+    return {
+        renders: renders,
+        dom_writes: view.writes,
+        skipped_writes: view.skipped,
+        render_ms: summarize(renderTimes),
+        frame_interval_ms: summarize(frameIntervals),
+    };
+}
+window.kioskStats = kioskStats;
+
+if (new URLSearchParams(location.search).get('stats') === '1') {
+    let lastFrame = null;
+    const sampleFrame = t => {
+        if (lastFrame !== null) {
+            frameIntervals.push(t - lastFrame);
+            if (frameIntervals.length > STATS_WINDOW) frameIntervals.shift();
+        }
+        lastFrame = t;
+        requestAnimationFrame(sampleFrame);
+    };
+    requestAnimationFrame(sampleFrame);
+    setInterval(() => console.info('[KIOSK] frame stats', JSON.stringify(kioskStats())), 60000);
+}
+
+// Clock sync: every display runs on the server's clock, estimated NTP-style
+// from /api/time round trips, so all screens flip their seconds together.
+let clockOffset = 0;  // server clock - local clock, in ms
+let clockSynced = false;
+const SYNC_SAMPLES = 5;
+
+function serverNow() {
+    return Date.now() + clockOffset;
+}
+
+function sampleClock() {
+    const t0 = Date.now();
+    return fetch('/api/time?t0=' + t0, { cache: 'no-store' }).then(okJson).then(s => {
+        const t3 = Date.now();
+        return { offset: ((s.t1 - t0) + (s.t2 - t3)) / 2, delay: (t3 - t0) - (s.t2 - s.t1) };
+    });
+}
+
+// Keep the sample with the shortest round trip - its offset has the least
+// error from asymmetric network delay
+function syncClock() {
+    let best = null;
+    let chain = Promise.resolve();
+    for (let i = 0; i < SYNC_SAMPLES; i++) {
+        chain = chain.then(sampleClock).then(s => { if (!best || s.delay < best.delay) best = s; });
+    }
+    return chain.catch(() => {}).then(() => {
+        if (!best) return;
+        clockOffset = best.offset;
+        clockSynced = true;
+    });
+}
+
+function updateCurrentTime() {
+    const now = new Date(serverNow());
+    const h = now.getHours().toString().padStart(2, '0');
+    const m = now.getMinutes().toString().padStart(2, '0');
+    view.text('clockTime', h + ':' + m);
+    const opts = { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' };
+    view.text('clockDate', now.toLocaleDateString('en-US', opts));
+}
+
+// Stage messages: the server flattens its priority queue into display
+// windows ({start, end, ends_at, duration, message}, epoch ms) and bumps "m"
+// in the status whenever the queue changes. Rotation and expiry happen here
+// on the synced clock, so nothing is polled while a message shows.
+let stageWindows = [];
+let stageVersion = null;
+
+function refreshStageMessages() {
+    fetch('/api/stage_messages').then(okJson).then(data => {
+        stageWindows = data.windows;
+        stageVersion = data.version;
+        frame(renderStageMessage);
+    }).catch(() => { stageVersion = null; });
+}
+
+function noteStageVersion(m) {
+    if (m === undefined || m === stageVersion) return;
+    stageVersion = m;
+    refreshStageMessages();
+}
+
+// The window showing at t, dropping those that have ended
+function stageWindowAt(t) {
+    while (stageWindows.length && stageWindows[0].end <= t) stageWindows.shift();
+    return stageWindows.length && stageWindows[0].start <= t ? stageWindows[0] : null;
+}
+
+function renderStageMessage() {
+    const now = serverNow();
+    const w = stageWindowAt(now);
+    if (!w) {
+        hideStageMessage();
+        return;
+    }
+    if (!view.hasClass('stageMessageOverlay', 'show')) {
+        view.cls('stageMessageOverlay', 'hiding', false);
+        view.cls('stageMessageOverlay', 'show', true);
+        view.cls('minimizedTimer', 'show', true);
+    }
+    view.text('stageMessageText', w.message);
+    if (lastStatus) {
+        const status = liveStatus(lastStatus);
+        view.text('minimizedActivity', (status.on ? status.n : status.a) || '');
+        view.text('minimizedTime', formatHms(status.r));
+    }
+    const remaining = Math.max(0, w.ends_at - now);
+    const secs = Math.floor(remaining / 1000);
+    view.text('messageTimeRemaining', Math.floor(secs / 60) + ':' + (secs % 60).toString().padStart(2, '0'));
+    view.progress('messageTimerFill', remaining / (w.duration * 1000));
+}
+
+// Milliseconds until the stage overlay next changes (a window boundary or its countdown's next second)
+function stageWait(now) {
+    const w = stageWindows.find(x => x.end > now);
+    if (!w) return Infinity;
+    if (w.start > now) return w.start - now;
+    return Math.min(w.end - now, ((w.ends_at - now) % 1000 + 1000) % 1000 || 1000);
+}
+
+function hideStageMessage() {
+    if (view.hasClass('stageMessageOverlay', 'show')) {
+        view.cls('stageMessageOverlay', 'hiding', true);
+        setTimeout(() => {
+            view.cls('stageMessageOverlay', 'show', false);
+            view.cls('stageMessageOverlay', 'hiding', false);
+        }, 400);
+        view.cls('minimizedTimer', 'show', false);
+    }
+}
+
+function okJson(r) {
+    return r.ok ? r.json() : Promise.reject(new Error('HTTP ' + r.status));
+}
+
+// Offline continuation: the latest /api/kiosk_plan (also cached by the
+// service worker) lets the display keep counting down and move through the
+// schedule on its own while the server is unreachable.
+let plan = null;
+let offline = false;
+
+function refreshPlan() {
+    fetch('/api/kiosk_plan').then(r => {
+        const stale = r.headers.get('X-Kiosk-Offline') === '1';
+        return okJson(r).then(p => {
+            // Rough offset until /api/time answers; a cached plan's "now" is old
+            if (!stale && !clockSynced) clockOffset = p.now - Date.now();
+            if (!stale || !plan) plan = p;
+        });
+    }).catch(() => {});
+}
+
+// [activity name, seconds left] at time t for a chain of [name, seconds]
+// items starting at startsAt, or null once the chain has finished
+function activityAt(items, startsAt, t) {
+    let endsAt = startsAt;
+    for (const [name, seconds] of items) {
+        endsAt += seconds * 1000;
+        if (t < endsAt) return [name, Math.floor((endsAt - t) / 1000)];
+    }
+    return null;
+}
+
+// Rebuild the compact timer status from the plan, making the same
+// transitions the server's timer thread would make
+function localTimerStatus(t) {
+    const queued = plan.queued;
+    const base = { a: '', r: 0, run: 0, p: 0, w: 0, ws: '', wn: '', q: queued ? queued.q : null };
+    const waitForQueued = () => ({ ...base, w: 1, ws: queued.q[2], wn: queued.q[1] });
+
+    // A queued program starts at its time even over a running one
+    if (queued && queued.starts_at && t >= queued.starts_at) {
+        const current = activityAt(queued.items, queued.starts_at, t);
+        return current ? { ...base, a: current[0], r: current[1], run: 1, q: null } : { ...base, q: null };
+    }
+
+    const act = plan.activity;
+    if (act && act.paused) return { ...base, a: act.name, r: act.remaining, run: 1, p: 1 };
+    if (act) {
+        const current = activityAt([[act.name, act.seconds], ...plan.upcoming], act.started_at, t);
+        if (current) return { ...base, a: current[0], r: current[1], run: 1 };
+        return queued ? waitForQueued() : base;
+    }
+    if (plan.waiting) return { ...base, w: 1, wn: plan.waiting[0], ws: plan.waiting[1] };
+    return base;
+}
+
+function renderFromPlan() {
+    if (!offline) { offline = true; console.warn('[KIOSK] Server unreachable - continuing locally'); }
+    if (!plan) return;
+    const t = serverNow();
+    if (plan.countdown) {
+        const r = Math.max(0, Math.floor((plan.countdown.ends_at - t) / 1000));
+        displayCountdownTimer(liveStatus({ on: 1, n: plan.countdown.name, sq: plan.countdown.steps, r: r, x: r <= 0 ? 1 : 0 }));
+        return;
+    }
+    displayRegularTimer(localTimerStatus(t));
+}
+
+// Latest compact status from the server. While an activity or countdown is
+// running its "e" (end, epoch ms) is used to recompute the seconds left on
+// the synced clock, so every display shows the same number at the same moment.
+let lastStatus = null;
+
+function liveStatus(data) {
+    // A countdown sequence steps through its deadlines without asking the server
+    if (data.on && data.sq) {
+        const t = serverNow();
+        const step = data.sq.find(s => s[1] > t);
+        if (!step) return { ...data, r: 0, x: 1 };
+        return { ...data, n: step[0], e: step[1], r: Math.floor((step[1] - t) / 1000), x: 0 };
+    }
+    if (data.e && (data.on ? !data.x : data.run && !data.p)) {
+        return { ...data, r: Math.max(0, Math.floor((data.e - serverNow()) / 1000)) };
+    }
+    return data;
+}
+
+function renderStatus(data) {
+    data = liveStatus(data);
+    if (data.on) displayCountdownTimer(data);
+    else displayRegularTimer(data);
+}
+
+function updateDisplay() {
+    // Compact form: short keys and integer seconds (see serialization.py)
+    fetch('/api/countdown_timer?compact=1').then(okJson).then(cd => {
+        if (cd.on) return cd;
+        return fetch('/api/timer_status?compact=1').then(okJson);
+    }).then(data => {
+        if (offline) {
+            // Back online: the server's state wins; pick up its latest plan
+            offline = false;
+            console.info('[KIOSK] Server reachable again');
+            refreshPlan();
+        }
+        lastStatus = data;
+        noteStageVersion(data.m);
+        frame(() => renderStatus(data));
+    }).catch(() => frame(renderFromPlan));
+}
+
+// Redraw at the next moment a displayed second changes: the wall clock's
+// next second, the running timer's next whole second or the next stage
+// message change, whichever is first
+function tick() {
+    frame(() => {
+        updateCurrentTime();
+        if (offline) renderFromPlan();
+        else if (lastStatus) renderStatus(lastStatus);
+        renderStageMessage();
+    });
+
+    const now = serverNow();
+    let wait = Math.min(1000 - now % 1000, stageWait(now));
+    const live = !offline && lastStatus ? liveStatus(lastStatus) : null;
+    if (live && live.e) wait = Math.min(wait, ((live.e - now) % 1000 + 1000) % 1000 || 1000);
+    setTimeout(tick, wait + 2);
+}
+
+function setClockDigits(totalSeconds) {
+    const pad = n => String(n).padStart(2, '0');
+    view.text('hours', pad(Math.floor(totalSeconds / 3600)));
+    view.text('minutes', pad(Math.floor((totalSeconds % 3600) / 60)));
+    view.text('seconds', pad(totalSeconds % 60));
+}
+
+function formatHms(totalSeconds) {
+    const pad = n => String(n).padStart(2, '0');
+    return pad(Math.floor(totalSeconds / 3600)) + ':' + pad(Math.floor((totalSeconds % 3600) / 60)) + ':' + pad(totalSeconds % 60);
+}
+
+// Seconds from now until 'HH:MM' today on the synced clock, or null
+function secondsUntil(hhmm) {
+    const parts = hhmm.split(':');
+    if (parts.length !== 2) return null;
+    const now = new Date(serverNow()), target = new Date(now);
+    target.setHours(parseInt(parts[0]), parseInt(parts[1]), 0, 0);
+    return Math.max(0, Math.floor((target - now) / 1000));
+}
+
+function setWarning(id, level) {
+    view.cls(id, 'warn-orange', level === 'orange');
+    view.cls(id, 'warn-red', level === 'red');
+}
+
+function displayCountdownTimer(cd) {
+    view.cls('clockView', 'hidden', true);
+    view.cls('waitingView', 'active', false);
+    view.style('normalView', 'display', 'flex');
+
+    view.text('activityName', cd.n || 'COUNTDOWN');
+
+    if (cd.x) {
+        setClockDigits(0);
+        view.style('endOverlay', 'display', 'flex');
+        view.text('endText', 'TIME UP');
+    } else {
+        const total = cd.r || 0;
+        setClockDigits(total);
+        setWarning('countdown', total <= 10 ? 'red' : total <= 60 ? 'orange' : null);
+        view.style('endOverlay', 'display', 'none');
+    }
+}
+
+function endScreenDone() {
+    showingEndScreen = false;
+    view.style('endOverlay', 'display', 'none');
+}
+
+function clearEndScreen() {
+    showingEndScreen = false;
+    if (endScreenTimer) clearTimeout(endScreenTimer);
+}
+
+function displayRegularTimer(data) {
+    // Waiting state
+    if (data.w && !data.run) {
+        view.cls('clockView', 'hidden', true);
+        view.style('normalView', 'display', 'none');
+        view.cls('waitingView', 'active', true);
+
+        view.text('waitingProgramName', data.wn || '');
+        view.text('waitingTime', 'Starts at ' + (data.ws || ''));
+
+        const diff = data.ws ? secondsUntil(data.ws) : null;
+        if (diff !== null) view.text('waitingCountdown', formatHms(diff));
+
+        view.style('endOverlay', 'display', 'none');
+        view.progress('progressBar', 1);
+        setWarning('progressBar', null);
+        clearEndScreen();
+        return;
+    } else {
+        view.cls('waitingView', 'active', false);
+    }
+
+    // Queued banner
+    const qp = data.q;  // [program_id, name, scheduled start] or null
+    if (qp && data.run) {
+        view.cls('queuedBanner', 'active', true);
+        view.text('queuedName', qp[1]);
+        const diff = secondsUntil(qp[2]);
+        if (diff !== null) view.text('queuedCountdown', 'in ' + formatHms(diff));
+    } else {
+        view.cls('queuedBanner', 'active', false);
+    }
+
+    // Running or stopped
+    view.cls('clockView', 'hidden', !!data.run);
+    view.style('normalView', 'display', data.run ? 'flex' : 'none');
+
+    view.text('activityName', data.a || 'READY');
+
+    const totalSeconds = data.r || 0;
+    setClockDigits(totalSeconds);
+
+    // TIME UP logic
+    if (data.run && !data.p) {
+        if (totalProgramSeconds === 0 || totalSeconds > totalProgramSeconds)
+            totalProgramSeconds = totalSeconds;
+    }
+
+    let showTimeUp = false;
+    if (data.run && !data.p && totalProgramSeconds > 0) {
+        showTimeUp = totalProgramSeconds >= 1800
+            ? (totalSeconds <= 120 && totalSeconds > 0)
+            : (totalSeconds <= 60 && totalSeconds > 0);
+    }
+
+    view.style('countdown', 'display', showTimeUp ? 'none' : 'flex');
+    view.cls('timeUpMessage', 'show', showTimeUp);
+
+    if (data.run) {
+        if (totalProgramSeconds === 0 || totalSeconds > totalProgramSeconds)
+            totalProgramSeconds = totalSeconds;
+
+        const fraction = totalProgramSeconds > 0 ? totalSeconds / totalProgramSeconds : 0;
+        view.progress('progressBar', fraction);
+
+        // End of program
+        if (totalSeconds <= 0 && data.a && data.a !== 'READY') {
+            if (!showingEndScreen) {
+                showingEndScreen = true;
+                view.style('endOverlay', 'display', 'flex');
+                view.text('endText', 'THE END');
+                totalProgramSeconds = 0;
+                if (endScreenTimer) clearTimeout(endScreenTimer);
+                endScreenTimer = setTimeout(endScreenDone, 300000);
+            }
+            return;
+        } else {
+            view.style('endOverlay', 'display', 'none');
+            clearEndScreen();
+        }
+
+        // Warning states
+        const level = totalSeconds <= 60 ? 'red' : fraction <= 0.1 ? 'orange' : null;
+        setWarning('countdown', level);
+        setWarning('progressBar', level);
+    } else {
+        setWarning('countdown', null);
+        setWarning('progressBar', null);
+        view.style('endOverlay', 'display', 'none');
+        totalProgramSeconds = 0;
+        view.progress('progressBar', 1);
+        clearEndScreen();
+    }
+}
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('/sw.js').catch(err => console.warn('[KIOSK] Service worker not registered:', err));
+}
+
+syncClock();
+setInterval(syncClock, 60000);
+refreshPlan();
+setInterval(() => { if (!offline) refreshPlan(); }, 5000);
+updateDisplay();
+setInterval(updateDisplay, 1000);
+tick();
+
+document.addEventListener('visibilitychange', () => {
+    if (!document.hidden) { syncClock(); updateCurrentTime(); updateDisplay(); refreshStageMessages(); }
+});
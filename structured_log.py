@@ -0,0 +1,115 @@
+# structured_log.py
+"""JSON-lines logging that stays off the hot path.
+
+Loggers only put the LogRecord on a queue. A QueueListener thread does the
+message formatting, JSON encoding and file I/O, so request handlers and
+background loops never wait on disk or stdout.
+
+Configured from the environment (all optional):
+    LOG_DIR            directory for app.jsonl (default: logs)
+    LOG_LEVEL          root level (default: INFO)
+    LOG_LEVELS         per-subsystem levels, e.g. "remote_sync=DEBUG,werkzeug=INFO"
+    LOG_MAX_BYTES      rotate when the file reaches this size (default: 5 MB)
+    LOG_BACKUPS        rotated files to keep (default: 5)
+    LOG_ROTATE_WHEN    rotate by time instead, e.g. "midnight" or "H"
+    LOG_CONSOLE_LEVEL  level echoed to stdout (default: INFO on a terminal,
+                       WARNING otherwise so startup.sh's app.log stays small)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+ROOT = 'church_timer'
+# Per-request access lines from the dev server would be several per second
+DEFAULT_LEVELS = {'werkzeug': 'WARNING'}
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+def get_logger(subsystem):
+    return logging.getLogger(f'{ROOT}.{subsystem}')
+
+def _subsystem(record):
+    return record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + '.') else record.name
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; `extra={...}` fields become top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'subsystem': _subsystem(record),
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class ConsoleFormatter(logging.Formatter):
+    """The familiar "[SUBSYSTEM] message" lines"""
+
+    def format(self, record):
+        line = f"[{_subsystem(record).upper()}] {record.getMessage()}"
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the message so the record can be pickled;
+    # the listener is in this process, so leave all formatting to it
+    def prepare(self, record):
+        return record
+
+def _parse_levels(spec):
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure(environ=os.environ):
+    """Install the queue handler on the root logger; returns the running QueueListener"""
+    log_dir = environ.get('LOG_DIR', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, 'app.jsonl')
+
+    if environ.get('LOG_ROTATE_WHEN'):
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=environ['LOG_ROTATE_WHEN'], backupCount=int(environ.get('LOG_BACKUPS', 5)),
+            encoding='utf-8')
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=int(environ.get('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+            backupCount=int(environ.get('LOG_BACKUPS', 5)), encoding='utf-8')
+    file_handler.setFormatter(JSONFormatter())
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(ConsoleFormatter())
+    console_handler.setLevel(environ.get('LOG_CONSOLE_LEVEL') or ('INFO' if sys.stdout.isatty() else 'WARNING'))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                              respect_handler_level=True)
+    root = logging.getLogger()
+    root.handlers[:] = [_InProcessQueueHandler(log_queue)]
+    root.setLevel(environ.get('LOG_LEVEL', 'INFO').upper())
+
+    for name, level in {**DEFAULT_LEVELS, **_parse_levels(environ.get('LOG_LEVELS'))}.items():
+        logger_name = name if name in DEFAULT_LEVELS or name.startswith(ROOT) else f'{ROOT}.{name}'
+        logging.getLogger(logger_name).setLevel(level)
+
+    listener.start()
+    # Drain the queue on normal exit
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Bulk export/import of activities, programs and schedules
+
+Records are streamed one per line as NDJSON or CSV, activities first, then
+programs, then schedule items (which refer to both by name), so an export
+can be imported into another database in a single pass:
+
+    {"type": "activity", "name": "Prayer", "default_duration": 15, "description": "..."}
+    {"type": "program", "name": "Sunday Program", "scheduled_start_time": "09:30", ...}
+    {"type": "schedule", "program": "Sunday Program", "activity": "Prayer", "duration_minutes": 15, "sort_order": 0}
+
+Neither direction holds more than one batch of records in memory.
+
+Usage:
+    python transfer.py export > campus.ndjson
+    python transfer.py export --format csv -o campus.csv
+    python transfer.py import campus.ndjson --on-conflict update
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+from itertools import islice
+
+from database import DB_PATH, connect
+from recurrence import validate_rule
+
+FORMATS = ('ndjson', 'csv')
+CONFLICT_MODES = ('skip', 'update', 'error')
+RECORD_TYPES = ('activity', 'program', 'schedule')
+# CSV has one column set for every record type; unused columns are empty
+CSV_FIELDS = ['type', 'name', 'description', 'default_duration', 'scheduled_start_time', 'day_of_week',
+              'auto_start', 'recurrence', 'program', 'activity', 'duration_minutes', 'sort_order']
+INT_FIELDS = ('default_duration', 'duration_minutes', 'sort_order')
+FETCH_SIZE = 500
+BATCH_SIZE = 500
+
+def _rows(conn, query):
+    c = conn.cursor()
+    c.execute(query)
+    while True:
+        rows = c.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+def export_records(conn, types=RECORD_TYPES):
+    """Yield every record of the given types, in import order"""
+    if 'activity' in types:
+        for name, default_duration, description in _rows(conn, '''
+                SELECT name, default_duration, description FROM activities ORDER BY id'''):
+            yield {'type': 'activity', 'name': name, 'default_duration': default_duration,
+                   'description': description}
+
+    if 'program' in types:
+        for name, description, start_time, day, auto_start, recurrence in _rows(conn, '''
+                SELECT name, description, scheduled_start_time, day_of_week, auto_start, recurrence
+                FROM programs ORDER BY id'''):
+            yield {'type': 'program', 'name': name, 'description': description,
+                   'scheduled_start_time': start_time, 'day_of_week': day,
+                   'auto_start': bool(auto_start), 'recurrence': json.loads(recurrence) if recurrence else None}
+
+    if 'schedule' in types:
+        for program, activity, duration, sort_order in _rows(conn, '''
+                SELECT p.name, a.name, ps.duration_minutes, ps.sort_order
+                FROM program_schedules ps
+                JOIN programs p ON ps.program_id = p.id
+                JOIN activities a ON ps.activity_id = a.id
+                ORDER BY p.id, ps.sort_order'''):
+            yield {'type': 'schedule', 'program': program, 'activity': activity,
+                   'duration_minutes': duration, 'sort_order': sort_order}
+
+def encode(records, fmt):
+    """Yield records as lines of text in the given format"""
+    if fmt == 'ndjson':
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        if record.get('recurrence') is not None:
+            record = {**record, 'recurrence': json.dumps(record['recurrence'])}
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def _csv_record(row):
+    record = {key: value for key, value in row.items() if key and value not in ('', None)}
+    for key in INT_FIELDS:
+        if key in record:
+            record[key] = int(record[key])
+    if 'auto_start' in record:
+        record['auto_start'] = record['auto_start'].strip().lower() in ('1', 'true', 'yes')
+    if 'recurrence' in record:
+        record['recurrence'] = json.loads(record['recurrence'])
+    return record
+
+def decode(lines, fmt):
+    """Yield records from an iterable of text lines.
+
+    A line that can't be parsed yields {'invalid': reason} so the import can
+    report it and carry on.
+    """
+    if fmt == 'ndjson':
+        rows = (line for line in lines if line.strip())
+        parse = json.loads
+    else:
+        rows = csv.DictReader(lines)
+        parse = _csv_record
+    for row in rows:
+        try:
+            record = parse(row)
+        except ValueError as e:
+            record = {'invalid': str(e)}
+        yield record if isinstance(record, dict) else {'invalid': 'expected an object'}
+
+def batches(records, size=BATCH_SIZE):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+class ImportResult:
+    def __init__(self):
+        self.counts = {t: {'inserted': 0, 'updated': 0, 'skipped': 0} for t in RECORD_TYPES}
+        self.errors = []
+        self.error_count = 0
+        self.skipped_programs = set()  # schedules of programs kept as they were are skipped too
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < 20:
+            self.errors.append({'record': line, 'error': message})
+
+    def as_dict(self):
+        return {'counts': self.counts, 'errors': self.error_count, 'first_errors': self.errors}
+
+def _upsert(c, table, key_column, record, columns, on_conflict):
+    """Insert a row keyed by a UNIQUE name; returns 'inserted', 'updated' or 'skipped'"""
+    values = [record.get(column) for column in columns]
+    placeholders = ', '.join('?' * (len(columns) + 1))
+    insert = f'INSERT INTO {table} ({key_column}, {", ".join(columns)}) VALUES ({placeholders})'
+    if on_conflict == 'update':
+        updates = ', '.join(f'{column} = excluded.{column}' for column in columns)
+        c.execute(f'SELECT 1 FROM {table} WHERE {key_column} = ?', (record['name'],))
+        existed = c.fetchone() is not None
+        c.execute(f'{insert} ON CONFLICT({key_column}) DO UPDATE SET {updates}', [record['name'], *values])
+        return 'updated' if existed else 'inserted'
+    if on_conflict == 'skip':
+        c.execute(insert.replace('INSERT', 'INSERT OR IGNORE', 1), [record['name'], *values])
+        return 'inserted' if c.rowcount else 'skipped'
+    c.execute(insert, [record['name'], *values])
+    return 'inserted'
+
+def import_batch(c, batch, on_conflict, result):
+    """Apply one batch of (line number, record) pairs on cursor c.
+
+    Each record succeeds or fails on its own; failures are added to result.
+    The caller owns the transaction.
+    """
+    for line, record in batch:
+        kind = record.get('type')
+        try:
+            if 'invalid' in record:
+                raise ValueError(record['invalid'])
+            if kind == 'activity':
+                record = {'default_duration': 5, **record}
+                outcome = _upsert(c, 'activities', 'name', record, ['default_duration', 'description'], on_conflict)
+            elif kind == 'program':
+                if record.get('recurrence') is not None:
+                    record = {**record, 'recurrence': json.dumps(validate_rule(record['recurrence']))}
+                record = {**record, 'auto_start': bool(record.get('auto_start'))}
+                outcome = _upsert(c, 'programs', 'name', record,
+                                  ['description', 'scheduled_start_time', 'day_of_week', 'auto_start', 'recurrence'],
+                                  on_conflict)
+                if outcome == 'skipped':
+                    result.skipped_programs.add(record['name'])
+                elif on_conflict == 'update':
+                    # The imported schedule replaces the existing one
+                    c.execute('''DELETE FROM program_schedules
+                                 WHERE program_id = (SELECT id FROM programs WHERE name = ?)''', (record['name'],))
+            elif kind == 'schedule':
+                if record['program'] in result.skipped_programs:
+                    outcome = 'skipped'
+                else:
+                    verb = 'INSERT OR IGNORE' if on_conflict == 'skip' else 'INSERT'
+                    c.execute(f'''
+                        {verb} INTO program_schedules (program_id, activity_id, duration_minutes, sort_order)
+                        SELECT p.id, a.id, ?, ? FROM programs p, activities a
+                        WHERE p.name = ? AND a.name = ?
+                    ''', (record['duration_minutes'], record.get('sort_order', 0), record['program'], record['activity']))
+                    if c.rowcount:
+                        outcome = 'inserted'
+                    elif on_conflict == 'skip':
+                        outcome = 'skipped'
+                    else:
+                        raise ValueError(f"unknown program {record['program']!r} or activity {record['activity']!r}")
+            else:
+                raise ValueError(f'unknown record type {kind!r}')
+        except (sqlite3.Error, KeyError, ValueError, TypeError) as e:
+            result.error(line, f'{type(e).__name__}: {e}')
+            continue
+        result.counts[kind][outcome] += 1
+
+def import_stream(records, apply_batch, on_conflict='skip', batch_size=BATCH_SIZE):
+    """Import records, calling apply_batch(func) once per batch.
+
+    apply_batch runs func(cursor) in its own transaction - a direct
+    connection for the CLI, the app's DatabaseWriter for the API.
+    """
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_MODES)}")
+    result = ImportResult()
+    for batch in batches(enumerate(records, start=1), batch_size):
+        apply_batch(lambda c, batch=batch: import_batch(c, batch, on_conflict, result))
+    return result
+
+def run_in_transaction(conn):
+    """apply_batch for a plain connection opened with database.connect()"""
+    def apply(func):
+        c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
+        try:
+            func(c)
+        except Exception:
+            c.execute('ROLLBACK')
+            raise
+        c.execute('COMMIT')
+    return apply
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Church Timer bulk export/import')
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('file', nargs='?', default='-', help='input/output file (default: stdin/stdout)')
+    parser.add_argument('-o', '--output', help='output file for export (same as FILE)')
+    parser.add_argument('--format', choices=FORMATS, help='default: from the file extension, else ndjson')
+    parser.add_argument('--types', default=','.join(RECORD_TYPES), help='record types to export')
+    parser.add_argument('--on-conflict', choices=CONFLICT_MODES, default='skip',
+                        help='what to do when a name already exists (default: skip)')
+    parser.add_argument('--db', default=DB_PATH, help=f'database file (default: {DB_PATH})')
+    args = parser.parse_args(argv)
+
+    path = args.output or args.file
+    fmt = args.format or ('csv' if path.endswith('.csv') else 'ndjson')
+    conn = connect(args.db)
+    try:
+        if args.command == 'export':
+            types = [t.strip() for t in args.types.split(',')]
+            out = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+            try:
+                for chunk in encode(export_records(conn, types), fmt):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            return 0
+
+        source = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            result = import_stream(decode(source, fmt), run_in_transaction(conn), args.on_conflict)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(json.dumps(result.as_dict(), indent=2), file=sys.stderr)
+        return 1 if result.error_count else 0
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())